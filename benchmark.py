@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PPT 생성 벤치마크
+find_shop_directories가 기대하는 지역/상세지역/업체/업체 폴더 구조의 가상 데이터셋과
+순서 엑셀을 만들고, 시작(모듈 불러오기)/스캔/엑셀 로드/이미지 처리/슬라이드 배치/저장 단계를 각각 측정합니다.
+업체 수마다 새 프로세스에서 측정하므로 최대 메모리는 그 실행만의 값이고, 진행 로그는 끄고 측정합니다.
+결과(단계별 시간, 최대 메모리, 출력 크기)는 JSON 파일에 누적 저장하여 실행 간 비교할 수 있습니다.
+
+사용 예:
+    python benchmark.py --shops 10 100 1000 --images 6 --resolution 2000x1500 --output bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import subprocess
+import platform
+import tempfile
+from datetime import datetime
+
+from PIL import Image
+import openpyxl
+
+from ppt_image_inserter import PPTImageInserter, TEMPLATE_PPT
+from shop_order import order_shops
+from instrumentation import tracer, CONSOLE_QUIET
+
+REGIONS = ["서울", "경기", "인천"]
+DETAIL_REGIONS = ["강남구", "중구", "마포구", "수원시", "성남시", "부평구"]
+
+
+def peak_rss_kb():
+    """현재 프로세스와 종료된 자식 프로세스의 최대 메모리 사용량 (KB, 측정 불가 시 None)
+
+    프로세스 전체 기간의 최대값이므로 측정 한 번마다 새 프로세스에서 호출합니다 (run_isolated).
+    """
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset // 1024
+        except (ImportError, AttributeError):
+            return None
+
+    scale = 1024 if sys.platform == 'darwin' else 1  # macOS는 바이트 단위
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale
+    return max(own, children)
+
+
+def measure_startup(repeat=3):
+    """새 프로세스가 ppt_image_inserter를 불러오기까지 걸리는 시간 (초, 인터프리터 시작 포함, 가장 빠른 값)
+
+    샤드/배치 워커와 짧은 샘플 실행은 매번 이 비용을 냅니다.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import ppt_image_inserter'], cwd=script_dir, check=True)
+        timings.append(time.perf_counter() - started)
+    return round(min(timings), 4)
+
+
+def make_photo(path, width, height, seed):
+    """JPEG 인코딩 비용이 실제 사진과 비슷하도록 노이즈가 섞인 이미지를 만듭니다."""
+    rng = random.Random(seed)
+    base = Image.new('RGB', (width, height), (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    noise = Image.effect_noise((width, height), 40).convert('RGB')
+    Image.blend(base, noise, 0.35).save(path, format='JPEG', quality=90)
+
+
+def make_screenshot(path, width, height, seed):
+    """네이버플레이스 캡처처럼 단색 영역이 많은 PNG를 만듭니다."""
+    rng = random.Random(seed)
+    img = Image.new('RGB', (width, height), (255, 255, 255))
+    for _ in range(20):
+        x, y = rng.randrange(width), rng.randrange(height)
+        img.paste((rng.randrange(256), rng.randrange(256), rng.randrange(256)),
+                  (x, y, min(width, x + rng.randrange(20, 300)), min(height, y + rng.randrange(10, 80))))
+    img.save(path, format='PNG')
+
+
+def generate_dataset(root, shops, images_per_shop, resolution, price_tables, capture=True, unique_images=0, seed=0):
+    """가상 downloads 폴더와 순서 엑셀을 만듭니다.
+
+    Args:
+        root: 데이터셋을 만들 폴더 (이미 같은 설정으로 만들어져 있으면 재사용)
+        shops: 업체 수
+        images_per_shop: 업체당 업체_*.jpg 수
+        resolution: (가로, 세로) 업체 이미지 해상도
+        price_tables: 업체당 가격표 수 (1개면 가격표.jpg, 그 이상이면 가격표_N.jpg)
+        capture: 네이버플레이스 캡처 포함 여부
+        unique_images: 서로 다른 원본 이미지 수 (0이면 모든 이미지가 서로 다름, 생성 시간 단축용)
+        seed: 난수 시드
+
+    Returns:
+        (이미지 기본 디렉토리, 엑셀 파일 경로)
+    """
+    params = [shops, images_per_shop, list(resolution), price_tables, capture, unique_images, seed]
+    image_dir = os.path.join(root, 'downloads')
+    excel_path = os.path.join(root, 'order.xlsx')
+    marker = os.path.join(root, 'dataset.json')
+    if os.path.exists(marker):
+        with open(marker, 'r', encoding='utf-8') as f:
+            if json.load(f) == params:
+                return image_dir, excel_path
+        shutil.rmtree(root)
+
+    os.makedirs(image_dir, exist_ok=True)
+    rng = random.Random(seed)
+    pool = {}
+    counter = [0]
+
+    def photo(path, size):
+        # unique_images가 지정되면 같은 원본을 복사해서 사용
+        counter[0] += 1
+        key = (size, counter[0] % unique_images) if unique_images else None
+        if key in pool:
+            shutil.copyfile(pool[key], path)
+            return
+        make_photo(path, size[0], size[1], rng.randrange(1 << 30))
+        if key:
+            pool[key] = path
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(['지역', '지역상세', '매장명'])
+
+    for index in range(shops):
+        region = REGIONS[index % len(REGIONS)]
+        detail_region = DETAIL_REGIONS[index % len(DETAIL_REGIONS)]
+        shop_name = f"벤치업체{index:05d}"
+        company_folder = os.path.join(image_dir, region, detail_region, shop_name, '업체')
+        os.makedirs(company_folder, exist_ok=True)
+        ws.append([region, detail_region, shop_name])
+
+        for number in range(1, images_per_shop + 1):
+            photo(os.path.join(company_folder, f"업체_{number:03d}.jpg"), resolution)
+
+        if price_tables == 1:
+            photo(os.path.join(company_folder, "가격표.jpg"), (1080, 1920))
+        for number in range(1, price_tables + 1 if price_tables > 1 else 0):
+            photo(os.path.join(company_folder, f"가격표_{number}.jpg"), (1080, 1920))
+
+        if capture:
+            make_screenshot(os.path.join(company_folder, "네이버플레이스_캡처.png"), 1200, 700, rng.randrange(1 << 30))
+
+    # 엑셀 순서는 폴더 이름 순서와 다르게 섞음
+    rows = list(ws.iter_rows(min_row=2, values_only=True))
+    rng.shuffle(rows)
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(['지역', '지역상세', '매장명'])
+    for row in rows:
+        ws.append(list(row))
+    wb.save(excel_path)
+
+    with open(marker, 'w', encoding='utf-8') as f:
+        json.dump(params, f)
+    return image_dir, excel_path
+
+
+class StageTimer:
+    """단계별 경과 시간 측정"""
+
+    def __init__(self):
+        self.stages = {}
+
+    def __call__(self, name, func, *args, **kwargs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.stages[name] = round(time.perf_counter() - started, 4)
+        return result
+
+
+def run_benchmark(image_dir, excel_path, output_path, template_ppt_path=TEMPLATE_PPT, jobs=None, streaming=False,
+                  cache_dir=None):
+    """PPT 생성 단계를 하나씩 실행하며 측정합니다.
+
+    Returns:
+        측정 결과 딕셔너리
+    """
+    # 업체/슬라이드별 로그 출력이 측정 시간에 섞이지 않도록 오류만 출력
+    tracer.set_console(CONSOLE_QUIET)
+    inserter = PPTImageInserter(template_ppt_path, image_dir, output_ppt_path=output_path, excel_path=excel_path,
+                                jobs=jobs, cache_dir=cache_dir, streaming=streaming)
+    timer = StageTimer()
+    timer.stages['startup'] = measure_startup()
+
+    shop_dirs_dict = timer('scan', inserter.indexer.scan)
+    shop_order = timer('excel', inserter.load_shop_order_from_excel)
+    shop_dirs = timer('order', lambda: order_shops(shop_dirs_dict, shop_order or [])[0])
+    timer('probe', inserter.probe_images, shop_dirs)
+
+    prs, writer = timer('template', inserter.open_deck, output_path)
+
+    shop_plans = timer('plan', inserter.plan_shops, shop_dirs, prs.slide_width, prs.slide_height)
+    timer('images', inserter.preprocess_images, shop_plans)
+
+    def assemble():
+        inserter.add_title_slide(prs, "세신샵 업체 정보")
+        for shop_plan in shop_plans:
+            inserter.render_shop(prs, shop_plan)
+            if writer:
+                writer.flush()
+
+    timer('slides', assemble)
+    slide_count = inserter.deck_slide_count(prs, writer)
+    timer('save', lambda: writer.close() if writer else prs.save(output_path))
+
+    image_count = sum(len(shop_info['images']) + len(shop_info['price_images']) + bool(shop_info['naver_capture'])
+                      for shop_info in shop_dirs)
+    return {
+        'shops_found': len(shop_dirs_dict),
+        'shops': len(shop_dirs),
+        'images': image_count,
+        'slides': slide_count,
+        'stages': timer.stages,
+        'total_seconds': round(sum(timer.stages.values()), 4),
+        'peak_rss_kb': peak_rss_kb(),
+        'output_bytes': os.path.getsize(output_path),
+    }
+
+
+def run_isolated(argv, shops):
+    """업체 수 하나를 새 프로세스에서 측정합니다 (최대 메모리가 이전 측정의 영향을 받지 않도록).
+
+    Returns:
+        측정 결과 딕셔너리
+    """
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__)] + argv
+                               + ['--shops', str(shops), '--single'],
+                               stdout=subprocess.PIPE, check=True)
+    # 오류 로그도 표준 출력으로 나오므로 결과는 마지막 줄
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def parse_resolution(value):
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PPT 생성 벤치마크")
+    parser.add_argument('--shops', type=int, nargs='+', default=[10, 100], help="업체 수 (여러 개 지정 가능)")
+    parser.add_argument('--images', type=int, default=6, help="업체당 업체 이미지 수")
+    parser.add_argument('--resolution', type=parse_resolution, default=(2000, 1500), help="업체 이미지 해상도 (예: 4000x3000)")
+    parser.add_argument('--price-tables', type=int, default=2, help="업체당 가격표 수")
+    parser.add_argument('--no-capture', action='store_true', help="네이버플레이스 캡처 제외")
+    parser.add_argument('--unique-images', type=int, default=0, help="서로 다른 원본 이미지 수 (0: 전부 다름)")
+    parser.add_argument('--jobs', type=int, default=None, help="워커 프로세스 수")
+    parser.add_argument('--streaming', action='store_true', help="스트리밍 출력 사용")
+    parser.add_argument('--cache-dir', default=None, help="이미지 캐시 폴더 (기본: 사용 안 함)")
+    parser.add_argument('--work-dir', default=os.path.join(tempfile.gettempdir(), 'ppt_image_inserter_bench'),
+                        help="데이터셋/출력 폴더 (같은 설정의 데이터셋은 재사용)")
+    parser.add_argument('--output', default='bench_results.json', help="결과 JSON 파일 (기존 결과 뒤에 추가)")
+    # 내부용: 업체 수 하나를 현재 프로세스에서 측정하고 결과 JSON을 표준 출력으로 돌려줌
+    parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single:
+        shops = args.shops[0]
+        dataset_dir = os.path.join(args.work_dir, f"shops_{shops}")
+        image_dir, excel_path = os.path.join(dataset_dir, 'downloads'), os.path.join(dataset_dir, 'order.xlsx')
+        output_path = os.path.join(args.work_dir, f"output_{shops}.pptx")
+        result = run_benchmark(image_dir, excel_path, output_path, jobs=args.jobs, streaming=args.streaming,
+                               cache_dir=args.cache_dir)
+        print(json.dumps(result, ensure_ascii=False))
+        return 0
+
+    runs = []
+    child_argv = list(argv) if argv is not None else sys.argv[1:]
+    for shops in args.shops:
+        dataset_dir = os.path.join(args.work_dir, f"shops_{shops}")
+        print(f"데이터셋 준비 중: 업체 {shops}개 ({dataset_dir})", file=sys.stderr)
+        generate_dataset(
+            dataset_dir, shops, args.images, args.resolution, args.price_tables,
+            capture=not args.no_capture, unique_images=args.unique_images,
+        )
+
+        print(f"측정 중: 업체 {shops}개", file=sys.stderr)
+        result = run_isolated(child_argv, shops)
+        result['params'] = {
+            'shops': shops,
+            'images_per_shop': args.images,
+            'resolution': list(args.resolution),
+            'price_tables': args.price_tables,
+            'capture': not args.no_capture,
+            'unique_images': args.unique_images,
+            'jobs': args.jobs,
+            'streaming': args.streaming,
+            'cache': bool(args.cache_dir),
+        }
+        runs.append(result)
+        print(json.dumps(result, ensure_ascii=False), file=sys.stderr)
+
+    # 결과는 실행 기록으로 누적 (시간에 따른 비교용)
+    history = []
+    if os.path.exists(args.output):
+        with open(args.output, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+    history.append({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'runs': runs,
+    })
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(history, f, ensure_ascii=False, indent=1)
+    print(f"결과 저장: {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+덱 계획 모듈
+스캔한 업체 목록과 헤더만 읽은 이미지 크기로, 이미지를 디코딩하지 않고 전체 슬라이드 배치를 계산합니다.
+슬라이드마다 그림의 위치/크기(EMU), 원본 경로, 처리 작업, 예상 인코딩 크기를 담으며 JSON으로 저장할 수 있습니다.
+실제 생성은 이 계획대로 슬라이드를 만들므로, 업체 단위로 나누어 여러 프로세스에서 만들 수 있습니다.
+"""
+
+import os
+import json
+
+import slide_layout
+from image_processor import (
+    MODE_SQUARE, MODE_FIT, MODE_FILL, MODE_COMPOSITE, DEFAULT_DPI, DEFAULT_JPEG_QUALITY,
+    ImageTask, CompositeTask, make_task, make_composite_task, estimate_encoded_bytes,
+)
+
+# 계획 형식이 바뀌면 올립니다.
+PLAN_VERSION = 1
+
+# 업체 슬라이드 종류
+SLIDE_COVER = 'cover'    # 업체 표지 (업체명 + 네이버플레이스 캡처)
+SLIDE_PRICE = 'price'    # 가격표
+SLIDE_IMAGES = 'images'  # 업체 사진
+
+# 그림 역할 (가격표/캡처는 글자가 있는 이미지)
+ROLE_CAPTURE = 'capture'
+ROLE_PRICE = 'price'
+ROLE_PHOTO = 'photo'
+
+# 이미지 외 용량: 슬라이드 XML과 압축 파일 항목 머리글 (슬라이드당 대략)
+SLIDE_OVERHEAD_BYTES = 1024
+
+
+def picture(task, role, box, source_size=None):
+    """그림 하나의 계획. 위치/크기는 python-pptx가 기록하는 것과 같은 정수 EMU입니다."""
+    left, top, width, height = box
+    return {
+        'role': role,
+        'task': task,
+        'left': int(left),
+        'top': int(top),
+        'width': int(width),
+        'height': int(height),
+        # 헤더를 읽지 못한 이미지는 목표 크기 그대로 처리된다고 보고 추정
+        'estimated_bytes': estimate_encoded_bytes(task, *(source_size or (task.width, task.height))),
+    }
+
+
+def plan_shop(shop_info, slide_width, slide_height, dimensions, dpi=DEFAULT_DPI, quality=DEFAULT_JPEG_QUALITY,
+              composite_background=None):
+    """업체 하나의 슬라이드 계획 (업체 표지, 가격표 3개씩, 업체 사진 3개씩)
+
+    Args:
+        shop_info: 업체 정보 (name, naver_capture, price_images, images)
+        slide_width, slide_height: 슬라이드 크기 (EMU)
+        dimensions: 경로 -> EXIF 방향을 적용한 (가로, 세로) 또는 None을 돌려주는 함수 (헤더 정보)
+        dpi, quality: 삽입 이미지 해상도와 JPEG 품질
+        composite_background: 지정하면 이미지가 2-3개인 슬라이드를 합성 이미지 하나로 배치
+
+    Returns:
+        {'name', 'slides': [{'kind', 'title'(표지만), 'count', 'pictures': [...]}, ...]}
+        크기를 알 수 없는 가격표 1개/캡처는 그림에서 빠집니다.
+    """
+    slides = []
+
+    # 1. 표지 슬라이드 (업체명 + 네이버플레이스 캡처, 자르지 않고 전체 표시)
+    cover = {'kind': SLIDE_COVER, 'title': shop_info['name'], 'count': 0, 'pictures': []}
+    naver_capture = shop_info.get('naver_capture')
+    if naver_capture:
+        cover['count'] = 1
+        size = dimensions(naver_capture)
+        if size:
+            task = make_task(naver_capture, MODE_FIT, slide_layout.CAPTURE_MAX_WIDTH, slide_layout.CAPTURE_MAX_HEIGHT,
+                             dpi, quality)
+            cover['pictures'].append(picture(task, ROLE_CAPTURE, slide_layout.capture_box(slide_width, size), size))
+    slides.append(cover)
+
+    # 2. 가격표 슬라이드 (1개: 원본 비율로 중앙에 크게, 2-3개: 9:16 영역에 나란히)
+    for batch in slide_layout.batches(shop_info.get('price_images', [])):
+        pictures = []
+        if len(batch) == 1:
+            size = dimensions(batch[0])
+            if size:
+                _, _, area_width, area_height = slide_layout.price_area(slide_width, slide_height)
+                task = make_task(batch[0], MODE_FIT, area_width, area_height, dpi, quality)
+                box = slide_layout.price_single_box(slide_width, slide_height, size)
+                pictures.append(picture(task, ROLE_PRICE, box, size))
+        else:
+            boxes = slide_layout.price_multi_boxes(slide_width, slide_height, len(batch))
+            pictures = plan_batch(batch, MODE_FILL, ROLE_PRICE, boxes, dimensions, dpi, quality, composite_background)
+        slides.append({'kind': SLIDE_PRICE, 'count': len(batch), 'pictures': pictures})
+
+    # 3. 업체 사진 슬라이드 (1-3개 정사각형 크롭)
+    for batch in slide_layout.batches(shop_info.get('images', [])):
+        boxes = slide_layout.image_boxes(slide_width, slide_height, len(batch))
+        pictures = plan_batch(batch, MODE_SQUARE, ROLE_PHOTO, boxes, dimensions, dpi, quality,
+                              composite_background if len(batch) > 1 else None)
+        slides.append({'kind': SLIDE_IMAGES, 'count': len(batch), 'pictures': pictures})
+
+    return {'name': shop_info['name'], 'slides': slides}
+
+
+def plan_batch(batch, mode, role, boxes, dimensions, dpi, quality, composite_background):
+    """여러 이미지를 배치 영역에 하나씩, 또는 합성 이미지 하나로 배치하는 그림 목록"""
+    if composite_background:
+        task = make_composite_task(batch, mode, boxes, dpi, quality, composite_background)
+        return [picture(task, role, slide_layout.bounding_box(boxes))]
+    return [picture(make_task(image_path, mode, box[2], box[3], dpi, quality), role, box, dimensions(image_path))
+            for image_path, box in zip(batch, boxes)]
+
+
+def plan_deck(shop_dirs, slide_width, slide_height, dimensions, title_text, template_ppt_path=None,
+              dpi=DEFAULT_DPI, quality=DEFAULT_JPEG_QUALITY, composite_background=None):
+    """전체 덱 계획과 합계 (슬라이드 수, 그림 수, 미디어 수, 예상 출력 용량)
+
+    같은 작업(같은 원본, 같은 변환)은 PPT에 미디어 하나로 들어가므로 예상 용량에 한 번만 더합니다.
+    """
+    shops = [plan_shop(shop_info, slide_width, slide_height, dimensions, dpi, quality, composite_background)
+             for shop_info in shop_dirs]
+    plan = {
+        'version': PLAN_VERSION,
+        'title': title_text,
+        'slide_width': int(slide_width),
+        'slide_height': int(slide_height),
+        'shops': shops,
+    }
+    plan['totals'] = plan_totals(plan, os.path.getsize(template_ppt_path) if template_ppt_path else 0)
+    return plan
+
+
+def plan_pictures(shops):
+    """업체 계획 목록의 모든 그림 (슬라이드 순서)"""
+    return [picture for shop in shops for slide in shop['slides'] for picture in slide['pictures']]
+
+
+def plan_tasks(shops):
+    """업체 계획 목록에서 처리할 작업 목록 (중복 제외, 슬라이드 순서)"""
+    return list(dict.fromkeys(picture['task'] for picture in plan_pictures(shops)))
+
+
+def plan_totals(plan, template_bytes=0):
+    """계획의 슬라이드/그림/미디어 수와 예상 출력 용량"""
+    pictures = plan_pictures(plan['shops'])
+    media = {picture['task']: picture['estimated_bytes'] for picture in pictures}
+    slides = 1 + sum(len(shop['slides']) for shop in plan['shops'])
+    return {
+        'shops': len(plan['shops']),
+        'slides': slides,
+        'pictures': len(pictures),
+        'media': len(media),
+        'estimated_media_bytes': sum(media.values()),
+        'estimated_bytes': template_bytes + slides * SLIDE_OVERHEAD_BYTES + sum(media.values()),
+    }
+
+
+def task_to_json(task):
+    """처리 작업을 JSON 객체로"""
+    data = task._asdict()
+    if task.mode == MODE_COMPOSITE:
+        data['items'] = [list(item) for item in task.items]
+    return data
+
+
+def task_from_json(data):
+    """JSON 객체에서 처리 작업을 다시 만듭니다 (계획 저장 전과 같은 작업 -> 같은 캐시 키)."""
+    if data['mode'] == MODE_COMPOSITE:
+        return CompositeTask(**dict(data, items=tuple(tuple(item) for item in data['items'])))
+    return ImageTask(**data)
+
+
+def save_plan(plan, path):
+    """계획을 JSON 파일로 저장합니다."""
+    shops = [
+        dict(shop, slides=[
+            dict(slide, pictures=[dict(picture, task=task_to_json(picture['task'])) for picture in slide['pictures']])
+            for slide in shop['slides']
+        ])
+        for shop in plan['shops']
+    ]
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        # 한 번에 직렬화하여 기록 (json.dump는 작은 조각마다 write를 호출해 느림)
+        f.write(json.dumps(dict(plan, shops=shops), ensure_ascii=False))
+    os.replace(tmp_path, path)
+
+
+def load_plan(path):
+    """JSON 파일에서 계획을 읽습니다.
+
+    Raises:
+        ValueError: 계획 형식 버전이 다른 경우
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        plan = json.load(f)
+    if plan.get('version') != PLAN_VERSION:
+        raise ValueError(f"지원하지 않는 계획 형식입니다: {plan.get('version')}")
+    for picture in plan_pictures(plan['shops']):
+        picture['task'] = task_from_json(picture['task'])
+    return plan
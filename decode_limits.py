@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+디코딩 메모리 제한
+원본 한 장을 디코딩할 때 쓰는 메모리(디코딩 버퍼)를 정한 예산 이하로 유지합니다.
+JPEG는 축소 디코딩(draft)의 축소 비율을 예산에 맞게 고르고, 헤더상 픽셀 수가 지나치게 큰 이미지
+(압축 폭탄)나 축소해도 예산을 넘는 이미지, 끝이 잘린 파일은 처리하지 않고 거부 사유와 함께 보고합니다.
+워커 프로세스마다 동시에 디코딩하는 이미지는 하나이므로 워커당 최대 메모리를 예측할 수 있습니다.
+"""
+
+import os
+import json
+import math
+import shutil
+import warnings
+
+# 디코딩 버퍼 최대 용량 (바이트, 50MP RGB 사진이 약 150MB)
+DEFAULT_DECODE_MEMORY = 128 * 1024 ** 2
+
+# 헤더상 최대 픽셀 수 (넘으면 압축 폭탄으로 보고 거부)
+DEFAULT_MAX_IMAGE_PIXELS = 200_000_000
+
+# JPEG 축소 디코딩 비율 (draft가 지원하는 1/1, 1/2, 1/4, 1/8)
+DRAFT_REDUCTIONS = (1, 2, 4, 8)
+
+# Image.reduce를 지원하는 모드 (팔레트 이미지 등은 그대로 디코딩)
+REDUCE_MODES = {'L', 'LA', 'RGB', 'RGBA', 'RGBX', 'CMYK', 'I', 'F'}
+
+# 거부 사유
+REJECT_BOMB = 'bomb'            # 헤더상 픽셀 수가 최대값 초과 (압축 폭탄)
+REJECT_TOO_LARGE = 'too_large'  # 최대한 축소 디코딩해도 메모리 예산 초과
+REJECT_TRUNCATED = 'truncated'  # 파일 끝이 잘림 (다운로드 중단 등)
+
+REJECT_LABELS = {
+    REJECT_BOMB: '압축 폭탄 의심',
+    REJECT_TOO_LARGE: '메모리 예산 초과',
+    REJECT_TRUNCATED: '잘린 파일',
+}
+
+# 현재 프로세스의 제한 (set_decode_limits로 설정, 워커는 init_worker에서 전달받음)
+_decode_memory = DEFAULT_DECODE_MEMORY
+_max_image_pixels = DEFAULT_MAX_IMAGE_PIXELS
+
+
+class ImageRejected(Exception):
+    """메모리 제한이나 파일 손상으로 처리하지 않는 이미지"""
+
+    def __init__(self, path, reason, detail=''):
+        super().__init__(f"{REJECT_LABELS[reason]}: {detail}" if detail else REJECT_LABELS[reason])
+        self.path = path
+        self.reason = reason
+
+
+def set_decode_limits(decode_memory=DEFAULT_DECODE_MEMORY, max_image_pixels=DEFAULT_MAX_IMAGE_PIXELS):
+    """현재 프로세스의 디코딩 메모리 예산과 최대 픽셀 수를 설정합니다."""
+    global _decode_memory, _max_image_pixels
+    _decode_memory = decode_memory
+    _max_image_pixels = max_image_pixels
+
+
+def decode_limits():
+    """현재 프로세스의 (디코딩 메모리 예산, 최대 픽셀 수) - 워커 프로세스에 전달용"""
+    return _decode_memory, _max_image_pixels
+
+
+def open_image(source, path):
+    """이미지를 열고(헤더만 읽음) 압축 폭탄 여부를 확인합니다.
+
+    Raises:
+        ImageRejected: 헤더상 픽셀 수가 최대값 초과
+    """
+    from PIL import Image
+    # PIL 자체 검사(최대값의 2배를 넘으면 열 때 오류)도 같은 기준으로 (PIL은 이미지를 열 때 처음 불러옴)
+    Image.MAX_IMAGE_PIXELS = _max_image_pixels
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', Image.DecompressionBombWarning)
+            img = Image.open(source)
+    except (Image.DecompressionBombError, Image.DecompressionBombWarning) as e:
+        raise ImageRejected(path, REJECT_BOMB, str(e))
+
+    if img.size[0] * img.size[1] > _max_image_pixels:
+        img.close()
+        raise ImageRejected(path, REJECT_BOMB, f"{img.size[0]}x{img.size[1]}")
+    return img
+
+
+def decoded_bytes(img, reduction=1):
+    """축소 비율로 디코딩했을 때의 디코딩 버퍼 크기"""
+    width, height = -(-img.size[0] // reduction), -(-img.size[1] // reduction)
+    return width * height * len(img.getbands())
+
+
+def limit_draft(img, scale, path):
+    """목표 비율(scale)과 메모리 예산에 맞춰 디코딩 크기를 정합니다 (디코딩 전 호출).
+
+    JPEG는 목표 해상도보다 작아지지 않는 가장 큰 축소 디코딩 비율을 쓰되, 예산을 넘으면 예산 안에
+    들어오는 가장 작은 축소 비율을 씁니다. JPEG가 아니면 축소 디코딩 없이 예산만 확인합니다.
+
+    Raises:
+        ImageRejected: 최대한 축소해도 예산 초과
+    """
+    if img.format == 'JPEG':
+        needed = next((reduction for reduction in DRAFT_REDUCTIONS
+                       if decoded_bytes(img, reduction) <= _decode_memory), DRAFT_REDUCTIONS[-1])
+        if scale < 1.0 or needed > 1:
+            width, height = img.size
+            img.draft('RGB', (max(1, min(math.ceil(width * scale), width // needed)),
+                              max(1, min(math.ceil(height * scale), height // needed))))
+
+    check_decode(img, path)
+
+
+def check_decode(img, path):
+    """설정된 크기(draft 적용 후)로 디코딩했을 때 메모리 예산을 넘지 않는지 확인합니다.
+
+    Raises:
+        ImageRejected: 예산 초과
+    """
+    if decoded_bytes(img) > _decode_memory:
+        raise ImageRejected(path, REJECT_TOO_LARGE, f"{img.size[0]}x{img.size[1]}")
+
+
+def reduce_decoded(img, scale):
+    """축소 디코딩을 지원하지 않는 형식은 디코딩 직후 정수 비율로 줄여 이후 회전/크롭 사본을 작게 만듭니다.
+
+    Returns:
+        (이미지, 남은 축소 비율)
+    """
+    factor = int(1 / scale) if scale < 1.0 else 1
+    if factor < 2 or img.mode not in REDUCE_MODES:
+        return img, scale
+    reduced = img.reduce(factor)
+    return reduced, min(1.0, scale * img.size[0] / reduced.size[0])
+
+
+def is_truncated(error):
+    """디코딩 오류가 파일 끝이 잘린 경우인지 확인합니다."""
+    return isinstance(error, OSError) and 'truncated' in str(error).lower()
+
+
+def quarantine_file(image_path, base_dir, quarantine_dir):
+    """거부된 원본을 격리 폴더로 옮깁니다 (이미지 폴더 기준 상대 경로 유지, 다음 탐색에서 제외).
+
+    Returns:
+        옮긴 경로
+    """
+    try:
+        relative = os.path.relpath(image_path, base_dir)
+    except ValueError:
+        relative = os.path.basename(image_path)
+    if relative.startswith('..'):
+        relative = os.path.basename(image_path)
+    target = os.path.join(quarantine_dir, relative)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.move(image_path, target)
+    return target
+
+
+def rejection_report_path(output_ppt_path):
+    """거부된 이미지 보고서 경로"""
+    return os.path.splitext(output_ppt_path)[0] + '.rejected.json'
+
+
+def save_rejection_report(report_path, rejected):
+    """거부된 이미지 목록 ([{'path', 'reason', 'error', 'quarantined'}, ...])을 저장합니다."""
+    tmp_path = report_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'rejected': rejected}, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, report_path)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+처리된 이미지 디스크 캐시
+원본 경로/크기/수정시각과 변환 설정(처리 방식, 목표 크기, 품질)을 키로
+처리된 이미지 바이트를 저장하여, 변경되지 않은 이미지는 다시 디코딩하지 않습니다.
+"""
+
+import os
+import json
+import struct
+import hashlib
+
+from instrumentation import tracer
+
+# 캐시 형식이나 인코딩 방식이 바뀌면 올려서 이전 항목을 무효화합니다.
+CACHE_VERSION = 2
+
+# 기본 캐시 최대 용량 (2GB)
+DEFAULT_CACHE_SIZE = 2 * 1024 ** 3
+
+CACHE_SUFFIX = '.bin'
+
+# 원본 내용 해시 기록 파일 (절대 경로 -> [크기, 수정시각, SHA1])
+DIGESTS_FILE = 'digests.json'
+
+
+class ImageCache:
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            cache_dir: 캐시 디렉토리 경로 (없으면 생성)
+            max_bytes: 캐시 최대 용량 (초과 시 오래 사용하지 않은 항목부터 삭제)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def make_key(self, task):
+        """원본 파일 상태와 변환 설정으로 캐시 키를 만듭니다."""
+        items = getattr(task, 'items', None)
+        if items:
+            # 합성 작업: 합성에 쓰이는 모든 원본의 상태를 키에 포함
+            sources = []
+            for item in items:
+                stat = os.stat(item[0])
+                sources.append([os.path.abspath(item[0]), stat.st_size, stat.st_mtime_ns])
+            key_source = json.dumps([CACHE_VERSION, sources, list(task[1:])], ensure_ascii=False)
+        else:
+            stat = os.stat(task.path)
+            key_source = json.dumps([
+                CACHE_VERSION,
+                os.path.abspath(task.path),
+                stat.st_size,
+                stat.st_mtime_ns,
+                list(task[1:]),  # 처리 방식, 목표 크기, 품질
+            ], ensure_ascii=False)
+        return hashlib.sha1(key_source.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + CACHE_SUFFIX)
+
+    def get(self, task):
+        """캐시된 처리 결과를 돌려줍니다. 없으면 None을 돌려줍니다."""
+        try:
+            entry_path = self._entry_path(self.make_key(task))
+            with open(entry_path, 'rb') as f:
+                (meta_len,) = struct.unpack('>I', f.read(4))
+                meta = json.loads(f.read(meta_len).decode('utf-8'))
+                data = f.read()
+        except (OSError, ValueError, struct.error):
+            return None
+
+        # 최근 사용 시각 갱신 (LRU 삭제 기준)
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        result = {
+            'data': data,
+            'size': tuple(meta['size']),
+            'source_size': tuple(meta['source_size']),
+            'format': meta['format'],
+            'error': None,
+        }
+        if 'levels' in meta:
+            # 예산 모드에서 잰 인코딩 크기 [[해상도 비율, 품질, 바이트], ...]
+            result['levels'] = [tuple(level) for level in meta['levels']]
+        return result
+
+    def put(self, task, result):
+        """처리 결과를 캐시에 저장합니다."""
+        try:
+            entry_path = self._entry_path(self.make_key(task))
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+            meta = {
+                'size': list(result['size']),
+                'source_size': list(result['source_size']),
+                'format': result['format'],
+            }
+            if result.get('levels'):
+                meta['levels'] = [list(level) for level in result['levels']]
+            meta = json.dumps(meta).encode('utf-8')
+
+            # 여러 워커가 동시에 쓰더라도 깨진 항목이 보이지 않도록 임시 파일 후 교체
+            tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(struct.pack('>I', len(meta)))
+                f.write(meta)
+                f.write(result['data'])
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            tracer.error(f"캐시 저장 오류 ({task.path}): {e}")
+
+    def load_digests(self):
+        """기록해 둔 원본 내용 해시 (절대 경로 -> [크기, 수정시각, SHA1])를 읽습니다."""
+        try:
+            with open(os.path.join(self.cache_dir, DIGESTS_FILE), 'r', encoding='utf-8') as f:
+                digests = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return digests.get('digests', {}) if digests.get('version') == CACHE_VERSION else {}
+
+    def save_digests(self, digests):
+        """원본 내용 해시 기록을 저장합니다 (임시 파일에 쓴 뒤 교체)."""
+        digests_path = os.path.join(self.cache_dir, DIGESTS_FILE)
+        try:
+            tmp_path = f"{digests_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'digests': digests}, f, ensure_ascii=False)
+            os.replace(tmp_path, digests_path)
+        except OSError as e:
+            tracer.error(f"해시 기록 저장 오류: {e}")
+
+    def record(self, hit):
+        """적중/실패 횟수를 기록합니다."""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def evict(self):
+        """최대 용량을 넘으면 오래 사용하지 않은 항목부터 삭제합니다.
+
+        Returns:
+            삭제한 항목 수
+        """
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(CACHE_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def summary(self):
+        """적중률 요약 문자열"""
+        lookups = self.hits + self.misses
+        rate = (self.hits / lookups * 100) if lookups else 0
+        return f"캐시 적중 {self.hits}회, 미스 {self.misses}회 (적중률 {rate:.0f}%)"
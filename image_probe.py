@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+이미지 메타데이터 프로브
+JPEG SOF / PNG IHDR 헤더와 EXIF 방향 정보(JPEG APP1, PNG eXIf)만 읽어 이미지 크기를 확인합니다.
+이미지를 디코딩하지 않으므로 스캔 직후 전체 이미지를 스레드 풀로 한 번에 조회할 수 있습니다.
+"""
+
+import struct
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# width, height: 파일에 저장된 픽셀 크기 / orientation: EXIF 방향 (1 = 회전 없음)
+ImageInfo = namedtuple('ImageInfo', ['width', 'height', 'orientation'])
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# 크기 정보를 담은 JPEG SOF 마커 (DHT/JPG/DAC 제외)
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# 가로/세로가 바뀌는 EXIF 방향 (90도/270도 회전)
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+
+def display_size(info):
+    """EXIF 방향을 적용한 실제 표시 크기 (가로, 세로)"""
+    if info.orientation in TRANSPOSED_ORIENTATIONS:
+        return info.height, info.width
+    return info.width, info.height
+
+
+def exif_orientation(tiff):
+    """EXIF(TIFF) 블록의 IFD0에서 방향 태그를 찾습니다."""
+    try:
+        if tiff[:2] == b'II':
+            endian = '<'
+        elif tiff[:2] == b'MM':
+            endian = '>'
+        else:
+            return 1
+
+        (ifd_offset,) = struct.unpack(endian + 'I', tiff[4:8])
+        (count,) = struct.unpack(endian + 'H', tiff[ifd_offset:ifd_offset + 2])
+        for i in range(count):
+            entry = ifd_offset + 2 + i * 12
+            tag, _, _ = struct.unpack(endian + 'HHI', tiff[entry:entry + 8])
+            if tag == EXIF_ORIENTATION_TAG:
+                (orientation,) = struct.unpack(endian + 'H', tiff[entry + 8:entry + 10])
+                return orientation if 1 <= orientation <= 8 else 1
+    except struct.error:
+        pass
+    return 1
+
+
+def exif_block_orientation(data):
+    """EXIF 블록에서 방향을 읽습니다 (PNG eXIf / PIL info['exif'], 'Exif\\0\\0' 접두어는 있어도 없어도 됨)."""
+    return exif_orientation(data[6:] if data[:6] == b'Exif\x00\x00' else data)
+
+
+def probe_jpeg(f):
+    """JPEG 마커를 따라가며 SOF 세그먼트에서 크기를, APP1(Exif)에서 방향을 읽습니다."""
+    orientation = 1
+    while True:
+        # 다음 마커까지 이동 (0xFF 채움 바이트 건너뜀)
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+
+        marker = byte[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            continue  # 길이가 없는 마커
+        if marker in (0xD9, 0xDA):
+            return None  # 크기 정보 없이 이미지 데이터 시작/끝
+
+        (length,) = struct.unpack('>H', f.read(2))
+        if marker in SOF_MARKERS:
+            _, height, width = struct.unpack('>BHH', f.read(5))
+            return ImageInfo(width, height, orientation)
+        if marker == 0xE1:
+            segment = f.read(length - 2)
+            if segment[:6] == b'Exif\x00\x00':
+                orientation = exif_orientation(segment[6:])
+        else:
+            f.seek(length - 2, 1)
+
+
+def probe_with_pil(image_path):
+    """JPEG/PNG 외 형식은 PIL로 헤더만 읽습니다."""
+    from PIL import Image
+    with Image.open(image_path) as img:
+        orientation = img.getexif().get(EXIF_ORIENTATION_TAG, 1)
+        return ImageInfo(img.size[0], img.size[1], orientation)
+
+
+def probe_png(f, width, height):
+    """IHDR 다음 청크부터 첫 IDAT 전까지 eXIf 청크를 찾아 방향을 읽습니다 (f는 IHDR 청크 끝 위치)."""
+    orientation = 1
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        length, chunk_type = struct.unpack('>I4s', header)
+        if chunk_type in (b'IDAT', b'IEND'):
+            break
+        if chunk_type == b'eXIf':
+            # 일부 프로그램은 JPEG APP1처럼 'Exif\0\0'을 앞에 붙여 저장
+            orientation = exif_block_orientation(f.read(length))
+            break
+        f.seek(length + 4, 1)  # 데이터 + CRC
+    return ImageInfo(width, height, orientation)
+
+
+def probe_image(image_path):
+    """이미지 헤더만 읽어 ImageInfo를 돌려줍니다."""
+    with open(image_path, 'rb') as f:
+        head = f.read(24)
+        if head[:8] == PNG_SIGNATURE and head[12:16] == b'IHDR':
+            width, height = struct.unpack('>II', head[16:24])
+            (ihdr_length,) = struct.unpack('>I', head[8:12])
+            f.seek(16 + ihdr_length + 4)
+            return probe_png(f, width, height)
+        if head[:2] == b'\xff\xd8':
+            f.seek(2)
+            info = probe_jpeg(f)
+            if info:
+                return info
+    return probe_with_pil(image_path)
+
+
+def probe_images(image_paths, jobs=None):
+    """여러 이미지의 헤더를 스레드 풀로 한 번에 조회합니다 (I/O 위주 작업).
+
+    Returns:
+        (경로 -> ImageInfo, 경로 -> 오류 메시지)
+    """
+    def probe(image_path):
+        try:
+            return image_path, probe_image(image_path), None
+        except Exception as e:
+            return image_path, None, str(e)
+
+    table = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for image_path, info, error in executor.map(probe, image_paths):
+            if info:
+                table[image_path] = info
+            else:
+                errors[image_path] = error
+    return table, errors
@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+이미지 전처리 모듈
+업체 이미지의 로드/크롭/리사이즈/인코딩을 프로세스 풀에서 병렬로 수행하고,
+슬라이드에 바로 삽입할 수 있는 바이트 버퍼를 돌려줍니다.
+"""
+
+import os
+import io
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import slide_layout
+from instrumentation import tracer
+from image_cache import ImageCache, DEFAULT_CACHE_SIZE
+from image_probe import EXIF_ORIENTATION_TAG, TRANSPOSED_ORIENTATIONS, exif_block_orientation
+from decode_limits import (
+    REJECT_TRUNCATED, ImageRejected, set_decode_limits, decode_limits, open_image, limit_draft, reduce_decoded,
+    is_truncated,
+)
+
+# 처리 방식
+MODE_SQUARE = 'square'  # 중앙 기준 정사각형 크롭 (업체_*.jpg)
+MODE_FIT = 'fit'        # 원본 비율 유지, 영역 안에 맞춤 (가격표 1개, 네이버플레이스 캡처)
+MODE_FILL = 'fill'      # 원본 비율 유지, 영역을 덮는 해상도 (가격표 2-3개, 9:16 영역에 늘려 배치)
+MODE_COMPOSITE = 'composite'  # 슬라이드 한 장의 이미지 여러 개를 하나로 합성 (합성 모드)
+
+# 합성 이미지 기본 배경색 (이미지 사이 간격)
+DEFAULT_COMPOSITE_BACKGROUND = '#ffffff'
+
+# 기본 출력 해상도 및 JPEG 품질
+DEFAULT_DPI = 150
+DEFAULT_JPEG_QUALITY = 85
+
+EMU_PER_INCH = 914400
+
+# 인코딩 크기 추정용 픽셀당 바이트 (사진: 기본 JPEG 품질 기준, 스크린샷: PNG)
+JPEG_BYTES_PER_PIXEL = 0.35
+PNG_BYTES_PER_PIXEL = 1.2
+
+# 워커 프로세스별 캐시 (init_worker에서 설정)
+_worker_cache = None
+
+# 이미지 작업: 경로, 처리 방식, 목표 픽셀 크기(가로, 세로), JPEG 품질
+ImageTask = namedtuple('ImageTask', ['path', 'mode', 'width', 'height', 'quality'])
+
+# 합성 작업: 대표 경로(첫 이미지), MODE_COMPOSITE, 합성 이미지 픽셀 크기, JPEG 품질,
+# 배치 항목 ((경로, 처리 방식, 왼쪽, 위, 가로, 세로) 픽셀 단위), 배경색
+CompositeTask = namedtuple('CompositeTask', ['path', 'mode', 'width', 'height', 'quality', 'items', 'background'])
+
+
+def emu_to_pixels(emu, dpi):
+    """EMU 길이를 주어진 DPI의 픽셀 수로 변환합니다."""
+    return max(1, int(round(emu / EMU_PER_INCH * dpi)))
+
+
+def make_task(image_path, mode, width, height, dpi=DEFAULT_DPI, quality=DEFAULT_JPEG_QUALITY):
+    """배치 크기(EMU)로부터 이미지 작업을 만듭니다."""
+    return ImageTask(image_path, mode, emu_to_pixels(width, dpi), emu_to_pixels(height, dpi), quality)
+
+
+def parse_color(value):
+    """합성 배경색 문자열('#ffffff', 'white', 'rgb(255,255,255)' 등)이 PIL에서 쓸 수 있는지 확인합니다.
+
+    Returns:
+        입력한 문자열 그대로 (설정/매니페스트에 기록)
+    """
+    from PIL import ImageColor
+    ImageColor.getrgb(value)  # 알 수 없는 색이면 ValueError
+    return value
+
+
+def make_composite_task(image_paths, mode, boxes, dpi=DEFAULT_DPI, quality=DEFAULT_JPEG_QUALITY,
+                        background=DEFAULT_COMPOSITE_BACKGROUND):
+    """슬라이드 배치 영역(EMU) 목록으로 합성 작업을 만듭니다. 합성 이미지는 영역 전체를 감싸는 크기입니다."""
+    left, top, width, height = slide_layout.bounding_box(boxes)
+
+    def offset(emu):
+        return int(round(emu / EMU_PER_INCH * dpi))
+
+    items = tuple(
+        (image_path, mode, offset(box_left - left), offset(box_top - top),
+         emu_to_pixels(box_width, dpi), emu_to_pixels(box_height, dpi))
+        for image_path, (box_left, box_top, box_width, box_height) in zip(image_paths, boxes)
+    )
+    # 반올림 오차로 마지막 이미지가 잘리지 않도록 합성 크기를 맞춤
+    canvas_width = max(emu_to_pixels(width, dpi), max(item[2] + item[4] for item in items))
+    canvas_height = max(emu_to_pixels(height, dpi), max(item[3] + item[5] for item in items))
+    return CompositeTask(image_paths[0], MODE_COMPOSITE, canvas_width, canvas_height, quality, items, background)
+
+
+def task_sources(task):
+    """작업이 읽는 원본 파일 경로 목록"""
+    if task.mode == MODE_COMPOSITE:
+        return [item[0] for item in task.items]
+    return [task.path]
+
+
+def scaled_task(task, scale, quality):
+    """해상도 비율과 품질을 적용한 작업 (합성 작업은 배치 항목 좌표도 함께 축소)"""
+    if scale == 1.0:
+        return task._replace(quality=quality)
+
+    def resize(value):
+        return max(1, round(value * scale))
+
+    if task.mode == MODE_COMPOSITE:
+        items = tuple((path, mode, round(left * scale), round(top * scale), resize(width), resize(height))
+                      for path, mode, left, top, width, height in task.items)
+        return CompositeTask(task.path, task.mode,
+                             max(resize(task.width), max(item[2] + item[4] for item in items)),
+                             max(resize(task.height), max(item[3] + item[5] for item in items)),
+                             quality, items, task.background)
+    return task._replace(width=resize(task.width), height=resize(task.height), quality=quality)
+
+
+def crop_to_square(img):
+    """PIL 이미지를 중앙 기준 정사각형으로 크롭합니다."""
+    width, height = img.size
+
+    # 정사각형 크기 결정 (짧은 쪽 기준)
+    size = min(width, height)
+
+    # 중앙 크롭 좌표 계산
+    left = (width - size) // 2
+    top = (height - size) // 2
+
+    return img.crop((left, top, left + size, top + size))
+
+
+def target_scale(task, width, height):
+    """원본 크기에 대한 축소 비율을 계산합니다 (확대는 하지 않음)."""
+    if task.mode == MODE_SQUARE:
+        scale = task.width / min(width, height)
+    elif task.mode == MODE_FIT:
+        scale = min(task.width / width, task.height / height)
+    else:
+        scale = max(task.width / width, task.height / height)
+    return min(scale, 1.0)
+
+
+def output_size(task, width, height):
+    """원본 크기(EXIF 방향 적용)로부터 처리 후 픽셀 크기를 계산합니다."""
+    if task.mode == MODE_COMPOSITE:
+        return task.width, task.height
+    scale = target_scale(task, width, height)
+    if task.mode == MODE_SQUARE:
+        size = max(1, round(min(width, height) * scale))
+        return size, size
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def estimate_encoded_bytes(task, width, height):
+    """디코딩 없이 처리 후 인코딩 크기를 대략 추정합니다."""
+    out_width, out_height = output_size(task, width, height)
+    if task.path.lower().endswith('.png') and task.mode != MODE_COMPOSITE:
+        bytes_per_pixel = PNG_BYTES_PER_PIXEL
+    else:
+        bytes_per_pixel = JPEG_BYTES_PER_PIXEL * task.quality / DEFAULT_JPEG_QUALITY
+    return int(out_width * out_height * bytes_per_pixel)
+
+
+def encode_image(img, source_format, quality):
+    """사진은 JPEG, 스크린샷(PNG 원본)은 PNG로 인코딩합니다."""
+    img_byte_arr = io.BytesIO()
+    if source_format == 'PNG':
+        img.save(img_byte_arr, format='PNG')
+        return img_byte_arr.getvalue(), 'PNG'
+
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    img.save(img_byte_arr, format='JPEG', quality=quality, optimize=True)
+    return img_byte_arr.getvalue(), 'JPEG'
+
+
+def source_orientation(img):
+    """디코딩 전에 EXIF 방향을 읽습니다.
+
+    PNG 등은 getexif()가 이미지 전체를 디코딩하므로 (메모리 예산 확인 전) 열 때 읽은 info['exif']만 사용합니다.
+    """
+    if img.format in ('JPEG', 'MPO'):
+        return img.getexif().get(EXIF_ORIENTATION_TAG, 1)
+    exif = img.info.get('exif')
+    return exif_block_orientation(exif) if exif else 1
+
+
+def load_image(task, trace, source=None):
+    """원본을 디코딩하여 EXIF 방향 적용, 크롭, 축소까지 마친 PIL 이미지를 돌려줍니다.
+
+    source에 미리 읽어 둔 원본 바이트를 주면 파일을 다시 읽지 않습니다.
+    디코딩 버퍼는 decode_limits의 메모리 예산 이하로 유지합니다.
+
+    Returns:
+        (PIL 이미지, 원본 형식, EXIF 방향을 적용한 원본 크기)
+
+    Raises:
+        ImageRejected: 압축 폭탄 의심, 메모리 예산 초과, 잘린 파일
+    """
+    from PIL import Image, ImageOps
+    started = time.perf_counter()
+    with open_image(io.BytesIO(source) if source is not None else task.path, task.path) as img:
+        source_format = img.format
+
+        try:
+            # 휴대폰 사진은 EXIF 방향대로 회전된 크기를 기준으로 계산
+            transposed = source_orientation(img) in TRANSPOSED_ORIENTATIONS
+            width, height = img.size[::-1] if transposed else img.size
+            source_size = (width, height)
+            scale = target_scale(task, width, height)
+
+            # JPEG는 축소 디코딩(draft)으로 필요한 해상도 근처까지만 (메모리 예산을 넘으면 더 작게) 디코딩
+            limit_draft(img, scale, task.path)
+            # draft 이후 실제 디코딩된 크기 기준으로 비율 재계산
+            width, height = img.size[::-1] if transposed else img.size
+            scale = target_scale(task, width, height)
+
+            img.load()
+        except OSError as e:
+            if is_truncated(e):
+                raise ImageRejected(task.path, REJECT_TRUNCATED, str(e))
+            raise
+        # 축소 디코딩이 안 되는 형식(PNG 등)은 회전/크롭 전에 정수 비율로 먼저 축소
+        img, scale = reduce_decoded(img, scale)
+        mark = time.perf_counter()
+        trace.append(('decode', started, mark))
+
+        # EXIF 방향 적용 (세로 사진이 옆으로 눕지 않도록)
+        img = ImageOps.exif_transpose(img)
+
+        if task.mode == MODE_SQUARE:
+            img = crop_to_square(img)
+
+        if scale < 1.0:
+            new_size = (max(1, round(img.size[0] * scale)), max(1, round(img.size[1] * scale)))
+            img = img.resize(new_size, Image.LANCZOS)
+        trace.append(('crop', mark, time.perf_counter()))
+
+    return img, source_format, source_size
+
+
+def process_image(task, sources=None):
+    """이미지 작업 하나를 처리합니다. (워커 프로세스에서 실행)
+
+    Args:
+        task: ImageTask 또는 CompositeTask
+        sources: 미리 읽어 둔 원본 경로 -> 바이트 (없으면 파일에서 직접 읽음)
+
+    Returns:
+        (task, 결과) 튜플. 결과는 {'data', 'size', 'source_size', 'format', 'error', 'trace', 'bytes_read'}
+        딕셔너리입니다. source_size는 EXIF 방향을 적용한 원본 크기, trace는 (단계, 시작, 끝) 구간 목록입니다.
+    """
+    if task.mode == MODE_COMPOSITE:
+        return composite_image(task, sources)
+
+    trace = []
+    started = time.perf_counter()
+    try:
+        source = sources.get(task.path) if sources else None
+        bytes_read = len(source) if source is not None else os.path.getsize(task.path)
+        img, source_format, source_size = load_image(task, trace, source)
+
+        mark = time.perf_counter()
+        data, output_format = encode_image(img, source_format, task.quality)
+        trace.append(('encode', mark, time.perf_counter()))
+        return task, {
+            'data': data,
+            'size': img.size,
+            'source_size': source_size,
+            'format': output_format,
+            'error': None,
+            'trace': trace,
+            'bytes_read': bytes_read,
+        }
+
+    except Exception as e:
+        trace.append(('failed', started, time.perf_counter()))
+        return task, {'data': None, 'size': None, 'source_size': None, 'format': None, 'error': str(e),
+                      'rejected': rejection(e), 'trace': trace, 'bytes_read': 0}
+
+
+def compose_canvas(task, trace, sources=None):
+    """합성 작업의 이미지들을 배치 영역 크기에 정확히 맞춰(정사각형 크롭 또는 영역 채우기) 배경 위에 붙입니다.
+
+    Returns:
+        (합성된 RGB 이미지, 읽은 원본 바이트 수)
+    """
+    from PIL import Image
+    canvas = Image.new('RGB', (task.width, task.height), task.background)
+    bytes_read = 0
+    for path, mode, left, top, width, height in task.items:
+        source = sources.get(path) if sources else None
+        bytes_read += len(source) if source is not None else os.path.getsize(path)
+        img, _, _ = load_image(ImageTask(path, mode, width, height, task.quality), trace, source)
+        if img.size != (width, height):
+            img = img.resize((width, height), Image.LANCZOS)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        canvas.paste(img, (left, top))
+    return canvas, bytes_read
+
+
+def composite_image(task, sources=None):
+    """슬라이드 한 장의 이미지 1-3개를 간격을 포함한 하나의 JPEG로 합성합니다. (워커 프로세스에서 실행)"""
+    trace = []
+    started = time.perf_counter()
+    try:
+        canvas, bytes_read = compose_canvas(task, trace, sources)
+
+        mark = time.perf_counter()
+        data, output_format = encode_image(canvas, 'JPEG', task.quality)
+        trace.append(('encode', mark, time.perf_counter()))
+        return task, {
+            'data': data,
+            'size': canvas.size,
+            'source_size': canvas.size,
+            'format': output_format,
+            'error': None,
+            'trace': trace,
+            'bytes_read': bytes_read,
+        }
+
+    except Exception as e:
+        trace.append(('failed', started, time.perf_counter()))
+        return task, {'data': None, 'size': None, 'source_size': None, 'format': None, 'error': str(e),
+                      'rejected': rejection(e), 'trace': trace, 'bytes_read': 0}
+
+
+def rejection(error):
+    """처리 오류가 거부된 이미지이면 {'path', 'reason'}, 아니면 None"""
+    if isinstance(error, ImageRejected):
+        return {'path': error.path, 'reason': error.reason}
+    return None
+
+
+def init_worker(cache_dir=None, cache_size=DEFAULT_CACHE_SIZE, limits=None):
+    """워커 프로세스 초기화: 디스크 캐시를 열고 디코딩 메모리 제한을 설정합니다."""
+    global _worker_cache
+    _worker_cache = ImageCache(cache_dir, cache_size) if cache_dir else None
+    if limits:
+        set_decode_limits(*limits)
+
+
+def worker_initargs(cache=None):
+    """init_worker 인자: 현재 프로세스의 캐시 설정과 디코딩 메모리 제한"""
+    if cache:
+        return cache.cache_dir, cache.max_bytes, decode_limits()
+    return None, DEFAULT_CACHE_SIZE, decode_limits()
+
+
+def cached_result(task, cache):
+    """캐시에 있는 처리 결과를 돌려줍니다. 없으면 None을 돌려줍니다."""
+    started = time.perf_counter()
+    result = cache.get(task)
+    if result:
+        result['cached'] = True
+        result['pid'] = os.getpid()
+        result['trace'] = [('cache_read', started, time.perf_counter())]
+        result['bytes_read'] = len(result['data'])
+    return result
+
+
+def process_image_cached(task, cache=None):
+    """캐시를 먼저 확인하고, 없으면 처리한 뒤 캐시에 저장합니다.
+
+    결과 딕셔너리의 'cached' 값으로 캐시 적중 여부를 알려줍니다.
+    결과에는 처리한 프로세스 번호('pid')도 담아 계측 구간을 워커별로 구분할 수 있게 합니다.
+    """
+    cache = cache or _worker_cache
+    if cache:
+        result = cached_result(task, cache)
+        if result:
+            return task, result
+
+    task, result = process_image(task)
+    if cache and not result['error']:
+        cache.put(task, result)
+    result['cached'] = False
+    result['pid'] = os.getpid()
+    return task, result
+
+
+def measure_image(task, points, cache=None):
+    """예산 모드: 작업을 한 번 디코딩하여 (해상도 비율, 품질) 조합별 인코딩 크기를 잽니다. (워커 프로세스에서 실행)
+
+    task.quality로 인코딩한 결과는 잰 크기와 함께, 다른 조합으로 인코딩한 결과는 그 조합을 적용한 작업(scaled_task)의
+    키로 캐시에 저장하여, 예산 배분에서 잰 조합이 선택된 이미지는 최종 처리 때 다시 디코딩하지 않습니다.
+    PNG(스크린샷)는 품질과 무관하므로 비율마다 한 번만 인코딩합니다.
+
+    Args:
+        task: ImageTask 또는 CompositeTask
+        points: 잴 (해상도 비율, 품질) 목록
+
+    Returns:
+        (task, {'levels': (비율, 품질) -> 바이트, 'size', 'error', 'trace', 'bytes_read', 'cached', 'pid'})
+    """
+    from PIL import Image
+    cache = cache or _worker_cache
+    started = time.perf_counter()
+    if cache:
+        result = cache.get(task)
+        levels = {(scale, quality): size for scale, quality, size in result.get('levels', ())} if result else {}
+        if all(point in levels for point in points):
+            return task, {'levels': levels, 'size': result['size'], 'error': None, 'bytes_read': 0,
+                          'trace': [('cache_read', started, time.perf_counter())], 'cached': True, 'pid': os.getpid()}
+
+    trace = []
+    try:
+        if task.mode == MODE_COMPOSITE:
+            img, bytes_read = compose_canvas(task, trace)
+            source_format, source_size = 'JPEG', (task.width, task.height)
+        else:
+            bytes_read = os.path.getsize(task.path)
+            img, source_format, source_size = load_image(task, trace)
+
+        mark = time.perf_counter()
+        data, output_format = encode_image(img, source_format, task.quality)
+        # (비율, 품질) -> (인코딩 결과, 이미지 크기)
+        encoded = {(1.0, task.quality): (data, img.size)}
+        for scale in sorted({scale for scale, _ in points}, reverse=True):
+            scaled = img
+            if scale != 1.0:
+                scaled = img.resize((max(1, round(img.size[0] * scale)), max(1, round(img.size[1] * scale))),
+                                    Image.LANCZOS)
+            for quality in sorted({quality for point_scale, quality in points if point_scale == scale}):
+                if (scale, quality) in encoded:
+                    continue
+                if output_format == 'PNG' and (scale, task.quality) in encoded:
+                    encoded[(scale, quality)] = encoded[(scale, task.quality)]
+                    continue
+                encoded[(scale, quality)] = (encode_image(scaled, source_format, quality)[0], scaled.size)
+        levels = {point: len(level_data) for point, (level_data, _) in encoded.items()}
+        trace.append(('measure', mark, time.perf_counter()))
+
+        if cache:
+            cache.put(task, {'data': data, 'size': img.size, 'source_size': source_size, 'format': output_format,
+                             'levels': [(scale, quality, size) for (scale, quality), size in sorted(levels.items())]})
+            for (scale, quality), (level_data, size) in encoded.items():
+                if (scale, quality) != (1.0, task.quality):
+                    cache.put(scaled_task(task, scale, quality), {'data': level_data, 'size': size,
+                                                                   'source_size': source_size, 'format': output_format})
+        return task, {'levels': levels, 'size': img.size, 'error': None, 'trace': trace, 'bytes_read': bytes_read,
+                      'cached': False, 'pid': os.getpid()}
+
+    except Exception as e:
+        trace.append(('failed', started, time.perf_counter()))
+        return task, {'levels': None, 'size': None, 'error': str(e), 'rejected': rejection(e), 'trace': trace,
+                      'bytes_read': 0, 'cached': False, 'pid': os.getpid()}
+
+
+def read_sources(task):
+    """작업의 원본 파일을 바이트로 읽습니다. (파이프라인의 입출력 스레드에서 실행)
+
+    Returns:
+        경로 -> 바이트
+    """
+    sources = {}
+    for path in task_sources(task):
+        with open(path, 'rb') as f:
+            sources[path] = f.read()
+    return sources
+
+
+def process_prefetched(task, sources):
+    """미리 읽어 둔 원본 바이트로 작업을 처리하고 캐시에 저장합니다. (워커 프로세스에서 실행)"""
+    task, result = process_image(task, sources)
+    if _worker_cache and not result['error']:
+        _worker_cache.put(task, result)
+    result['cached'] = False
+    result['pid'] = os.getpid()
+    return task, result
+
+
+def record_result(task, result, cache=None):
+    """처리 결과의 계측 구간과 카운터(읽은/인코딩한 바이트, 캐시 적중, 실패)를 기록합니다. (메인 프로세스)"""
+    tracer.add_spans(result.pop('trace', ()), pid=result.get('pid'), args={'file': os.path.basename(task.path)})
+    tracer.count('bytes_read', result.get('bytes_read', 0))
+    if result['error']:
+        tracer.count('image_failures')
+    else:
+        tracer.count('bytes_encoded', len(result['data']))
+
+    if cache:
+        cache.record(result['cached'])
+        tracer.count('cache_hits' if result['cached'] else 'cache_misses')
+
+
+def preprocess_images(tasks, jobs=None, cache=None):
+    """이미지 작업들을 병렬로 처리합니다.
+
+    Args:
+        tasks: ImageTask 목록
+        jobs: 워커 프로세스 수 (None이면 CPU 코어 수, 1이면 현재 프로세스에서 순차 처리)
+        cache: ImageCache (있으면 캐시를 먼저 확인하고, 적중/실패 횟수를 기록)
+
+    처리 결과의 계측 구간과 카운터는 record_result로 기록합니다.
+
+    Returns:
+        task -> 결과 딕셔너리
+    """
+    if not tasks:
+        return {}
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(tasks)))
+
+    if jobs == 1:
+        results = dict(process_image_cached(task, cache) for task in tasks)
+    else:
+        # 작업이 많을 때 프로세스 간 통신 비용을 줄이기 위해 묶어서 전달
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        initargs = worker_initargs(cache)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=initargs) as executor:
+            results = dict(executor.map(process_image_cached, tasks, chunksize=chunksize))
+
+    for task, result in results.items():
+        record_result(task, result, cache)
+    return results
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+증분 빌드 모듈
+업체별 입력 파일 상태(경로, 크기, 수정시각, 해시)와 생성된 슬라이드 범위를
+매니페스트로 저장해 두고, 다시 실행할 때 변경되지 않은 업체의 슬라이드를
+이전 출력 파일에서 그대로 복사합니다.
+"""
+
+import os
+import io
+import copy
+import json
+import hashlib
+
+from instrumentation import tracer
+
+# 매니페스트 형식이나 슬라이드 레이아웃 계산이 바뀌면 올려서 전체 재생성을 유도합니다.
+MANIFEST_VERSION = 2
+
+
+def manifest_path_for(output_ppt_path):
+    """출력 PPT 옆에 저장되는 매니페스트 파일 경로"""
+    return output_ppt_path + '.manifest.json'
+
+
+def file_sha1(path, chunk_size=1024 * 1024):
+    """파일 내용의 SHA1 해시"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_state(path, previous=None):
+    """파일 상태를 기록합니다. 크기와 수정시각이 이전과 같으면 해시를 다시 계산하지 않습니다."""
+    stat = os.stat(path)
+    if previous and previous['size'] == stat.st_size and previous['mtime_ns'] == stat.st_mtime_ns:
+        return dict(previous)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': file_sha1(path)}
+
+
+def shop_input_files(shop_info):
+    """업체 슬라이드에 사용되는 입력 파일 목록 (슬라이드 배치 순서)"""
+    files = []
+    if shop_info.get('naver_capture'):
+        files.append(shop_info['naver_capture'])
+    files.extend(shop_info.get('price_images', []))
+    files.extend(shop_info.get('images', []))
+    return files
+
+
+def shop_state(shop_info, previous_shop=None):
+    """업체 입력 파일들의 현재 상태 [[경로, 상태], ...]"""
+    previous_files = dict(previous_shop['files']) if previous_shop else {}
+    return [[path, file_state(path, previous_files.get(path))] for path in shop_input_files(shop_info)]
+
+
+def is_unchanged(files, previous_shop):
+    """입력 파일 구성(경로, 순서)과 내용(해시)이 이전 실행과 같은지 확인합니다."""
+    if not previous_shop:
+        return False
+    current = [(path, state['sha1']) for path, state in files]
+    previous = [(path, state['sha1']) for path, state in previous_shop['files']]
+    return current == previous
+
+
+def build_settings(template_ppt_path, dpi, jpeg_quality, **options):
+    """출력 결과에 영향을 주는 설정 (바뀌면 모든 업체를 다시 생성)
+
+    options에는 유사 이미지 제외, 합성 모드처럼 출력에 영향을 주는 선택 기능을 넘깁니다.
+    """
+    stat = os.stat(template_ppt_path)
+    settings = {
+        'version': MANIFEST_VERSION,
+        'template': [os.path.abspath(template_ppt_path), stat.st_size, stat.st_mtime_ns],
+        'dpi': dpi,
+        'jpeg_quality': jpeg_quality,
+    }
+    # 선택 기능은 켜져 있을 때만 기록 (기존 매니페스트와 호환)
+    settings.update((name, value) for name, value in options.items() if value is not None)
+    return settings
+
+
+def output_state(output_ppt_path, slide_count):
+    """매니페스트가 설명하는 출력 파일의 상태 (크기, 수정시각, 슬라이드 수)"""
+    stat = os.stat(output_ppt_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'slide_count': slide_count}
+
+
+def output_matches(manifest, output_ppt_path):
+    """출력 파일이 매니페스트를 저장한 뒤 다른 실행으로 덮어쓰이거나 바뀌지 않았는지 (크기, 수정시각) 확인합니다."""
+    recorded = manifest.get('output')
+    try:
+        stat = os.stat(output_ppt_path)
+    except OSError:
+        return False
+    return bool(recorded) and (recorded['size'], recorded['mtime_ns']) == (stat.st_size, stat.st_mtime_ns)
+
+
+def remove_manifest(output_ppt_path):
+    """출력 파일을 증분 모드가 아닌 실행으로 덮어쓸 때 더 이상 맞지 않는 매니페스트를 지웁니다."""
+    try:
+        os.remove(manifest_path_for(output_ppt_path))
+    except FileNotFoundError:
+        pass
+
+
+def load_manifest(manifest_path, settings):
+    """이전 매니페스트를 읽습니다. 없거나 설정이 다르면 None을 돌려줍니다."""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get('settings') != settings:
+        tracer.info("증분 모드: 설정 또는 템플릿이 변경되어 전체를 다시 생성합니다.")
+        return None
+    return manifest
+
+
+def save_manifest(manifest_path, settings, shops, output=None):
+    """매니페스트를 저장합니다 (임시 파일에 쓴 뒤 교체).
+
+    Args:
+        output: 저장한 출력 파일의 output_state (다음 실행에서 출력 파일이 그대로인지 확인)
+    """
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'settings': settings, 'shops': shops, 'output': output}, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, manifest_path)
+
+
+def copy_slide(src_slide, prs, slide_layout):
+    """다른 프레젠테이션의 슬라이드를 복사합니다 (텍스트 상자와 그림).
+
+    그림은 이미 인코딩된 바이트를 그대로 다시 연결하므로 이미지를 디코딩하지 않습니다.
+    """
+    # python-pptx는 증분 모드에서 슬라이드를 복사할 때만 불러옴 (시작 시간 단축)
+    from pptx.enum.shapes import MSO_SHAPE_TYPE
+    from pptx.oxml.ns import qn
+
+    slide = prs.slides.add_slide(slide_layout)
+    sp_tree = slide.shapes._spTree
+
+    for shape in src_slide.shapes:
+        element = copy.deepcopy(shape._element)
+
+        if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+            _, rId = slide.part.get_or_add_image_part(io.BytesIO(shape.image.blob))
+            for blip in element.iter(qn('a:blip')):
+                blip.set(qn('r:embed'), rId)
+
+        sp_tree.insert_element_before(element, 'p:extLst')
+
+    return slide
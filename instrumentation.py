@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+실행 계측
+단계별 구간(스캔, 엑셀 로드, 이미지 디코딩/크롭/인코딩, 슬라이드 배치, 저장) 시간과
+카운터(읽은/쓴 바이트, 캐시 적중, 실패)를 기록하고, Chrome 트레이스 JSON과 요약 표로 내보냅니다.
+콘솔 로그도 여기서 출력 수준에 따라 걸러, 대량 실행 시 콘솔 출력이 병목이 되지 않게 합니다.
+"""
+
+import os
+import json
+import time
+import threading
+import contextlib
+from collections import defaultdict
+
+# 콘솔 출력 모드
+CONSOLE_VERBOSE = 'verbose'  # 업체/슬라이드별 상세 로그 (기존 출력)
+CONSOLE_SUMMARY = 'summary'  # 단계별 요약과 오류만
+CONSOLE_QUIET = 'quiet'      # 오류만
+CONSOLE_MODES = [CONSOLE_VERBOSE, CONSOLE_SUMMARY, CONSOLE_QUIET]
+
+# 로그 수준 (값이 작을수록 중요)
+LEVEL_ERROR = 0
+LEVEL_SUMMARY = 1
+LEVEL_DETAIL = 2
+
+CONSOLE_LEVELS = {CONSOLE_QUIET: LEVEL_ERROR, CONSOLE_SUMMARY: LEVEL_SUMMARY, CONSOLE_VERBOSE: LEVEL_DETAIL}
+
+
+class Instrumentation:
+    def __init__(self, console=CONSOLE_VERBOSE):
+        """
+        Args:
+            console: 콘솔 출력 모드 (verbose / summary / quiet)
+        """
+        self.set_console(console)
+        self.origin = time.perf_counter()
+        # (이름, 분류, 시작, 끝, pid, tid, 인자) - 시각은 time.perf_counter() 기준
+        self.events = []
+        self.counters = defaultdict(int)
+
+    def set_console(self, console):
+        """콘솔 출력 모드를 바꿉니다."""
+        self.console = console
+        self.console_level = CONSOLE_LEVELS[console]
+
+    # ---------- 콘솔 로그 ----------
+
+    def log(self, message, level=LEVEL_DETAIL):
+        """출력 모드가 허용하는 수준의 메시지만 출력합니다."""
+        if level <= self.console_level:
+            print(message)
+
+    def detail(self, message):
+        """업체/슬라이드 단위 상세 로그"""
+        self.log(message, LEVEL_DETAIL)
+
+    def info(self, message):
+        """단계 단위 요약 로그"""
+        self.log(message, LEVEL_SUMMARY)
+
+    def error(self, message):
+        """오류/경고 (quiet 모드에서도 출력)"""
+        self.count('errors')
+        self.log(message, LEVEL_ERROR)
+
+    # ---------- 구간 / 카운터 ----------
+
+    @contextlib.contextmanager
+    def span(self, name, category='stage', **args):
+        """with 블록의 실행 시간을 구간으로 기록합니다."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.perf_counter(), category, args=args)
+
+    def add_span(self, name, start, end, category='stage', pid=None, tid=None, args=None):
+        """측정이 끝난 구간을 기록합니다 (워커 프로세스에서 측정한 구간도 같은 시계 기준)."""
+        self.events.append((name, category, start, end, pid or os.getpid(), tid or threading.get_ident(), args or None))
+
+    def add_spans(self, spans, category='image', pid=None, args=None):
+        """(이름, 시작, 끝) 목록을 한 번에 기록합니다."""
+        for name, start, end in spans:
+            self.add_span(name, start, end, category, pid=pid, tid=pid, args=args)
+
+    def count(self, name, value=1):
+        """카운터를 증가시킵니다."""
+        self.counters[name] += value
+
+    def snapshot(self):
+        """다른 프로세스로 전달할 수 있는 기록 사본"""
+        return {'events': list(self.events), 'counters': dict(self.counters)}
+
+    def merge(self, snapshot):
+        """워커 프로세스의 기록을 합칩니다."""
+        if not snapshot:
+            return
+        self.events.extend(tuple(event) for event in snapshot['events'])
+        for name, value in snapshot['counters'].items():
+            self.counters[name] += value
+
+    # ---------- 내보내기 ----------
+
+    def stage_totals(self):
+        """구간 이름별 (횟수, 합계, 최대) 시간 (초)"""
+        totals = {}
+        for name, _, start, end, _, _, _ in self.events:
+            count, total, longest = totals.get(name, (0, 0.0, 0.0))
+            totals[name] = (count + 1, total + end - start, max(longest, end - start))
+        return totals
+
+    def export_trace(self, path):
+        """Chrome 트레이스 이벤트 JSON으로 저장합니다 (chrome://tracing 또는 Perfetto에서 열기)."""
+        trace_events = []
+        for name, category, start, end, pid, tid, args in self.events:
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': round((start - self.origin) * 1e6, 1),
+                'dur': round((end - start) * 1e6, 1),
+                'pid': pid,
+                'tid': tid,
+            }
+            if args:
+                event['args'] = args
+            trace_events.append(event)
+
+        end_ts = max((event['ts'] + event['dur'] for event in trace_events), default=0)
+        if self.counters:
+            trace_events.append({'name': 'counters', 'ph': 'C', 'ts': end_ts, 'pid': os.getpid(),
+                                 'args': dict(self.counters)})
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+
+    def summary_table(self):
+        """단계별 시간과 카운터 요약 표 문자열"""
+        lines = [f"{'구간':<24}{'횟수':>8}{'합계(s)':>12}{'평균(ms)':>12}{'최대(ms)':>12}", "-" * 68]
+        totals = self.stage_totals()
+        for name in sorted(totals, key=lambda name: -totals[name][1]):
+            count, total, longest = totals[name]
+            lines.append(f"{name:<24}{count:>8}{total:>12.3f}{total / count * 1000:>12.1f}{longest * 1000:>12.1f}")
+
+        if self.counters:
+            lines.append("-" * 68)
+            for name in sorted(self.counters):
+                lines.append(f"{name:<24}{self.counters[name]:>20,}")
+        return "\n".join(lines)
+
+
+# 프로세스 전체에서 사용하는 계측 객체
+tracer = Instrumentation()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+중복 이미지 제거
+같은 체인 업체끼리 공유하는 가격표/인테리어 사진을 원본 내용 해시로 찾아,
+같은 변환(처리 방식, 목표 크기, 품질)은 한 번만 인코딩합니다. 인코딩 결과 바이트가 같으므로
+PPT 안에서도 미디어 파트 하나를 여러 슬라이드가 함께 참조합니다.
+선택적으로 차이 해시(dHash)로 한 업체 안의 거의 같은 업체 사진을 찾아 제외합니다.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import tracer
+from incremental import file_sha1
+from image_processor import task_sources
+from decode_limits import open_image, check_decode
+
+# dHash 크기 (8이면 64비트)
+DHASH_SIZE = 8
+
+# 거의 같은 이미지로 볼 최대 해밍 거리 (64비트 중)
+DEFAULT_NEAR_DUPLICATE_DISTANCE = 5
+
+
+def source_digests(image_paths, known=None, jobs=None, cache=None):
+    """원본 파일 내용 해시를 스레드 풀로 계산합니다.
+
+    캐시가 있으면 (경로, 크기, 수정시각)별로 해시를 기록해 두고, 크기나 수정시각이 바뀐 파일만 다시 읽습니다.
+
+    Args:
+        image_paths: 이미지 경로 목록
+        known: 이미 알고 있는 경로 -> 해시 (증분 모드 매니페스트 등, 다시 계산하지 않음)
+        jobs: 스레드 수
+        cache: ImageCache (None이면 해시를 기록하지 않음)
+
+    Returns:
+        경로 -> SHA1 (읽을 수 없는 파일은 제외)
+    """
+    digests = dict(known or {})
+    pending = list(dict.fromkeys(path for path in image_paths if path not in digests))
+    if not pending:
+        return digests
+    recorded = cache.load_digests() if cache else {}
+
+    def digest(image_path):
+        try:
+            stat = os.stat(image_path)
+            entry = recorded.get(os.path.abspath(image_path))
+            if entry and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+                return image_path, None, entry[2]
+            return image_path, [stat.st_size, stat.st_mtime_ns], file_sha1(image_path)
+        except OSError:
+            return image_path, None, None
+
+    hashed = 0
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for image_path, state, value in executor.map(digest, pending):
+            if value:
+                digests[image_path] = value
+            if state and value:
+                recorded[os.path.abspath(image_path)] = state + [value]
+                tracer.count('bytes_read', state[0])
+                hashed += 1
+
+    if cache and hashed:
+        cache.save_digests(recorded)
+    return digests
+
+
+def dedupe_tasks(tasks, digests):
+    """원본 내용과 변환 설정이 같은 작업을 하나로 묶습니다.
+
+    Returns:
+        (처리할 작업 목록, 중복 작업 -> 대표 작업)
+    """
+    representatives = {}
+    unique_tasks = []
+    aliases = {}
+    for task in tasks:
+        key = tuple(digests.get(path, path) for path in task_sources(task)) + tuple(task[1:])
+        representative = representatives.setdefault(key, task)
+        if representative is task:
+            unique_tasks.append(task)
+        else:
+            aliases[task] = representative
+    return unique_tasks, aliases
+
+
+def dhash(image_path, size=DHASH_SIZE):
+    """차이 해시: 작은 흑백 이미지에서 가로로 이웃한 픽셀의 밝기 비교 결과를 비트로 모읍니다."""
+    from PIL import Image
+    with open_image(image_path, image_path) as img:
+        # JPEG는 축소 디코딩으로 필요한 크기 근처까지만 디코딩 (그래도 메모리 예산을 넘으면 건너뜀)
+        img.draft('L', (size * 8, size * 8))
+        check_decode(img, image_path)
+        small = img.convert('L').resize((size + 1, size), Image.BILINEAR)
+        pixels = list(small.getdata())
+
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def drop_near_duplicates(shop_dirs, max_distance=DEFAULT_NEAR_DUPLICATE_DISTANCE, jobs=None):
+    """업체마다 거의 같은 업체 사진(업체_*.jpg)을 제외합니다. 가격표와 네이버플레이스 캡처는 그대로 둡니다.
+
+    Returns:
+        (업체 정보 목록 - 제외된 사진이 있는 업체는 사본, [(업체명, 제외된 경로, 남긴 경로), ...])
+    """
+    image_paths = [path for shop_info in shop_dirs for path in shop_info['images']]
+
+    def compute(image_path):
+        try:
+            return image_path, dhash(image_path)
+        except Exception:
+            return image_path, None
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        hashes = dict(executor.map(compute, image_paths))
+
+    filtered = []
+    dropped = []
+    for shop_info in shop_dirs:
+        kept = []
+        for image_path in shop_info['images']:
+            value = hashes.get(image_path)
+            match = None
+            if value is not None:
+                match = next((kept_path for kept_path in kept
+                              if hashes.get(kept_path) is not None
+                              and hamming_distance(value, hashes[kept_path]) <= max_distance), None)
+            if match:
+                dropped.append((shop_info['name'], image_path, match))
+            else:
+                kept.append(image_path)
+
+        if len(kept) != len(shop_info['images']):
+            shop_info = dict(shop_info, images=kept)
+        filtered.append(shop_info)
+    return filtered, dropped
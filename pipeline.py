@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+이미지 처리 파이프라인
+네트워크 드라이브(SMB)처럼 읽기가 느린 저장소에서 파일 읽기와 디코딩/인코딩을 겹쳐 실행합니다.
+입출력 스레드가 조립 중인 업체보다 정해진 수만큼 앞선 업체의 원본 바이트를 읽고, 프로세스 풀이 처리하며,
+슬라이드 조립은 업체 순서대로 결과를 받아 갑니다. 앞서 읽는 업체 수만큼만 원본/결과를 메모리에 둡니다.
+중복 이미지는 미리 해시를 계산하지 않고, 입출력 스레드가 읽은 바이트의 해시로 처리 중/처리된 작업을 찾아 결과를 함께 씁니다.
+"""
+
+import os
+import time
+import hashlib
+import threading
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from image_processor import init_worker, worker_initargs, cached_result, read_sources, process_prefetched, record_result
+from instrumentation import tracer
+
+# 조립 중인 업체보다 앞서 읽고 처리할 업체 수
+DEFAULT_PIPELINE_DEPTH = 4
+
+# 원본 파일을 읽는 스레드 수 (네트워크 지연을 가리기 위해 CPU 코어 수와 무관하게 설정)
+DEFAULT_IO_THREADS = 8
+
+
+class ImagePipeline:
+    def __init__(self, shop_tasks, aliases=None, jobs=None, cache=None, depth=DEFAULT_PIPELINE_DEPTH,
+                 io_threads=DEFAULT_IO_THREADS, dedup=False):
+        """
+        Args:
+            shop_tasks: 업체별 이미지 작업 목록 (조립 순서)
+            aliases: 중복 작업 -> 대표 작업 (대표 작업만 처리하고 결과를 공유)
+            jobs: 디코딩/인코딩 워커 프로세스 수 (None이면 CPU 코어 수)
+            cache: ImageCache (입출력 스레드에서 먼저 확인, 워커는 처리 결과를 저장)
+            depth: 조립 중인 업체보다 앞서 읽고 처리할 최대 업체 수
+            io_threads: 원본 파일을 읽는 스레드 수
+            dedup: 읽은 원본 내용과 변환 설정이 같은 작업은 한 번만 처리
+        """
+        self.shop_tasks = shop_tasks
+        self.aliases = aliases or {}
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache = cache
+        self.depth = max(0, depth)
+        self.io_threads = max(1, io_threads)
+        self.dedup = dedup
+
+        # 내용 키 (원본 해시 + 변환 설정) -> 워커 작업 Future, 작업 -> 내용 키 (결과를 해제할 때 함께 삭제)
+        self.content_futures = {}
+        self.content_keys = {}
+        self.lock = threading.Lock()
+
+    def fetch(self, executor, task):
+        """캐시를 확인하고, 없으면 원본을 읽어 워커에 넘깁니다. (입출력 스레드에서 실행)
+
+        Returns:
+            처리 결과 딕셔너리 (캐시 적중/읽기 실패) 또는 워커 작업 Future
+        """
+        if self.cache:
+            result = cached_result(task, self.cache)
+            if result:
+                return result
+
+        started = time.perf_counter()
+        try:
+            sources = read_sources(task)
+        except OSError as e:
+            return {'data': None, 'size': None, 'source_size': None, 'format': None, 'error': str(e),
+                    'trace': [('failed', started, time.perf_counter())], 'bytes_read': 0, 'cached': False}
+        tracer.add_span('read', started, time.perf_counter(), 'io', args={'file': os.path.basename(task.path)})
+        if not self.dedup:
+            return executor.submit(process_prefetched, task, sources)
+
+        key = tuple(hashlib.sha1(sources[path]).hexdigest() for path in sources) + tuple(task[1:])
+        with self.lock:
+            future = self.content_futures.get(key)
+            if future is None:
+                future = self.content_futures[key] = executor.submit(process_prefetched, task, sources)
+                self.content_keys[task] = key
+            else:
+                tracer.count('duplicate_images')
+        return future
+
+    def __iter__(self):
+        """업체 순서대로 그 업체의 작업 -> 결과 딕셔너리를 돌려줍니다.
+
+        다음 업체로 넘어갈 때 더 이상 쓰이지 않는 결과는 해제합니다.
+        """
+        # 대표 작업 기준 업체별 목록과 남은 사용 업체 수
+        shop_units = [list(dict.fromkeys(self.aliases.get(task, task) for task in tasks)) for tasks in self.shop_tasks]
+        remaining = Counter(unit for units in shop_units for unit in units)
+
+        pending = {}  # 대표 작업 -> 입출력 스레드 Future
+        results = {}  # 대표 작업 -> 처리 결과
+        scheduled = 0
+
+        initargs = worker_initargs(self.cache)
+        with ThreadPoolExecutor(max_workers=self.io_threads) as io_pool, \
+                ProcessPoolExecutor(max_workers=self.jobs, initializer=init_worker, initargs=initargs) as executor:
+            for index, units in enumerate(shop_units):
+                # 현재 업체부터 depth개 앞 업체까지 읽기/처리 예약
+                while scheduled < min(index + self.depth + 1, len(shop_units)):
+                    for unit in shop_units[scheduled]:
+                        if unit not in pending and unit not in results:
+                            pending[unit] = io_pool.submit(self.fetch, executor, unit)
+                    scheduled += 1
+
+                for unit in units:
+                    if unit in results:
+                        continue
+                    outcome = pending.pop(unit).result()
+                    if isinstance(outcome, Future):
+                        _, outcome = outcome.result()
+                    # 내용이 같은 작업끼리 공유하는 결과는 한 번만 기록
+                    if not outcome.get('recorded'):
+                        record_result(unit, outcome, self.cache)
+                        outcome['recorded'] = True
+                    results[unit] = outcome
+
+                yield {task: results[self.aliases.get(task, task)] for task in self.shop_tasks[index]}
+
+                for unit in units:
+                    remaining[unit] -= 1
+                    if not remaining[unit]:
+                        del results[unit]
+                        with self.lock:
+                            key = self.content_keys.pop(unit, None)
+                            if key:
+                                del self.content_futures[key]
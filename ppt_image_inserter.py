@@ -6,314 +6,447 @@ PPT 이미지 자동 삽입 스크립트
 """
 
 import os
-import glob
-from pathlib import Path
-from pptx import Presentation
-from pptx.util import Inches, Pt
-from pptx.enum.text import PP_ALIGN
-from PIL import Image
-import openpyxl
+import sys
+import json
+import argparse
+import cProfile
+import contextlib
+import time
 import io
+from concurrent.futures import as_completed
+from image_processor import (
+    DEFAULT_DPI, DEFAULT_JPEG_QUALITY, DEFAULT_COMPOSITE_BACKGROUND,
+    parse_color, task_sources, process_image_cached, record_result, preprocess_images,
+)
+from image_cache import ImageCache, DEFAULT_CACHE_SIZE
+import incremental
+from shop_indexer import ShopIndexer
+from image_probe import probe_image, probe_images, display_size
+from shop_order import load_shop_order, order_shops
+import sharding
+from template_snapshot import TemplateSnapshot, TITLE_LAYOUT, BLANK_LAYOUT
+from deck_plan import (
+    SLIDE_COVER, SLIDE_PRICE, ROLE_PHOTO, ROLE_CAPTURE, SLIDE_OVERHEAD_BYTES,
+    plan_shop, plan_deck, plan_pictures, plan_tasks, save_plan, load_plan,
+)
+from instrumentation import tracer, CONSOLE_MODES, CONSOLE_VERBOSE, CONSOLE_SUMMARY
+from watcher import ShopWatcher, DEFAULT_POLL_INTERVAL, DEFAULT_DEBOUNCE
+from pipeline import ImagePipeline, DEFAULT_PIPELINE_DEPTH, DEFAULT_IO_THREADS
+from region_batch import (
+    BATCH_LEVELS, BATCH_REGION, BATCH_DETAIL, group_shops, deck_cost, batch_output_path, batch_manifest_path,
+    save_batch_manifest,
+)
+from media_dedup import source_digests, dedupe_tasks, drop_near_duplicates, DEFAULT_NEAR_DUPLICATE_DISTANCE
+from size_budget import plan_budget, parse_size, format_size
+from preview import PREVIEW_LONG_EDGE, proxy_task, preview_output_path, preview_plan_path
+from decode_limits import (
+    DEFAULT_DECODE_MEMORY, DEFAULT_MAX_IMAGE_PIXELS, REJECT_LABELS, set_decode_limits, quarantine_file,
+    rejection_report_path, save_rejection_report,
+)
+
+# ========================================
+# 기본 설정 값 (명령행 인자로 변경 가능)
+# ========================================
+
+# 스크립트가 있는 현재 디렉토리 경로
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 이미지 디렉토리 (naver-map-photo-downloader의 downloads 폴더)
+BASE_IMAGE_DIR = r"C:\Users\user\Documents\GitHub\naver-map-photo-downloader\downloads"
+
+# 템플릿 PPT 파일 (스크립트와 같은 폴더)
+TEMPLATE_PPT = os.path.join(SCRIPT_DIR, "세신샵.pptx")
+
+# 엑셀 파일 (업체 순서 정보, 스크립트와 같은 폴더)
+EXCEL_FILE = os.path.join(SCRIPT_DIR, "리스트_네이버지도링크추가 - 복사본.xlsx")
+
+# 출력 PPT 파일 (스크립트와 같은 폴더)
+OUTPUT_PPT = os.path.join(SCRIPT_DIR, "세신샵_완성본.pptx")
+
+# 처리된 이미지 캐시 폴더 (다음 실행 시 변경되지 않은 이미지는 다시 처리하지 않음)
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".image_cache")
+
+# 폴더 탐색 인덱스 (다음 실행 시 변경된 폴더만 다시 탐색)
+INDEX_FILE = os.path.join(SCRIPT_DIR, ".shop_index.json")
+
+# ========================================
+
 
 class PPTImageInserter:
-    def __init__(self, template_ppt_path, base_image_dir, output_ppt_path, excel_path=None):
+    def __init__(self, template_ppt_path, base_image_dir, output_ppt_path, excel_path=None, jobs=None,
+                 dpi=DEFAULT_DPI, jpeg_quality=DEFAULT_JPEG_QUALITY, cache_dir=None, cache_size=DEFAULT_CACHE_SIZE,
+                 index_path=None, streaming=False, dedup=True, near_duplicates=None, composite_background=None,
+                 pipeline_depth=None, io_threads=DEFAULT_IO_THREADS, max_output_size=None,
+                 decode_memory=DEFAULT_DECODE_MEMORY, max_image_pixels=DEFAULT_MAX_IMAGE_PIXELS, quarantine_dir=None,
+                 preview=None, template=None):
         """
         Args:
             template_ppt_path: 템플릿 PPT 파일 경로
             base_image_dir: 이미지가 있는 기본 디렉토리 (예: C:/Users/user/Downloads/서울/중구)
             output_ppt_path: 출력 PPT 파일 경로
-            excel_path: 엑셀 파일 경로 (업체 순서 정보)
+            excel_path: 엑셀 또는 CSV 파일 경로 (업체 순서 정보, 3번째 컬럼이 매장명)
+            jobs: 이미지 전처리 워커 프로세스 수 (None이면 CPU 코어 수)
+            dpi: 삽입 이미지 해상도 (배치 크기 기준 인치당 픽셀 수)
+            jpeg_quality: 사진 JPEG 재인코딩 품질 (1-95)
+            cache_dir: 처리된 이미지 캐시 디렉토리 (None이면 캐시 사용 안 함)
+            cache_size: 캐시 최대 용량 (바이트)
+            index_path: 폴더 탐색 인덱스 파일 경로 (None이면 매번 전체 탐색)
+            streaming: 스트리밍 출력 (업체별 슬라이드와 이미지를 완성 즉시 파일에 기록하여 메모리 사용을 줄임)
+            dedup: 원본 내용이 같은 이미지는 한 번만 처리 (업체 간 공유 사진을 미디어 하나로 삽입)
+            near_duplicates: 지정하면 업체마다 dHash 거리가 이 값 이하인 거의 같은 업체 사진을 제외
+            composite_background: 지정하면 합성 모드 - 이미지가 2-3개인 슬라이드를 이 배경색의 이미지 하나로 합성
+            pipeline_depth: 지정하면 파이프라인 모드 - 전체를 미리 처리하지 않고, 조립 중인 업체보다
+                            이 수만큼 앞선 업체의 원본을 읽고 처리하면서 슬라이드를 조립
+            io_threads: 파이프라인 모드에서 원본 파일을 읽는 스레드 수
+            max_output_size: 지정하면 예산 모드 - 출력 파일이 이 용량(바이트) 이하가 되도록 이미지마다
+                             JPEG 품질과 해상도를 낮춤 (샤드 모드에서는 샤드 파일마다)
+            decode_memory: 원본 한 장의 디코딩 버퍼 최대 용량 (바이트, 넘으면 더 작게 축소 디코딩하거나 거부)
+            max_image_pixels: 원본 최대 픽셀 수 (넘으면 압축 폭탄으로 보고 거부)
+            quarantine_dir: 지정하면 거부된 원본(압축 폭탄 의심, 메모리 예산 초과, 잘린 파일)을 이 폴더로 옮김
+            preview: 지정하면 미리 보기 모드 - 같은 배치로 긴 변이 이 픽셀 수 이하인 저품질 대체 이미지를 삽입
+            template: 이미 읽어 둔 TemplateSnapshot (샤드 워커에 전달, 없으면 처음 필요할 때 읽음)
         """
         self.template_ppt_path = template_ppt_path
         self.base_image_dir = base_image_dir
         self.output_ppt_path = output_ppt_path
         self.excel_path = excel_path
+        self.jobs = jobs
+        self.dpi = dpi
+        self.jpeg_quality = jpeg_quality
+        self.cache = ImageCache(cache_dir, cache_size) if cache_dir else None
+        self.indexer = ShopIndexer(base_image_dir, index_path)
+        self.streaming = streaming
+        self.dedup = dedup
+        self.near_duplicates = near_duplicates
+        self.composite_background = composite_background
+        self.pipeline_depth = pipeline_depth
+        self.io_threads = io_threads
+        self.max_output_size = max_output_size
+        self.decode_memory = decode_memory
+        self.max_image_pixels = max_image_pixels
+        self.quarantine_dir = quarantine_dir
+        self.preview = preview
+        self._template = template
+        # 이 프로세스와 이후 만드는 워커 프로세스의 디코딩 메모리 제한
+        set_decode_limits(decode_memory, max_image_pixels)
+        
+        # 진행 상황 콜백 (업체/샤드 하나가 끝날 때마다 이벤트 딕셔너리로 호출)
+        self.progress_callback = None
+        
+        # 전처리된 이미지: ImageTask -> 결과
+        self.processed_images = {}
+        # 이미지 메타데이터 (헤더만 읽은 크기/EXIF 방향): 경로 -> ImageInfo
+        self.image_info = {}
+        # 원본 파일 내용 해시 (중복 이미지 확인용): 경로 -> SHA1
+        self.source_digests = {}
+        # 예산/미리 보기 모드에서 품질/해상도를 낮춘 작업: 원래 작업 -> 대신 처리할 작업
+        self.budget_tasks = {}
+        # 처리하지 않은 원본 (다음 보고 때까지): 경로 -> (거부 사유, 오류 메시지)
+        self.rejected = {}
+        # 마지막으로 읽은 업체 순서: ((경로, 크기, 수정시각), 순서)
+        self._shop_order_cache = None
+        
+    def load_template(self):
+        """템플릿 스냅숏 (처음 한 번만 읽고, 템플릿 파일이 바뀌었을 때만 다시 읽음)"""
+        if self._template is None or not self._template.is_current():
+            with tracer.span('template'):
+                self._template = TemplateSnapshot(self.template_ppt_path)
+        return self._template
+    
+    def open_deck(self, output_path):
+        """템플릿 스냅숏에서 새 덱을 엽니다 (스트리밍 출력이면 출력 파일 기록기와 함께).
         
+        Returns:
+            (프레젠테이션, StreamingPptxWriter 또는 None)
+        """
+        template = self.load_template()
+        with tracer.span('template'):
+            if self.streaming:
+                from pptx_stream_writer import StreamingPptxWriter
+                writer = StreamingPptxWriter(io.BytesIO(template.data), output_path)
+                return writer.prs, writer
+            return template.open(), None
+    
     def load_shop_order_from_excel(self):
-        """엑셀 파일에서 업체 순서를 읽어옵니다."""
+        """엑셀(또는 CSV) 파일에서 업체 순서를 읽어옵니다."""
         if not self.excel_path or not os.path.exists(self.excel_path):
-            print("엑셀 파일을 찾을 수 없습니다. 기본 정렬을 사용합니다.")
+            tracer.info("엑셀 파일을 찾을 수 없습니다. 기본 정렬을 사용합니다.")
             return None
         
         try:
-            wb = openpyxl.load_workbook(self.excel_path)
-            ws = wb.active
-            
-            shop_order = []
-            for row in range(2, ws.max_row + 1):
-                shop_name = ws.cell(row, 3).value  # 매장명은 3번째 컬럼
-                if shop_name:
-                    shop_order.append(shop_name.strip())
+            # 파일이 바뀌지 않았으면 이전에 읽은 순서 사용 (감시 모드에서 반복 생성할 때)
+            stat = os.stat(self.excel_path)
+            key = (self.excel_path, stat.st_size, stat.st_mtime_ns)
+            if self._shop_order_cache and self._shop_order_cache[0] == key:
+                return self._shop_order_cache[1]
             
-            print(f"엑셀에서 {len(shop_order)}개 업체 순서 로드 완료")
+            with tracer.span('excel'):
+                shop_order = load_shop_order(self.excel_path)
+            tracer.info(f"엑셀에서 {len(shop_order)}개 업체 순서 로드 완료")
+            self._shop_order_cache = (key, shop_order)
             return shop_order
             
         except Exception as e:
-            print(f"엑셀 파일 읽기 오류: {e}")
+            tracer.error(f"엑셀 파일 읽기 오류: {e}")
             return None
     
     def find_shop_directories(self):
         """업체 디렉토리 목록을 찾고 엑셀 순서대로 정렬합니다."""
-        shop_dirs_dict = {}
-        
-        # 기본 경로에서 하위 디렉토리 탐색 (서울/중구 등 지역별로 탐색)
-        if os.path.exists(self.base_image_dir):
-            # downloads 폴더 내의 지역 폴더들 탐색
-            for region in os.listdir(self.base_image_dir):
-                region_path = os.path.join(self.base_image_dir, region)
-                if os.path.isdir(region_path):
-                    # 지역 폴더 내의 상세지역 폴더들 탐색
-                    for detail_region in os.listdir(region_path):
-                        detail_region_path = os.path.join(region_path, detail_region)
-                        if os.path.isdir(detail_region_path):
-                            # 상세지역 폴더 내의 업체 폴더들 탐색
-                            for shop_name in os.listdir(detail_region_path):
-                                shop_path = os.path.join(detail_region_path, shop_name)
-                                if os.path.isdir(shop_path):
-                                    # 업체 폴더 내에 업체 하위 폴더가 있는지 확인
-                                    company_folder = os.path.join(shop_path, "업체")
-                                    if os.path.exists(company_folder):
-                                        # 네이버플레이스 캡처 이미지
-                                        naver_capture = os.path.join(company_folder, "네이버플레이스_캡처.png")
-                                        
-                                        # 가격표 이미지들 (가격표.jpg, 가격표_1.jpg, 가격표_2.jpg 등)
-                                        price_images = []
-                                        
-                                        # 가격표.jpg 또는 가격표.png 확인
-                                        single_price_jpg = os.path.join(company_folder, "가격표.jpg")
-                                        single_price_png = os.path.join(company_folder, "가격표.png")
-                                        if os.path.exists(single_price_jpg):
-                                            price_images.append(single_price_jpg)
-                                        elif os.path.exists(single_price_png):
-                                            price_images.append(single_price_png)
-                                        
-                                        # 가격표_*.jpg 또는 가격표_*.png 파일들 추가
-                                        numbered_prices = sorted(glob.glob(os.path.join(company_folder, "가격표_*.jpg")))
-                                        if not numbered_prices:
-                                            numbered_prices = sorted(glob.glob(os.path.join(company_folder, "가격표_*.png")))
-                                        price_images.extend(numbered_prices)
-                                        
-                                        # 업체 이미지들
-                                        image_files = glob.glob(os.path.join(company_folder, "업체_*.jpg"))
-                                        
-                                        if os.path.exists(naver_capture) or price_images or image_files:
-                                            shop_dirs_dict[shop_name] = {
-                                                'name': shop_name,
-                                                'path': shop_path,
-                                                'naver_capture': naver_capture if os.path.exists(naver_capture) else None,
-                                                'price_images': price_images,
-                                                'images': sorted(image_files)
-                                            }
+        # 지역/상세지역/업체 폴더를 한 번씩만 탐색 (변경되지 않은 폴더는 인덱스 사용)
+        with tracer.span('scan'):
+            shop_dirs_dict = self.indexer.scan()
+        tracer.count('dirs_rescanned', self.indexer.rescanned)
+        tracer.info(f"폴더 탐색 완료: 다시 탐색한 폴더 {self.indexer.rescanned}개")
         
         # 엑셀 파일에서 순서 로드
         shop_order = self.load_shop_order_from_excel()
         
         if shop_order:
-            # 엑셀 순서대로 정렬
-            ordered_shops = []
-            for shop_name in shop_order:
-                if shop_name in shop_dirs_dict:
-                    ordered_shops.append(shop_dirs_dict[shop_name])
-                else:
-                    print(f"  경고: '{shop_name}' 폴더를 찾을 수 없습니다.")
-            
-            # 엑셀에 없는 업체는 마지막에 추가
-            for shop_name, shop_info in sorted(shop_dirs_dict.items()):
-                if shop_name not in shop_order:
-                    print(f"  추가: '{shop_name}' (엑셀에 없는 업체)")
-                    ordered_shops.append(shop_info)
-            
+            # 엑셀 순서대로 정렬 (정규화된 업체명 기준, 엑셀에 없는 업체는 마지막에 추가)
+            ordered_shops, missing, extra = order_shops(shop_dirs_dict, shop_order)
+            for shop_name in missing:
+                tracer.error(f"  경고: '{shop_name}' 폴더를 찾을 수 없습니다.")
+            for shop_name in extra:
+                tracer.detail(f"  추가: '{shop_name}' (엑셀에 없는 업체)")
             return ordered_shops
         else:
             # 엑셀이 없으면 알파벳 순서로 정렬
             return [shop_dirs_dict[key] for key in sorted(shop_dirs_dict.keys())]
     
-    def get_image_dimensions(self, image_path):
-        """이미지의 크기를 확인합니다."""
-        try:
-            with Image.open(image_path) as img:
-                return img.size  # (width, height)
-        except Exception as e:
-            print(f"이미지 읽기 오류 ({image_path}): {e}")
+    def plan_shops(self, shop_dirs, slide_width, slide_height):
+        """업체별 슬라이드 계획 (그림 위치/크기와 처리 작업, 이미지 디코딩 없음)"""
+        with tracer.span('plan', shops=len(shop_dirs)):
+            return [plan_shop(shop_info, slide_width, slide_height, self.get_image_dimensions, dpi=self.dpi,
+                              quality=self.jpeg_quality, composite_background=self.composite_background)
+                    for shop_info in shop_dirs]
+    
+    def preprocess_images(self, shop_plans):
+        """계획에 있는 모든 그림을 배치 크기에 맞춰 병렬로 미리 크롭/리사이즈/인코딩합니다."""
+        tasks, aliases = self.apply_budget(*self.dedupe_tasks(plan_tasks(shop_plans)))
+        
+        with tracer.span('preprocess', images=len(tasks)):
+            self.processed_images = preprocess_images(tasks, jobs=self.jobs, cache=self.cache)
+        for task, representative in aliases.items():
+            self.processed_images[task] = self.processed_images[representative]
+        
+        failed = [task for task in tasks if self.processed_images[task]['error']]
+        for task in failed:
+            tracer.error(f"이미지 전처리 오류 ({task.path}): {self.processed_images[task]['error']}")
+        tracer.info(f"이미지 전처리 완료: {len(tasks) - len(failed)}/{len(tasks)}개"
+                    + (f" (중복 {len(aliases)}개는 한 번만 처리)" if aliases else ""))
+        
+        self.report_cache()
+    
+    def dedupe_tasks(self, tasks):
+        """원본 내용과 변환이 같은 작업은 한 번만 처리하도록 묶습니다 (같은 바이트 -> 같은 미디어 파트).
+        
+        Returns:
+            (처리할 작업 목록, 중복 작업 -> 대표 작업)
+        """
+        if not self.dedup:
+            return tasks, {}
+        self.hash_sources(tasks)
+        tasks, aliases = dedupe_tasks(tasks, self.source_digests)
+        tracer.count('duplicate_images', len(aliases))
+        return tasks, aliases
+    
+    def hash_sources(self, tasks):
+        """작업이 읽는 원본 파일의 내용 해시를 계산해 둡니다 (이미 계산한 파일은 제외)."""
+        with tracer.span('hash', images=len(tasks)):
+            image_paths = [path for task in tasks for path in task_sources(task)]
+            self.source_digests = source_digests(image_paths, self.source_digests, self.jobs, self.cache)
+    
+    def apply_budget(self, tasks, aliases):
+        """예산/미리 보기 모드: 품질/해상도를 낮추기로 한 작업은 바뀐 작업을 처리하여 원래 작업의 결과로 사용합니다.
+        
+        Returns:
+            (처리할 작업 목록, 원래 작업 -> 대신 처리할 작업)
+        """
+        if not self.budget_tasks:
+            return tasks, aliases
+        
+        def budgeted(task):
+            return self.budget_tasks.get(task, task)
+        
+        aliases = {task: budgeted(representative) for task, representative in aliases.items()}
+        aliases.update((task, self.budget_tasks[task]) for task in tasks if task in self.budget_tasks)
+        return list(dict.fromkeys(budgeted(task) for task in tasks)), aliases
+    
+    def plan_size_budget(self, shop_plans):
+        """예산 모드: 이미지마다 품질별 인코딩 크기를 워커 프로세스에서 재고,
+        출력 파일이 max_output_size 이하가 되도록 이미지별 JPEG 품질과 해상도를 정합니다.
+        """
+        tasks = plan_tasks(shop_plans)
+        # 같은 이미지는 PPT에 한 번만 들어가므로 한 번만 계산
+        if self.dedup:
+            self.hash_sources(tasks)
+            tasks, _ = dedupe_tasks(tasks, self.source_digests)
+        
+        # 템플릿과 슬라이드 XML 용량을 뺀 나머지를 이미지에 배분
+        slide_count = 1 + sum(len(shop_plan['slides']) for shop_plan in shop_plans)
+        overhead = os.path.getsize(self.template_ppt_path) + slide_count * SLIDE_OVERHEAD_BYTES
+        budget = self.max_output_size - overhead
+        
+        # 가격표와 네이버플레이스 캡처는 글자가 읽히도록 최소 품질/해상도를 높게 유지
+        text_paths = {path for picture in plan_pictures(shop_plans) if picture['role'] != ROLE_PHOTO
+                      for path in task_sources(picture['task'])}
+        
+        tracer.info(f"\n용량 예산 {format_size(self.max_output_size)}: 이미지 {len(tasks)}개의 품질별 크기 측정 중...")
+        with tracer.span('budget', images=len(tasks)):
+            self.budget_tasks, total = plan_budget(tasks, text_paths, max(budget, 0), jobs=self.jobs, cache=self.cache)
+        tracer.count('budget_adjusted_images', len(self.budget_tasks))
+        
+        if total > budget:
+            tracer.error(f"경고: 최소 품질/해상도로도 예상 용량 {format_size(total + overhead)}이 "
+                         f"예산 {format_size(self.max_output_size)}을 넘습니다.")
+        tracer.info(f"용량 예산: 이미지 예상 {format_size(total)} + 기타 {format_size(overhead)}, "
+                    f"품질/해상도 조정 {len(self.budget_tasks)}/{len(tasks)}개")
+    
+    def plan_preview(self, shop_plans):
+        """미리 보기 모드: 모든 작업을 같은 비율의 작은 대체 이미지 작업으로 바꿔 처리합니다 (배치는 그대로)."""
+        self.budget_tasks = {task: proxy_task(task, self.preview) for task in plan_tasks(shop_plans)}
+        tracer.info(f"미리 보기: 이미지 {len(self.budget_tasks)}개를 긴 변 {self.preview}px 이하로 삽입")
+    
+    def report_cache(self):
+        """캐시 용량을 정리하고 적중률을 출력합니다."""
+        if self.cache:
+            removed = self.cache.evict()
+            tracer.info(f"  {self.cache.summary()}" + (f", 오래된 항목 {removed}개 삭제" if removed else ""))
+    
+    def start_pipeline(self, shop_plans):
+        """업체 순서대로 이미지 처리 결과를 돌려주는 파이프라인을 시작합니다.
+        
+        Returns:
+            업체마다 작업 -> 결과 딕셔너리를 돌려주는 이터레이터
+        """
+        shop_tasks = [plan_tasks([shop_plan]) for shop_plan in shop_plans]
+        tasks = list(dict.fromkeys(task for tasks in shop_tasks for task in tasks))
+        if self.max_output_size:
+            # 예산은 중복을 제거한 대표 작업 기준으로 정했으므로 같은 기준으로 묶어야 중복 작업도 낮춘 설정을 씀
+            # (내용 해시는 예산 계산 때 이미 계산해 둠)
+            tasks, aliases = self.apply_budget(*self.dedupe_tasks(tasks))
+        else:
+            # 중복 이미지는 파이프라인이 읽은 바이트로 찾으므로 원본을 미리 읽어 해시하지 않음
+            tasks, aliases = self.apply_budget(tasks, {})
+        tracer.info(f"이미지 파이프라인: {len(tasks)}개 (앞서 처리 {self.pipeline_depth}개 업체, "
+                    f"읽기 스레드 {self.io_threads}개, 워커 {self.jobs or os.cpu_count()}개)")
+        pipeline = ImagePipeline(shop_tasks, aliases, jobs=self.jobs, cache=self.cache,
+                                 depth=self.pipeline_depth, io_threads=self.io_threads, dedup=self.dedup)
+        return iter(pipeline)
+    
+    def get_task_image(self, task):
+        """이미지 작업(ImageTask 또는 CompositeTask)의 처리 결과 버퍼를 돌려줍니다.
+        
+        전처리 단계의 결과가 있으면 그대로 사용하고, 없으면 즉시 처리합니다.
+        """
+        result = self.processed_images.get(task)
+        if result is None:
+            task = self.budget_tasks.get(task, task)
+            _, result = process_image_cached(task, self.cache)
+            record_result(task, result, self.cache)
+        
+        if result['error']:
+            tracer.error(f"이미지 처리 오류 ({task.path}): {result['error']}")
+            rejected = result.get('rejected')
+            if rejected and rejected['path'] not in self.rejected:
+                self.rejected[rejected['path']] = (rejected['reason'], result['error'])
+                tracer.count('images_rejected')
             return None
+        return io.BytesIO(result['data'])
+    
+    def probe_images(self, shop_dirs):
+        """스캔된 모든 이미지의 헤더(크기, EXIF 방향)를 한 번에 읽어 둡니다 (이미 읽은 이미지는 제외)."""
+        image_paths = [path for shop_info in shop_dirs for path in incremental.shop_input_files(shop_info)
+                       if path not in self.image_info]
+        with tracer.span('probe', images=len(image_paths)):
+            table, errors = probe_images(image_paths)
+        self.image_info.update(table)
+        for image_path, error in errors.items():
+            tracer.error(f"이미지 읽기 오류 ({image_path}): {error}")
+        tracer.info(f"이미지 정보 확인 완료: {len(table)}/{len(image_paths)}개")
     
-    def crop_image_to_square(self, image_path):
-        """이미지를 중앙 기준으로 정사각형으로 크롭합니다."""
+    def forget_files(self, image_paths):
+        """변경된 이미지의 헤더 정보와 내용 해시를 버려 다음 생성 때 다시 확인하게 합니다."""
+        for image_path in image_paths:
+            self.image_info.pop(image_path, None)
+            self.source_digests.pop(image_path, None)
+    
+    def filter_near_duplicates(self, shop_dirs):
+        """업체마다 거의 같은 업체 사진(dHash 거리가 near_duplicates 이하)을 제외합니다."""
+        with tracer.span('near_duplicates'):
+            shop_dirs, dropped = drop_near_duplicates(shop_dirs, self.near_duplicates, self.jobs)
+        for shop_name, image_path, kept_path in dropped:
+            tracer.detail(f"  유사 이미지 제외: {shop_name} {os.path.basename(image_path)} "
+                          f"(= {os.path.basename(kept_path)})")
+        tracer.count('near_duplicates_dropped', len(dropped))
+        tracer.info(f"유사 이미지 {len(dropped)}개 제외")
+        return shop_dirs
+    
+    def get_image_dimensions(self, image_path):
+        """이미지의 크기를 확인합니다 (EXIF 방향 적용)."""
+        info = self.image_info.get(image_path)
+        if info:
+            return display_size(info)
+        
         try:
-            with Image.open(image_path) as img:
-                width, height = img.size
-                
-                # 정사각형 크기 결정 (짧은 쪽 기준)
-                size = min(width, height)
-                
-                # 중앙 크롭 좌표 계산
-                left = (width - size) // 2
-                top = (height - size) // 2
-                right = left + size
-                bottom = top + size
-                
-                # 크롭
-                cropped = img.crop((left, top, right, bottom))
-                
-                # 메모리에 저장
-                img_byte_arr = io.BytesIO()
-                cropped.save(img_byte_arr, format='PNG')
-                img_byte_arr.seek(0)
-                
-                return img_byte_arr
+            info = probe_image(image_path)
+            self.image_info[image_path] = info
+            return display_size(info)
         except Exception as e:
-            print(f"이미지 크롭 오류 ({image_path}): {e}")
+            tracer.error(f"이미지 읽기 오류 ({image_path}): {e}")
             return None
     
-    def add_price_images_to_slide(self, prs, slide, price_images):
-        """가격표 이미지를 슬라이드에 배치합니다 (최대 3개)."""
-        # 안전 여백 설정
-        margin_left = Inches(0.5)
-        margin_top = Inches(0.5)
-        margin_bottom = Inches(0.5)
-        
-        # 사용 가능한 영역
-        available_width = prs.slide_width - margin_left * 2
-        available_height = prs.slide_height - margin_top - margin_bottom
-        
-        num_images = len(price_images)
-        
-        if num_images == 1:
-            # 가격표 1개: 중앙에 크게 배치
-            img_path = price_images[0]
-            img_dims = self.get_image_dimensions(img_path)
-            if img_dims:
-                img_width, img_height = img_dims
-                aspect_ratio = img_width / img_height
-                
-                # 9:16 세로 비율에 맞춤
-                height = available_height
-                width = height * aspect_ratio
-                
-                # 너무 넓으면 너비에 맞춤
-                if width > available_width:
-                    width = available_width
-                    height = width / aspect_ratio
-                
-                # 중앙 정렬
-                left = margin_left + (available_width - width) / 2
-                top = margin_top + (available_height - height) / 2
-                
-                slide.shapes.add_picture(img_path, left, top, width=width, height=height)
+    def add_shop_to_ppt(self, prs, shop_info, shop_number=None):
+        """업체 정보를 PPT에 추가합니다 (배치 계획을 세운 뒤 render_shop으로 슬라이드 생성).
         
-        else:
-            # 가격표 2-3개: 가로로 나란히 배치
-            gap = Inches(0.3)  # 이미지 간 간격
-            
-            # 각 이미지 너비 계산
-            total_gap = gap * (num_images - 1)
-            img_width = (available_width - total_gap) / num_images
-            
-            # 9:16 비율로 높이 계산
-            img_height = img_width * (16 / 9)
-            
-            # 높이가 너무 크면 높이에 맞춤
-            if img_height > available_height:
-                img_height = available_height
-                img_width = img_height * (9 / 16)
-                # 너비 재계산
-                total_gap = gap * (num_images - 1)
-                total_width = img_width * num_images + total_gap
-            else:
-                total_width = available_width
-            
-            # 시작 위치 계산 (중앙 정렬)
-            start_left = margin_left + (available_width - total_width) / 2
-            top = margin_top + (available_height - img_height) / 2
-            
-            for i, img_path in enumerate(price_images):
-                left = start_left + (i * (img_width + gap))
-                slide.shapes.add_picture(img_path, left, top, width=img_width, height=img_height)
-    
-    def add_images_to_slide(self, prs, slide, images_to_add, slide_height):
-        """슬라이드에 이미지를 최적으로 배치합니다."""
-        # 안전 여백 설정
-        margin_left = Inches(0.5)
-        margin_right = Inches(0.5)
-        margin_top = Inches(1.2)
-        margin_bottom = Inches(0.3)
-        
-        # 사용 가능한 영역
-        available_width = prs.slide_width - margin_left - margin_right
-        available_height = prs.slide_height - margin_top - margin_bottom
-        
-        num_images = len(images_to_add)
-        
-        if num_images == 1:
-            # 이미지 1개: 정사각형으로 크롭하여 중앙 배치
-            img_path = images_to_add[0]
-            
-            # 사용 가능한 영역의 작은 쪽에 맞춤
-            square_size = min(available_width, available_height)
-            
-            # 이미지를 정사각형으로 크롭
-            cropped_img = self.crop_image_to_square(img_path)
-            if cropped_img:
-                # 중앙 정렬
-                left = margin_left + (available_width - square_size) / 2
-                top = margin_top + (available_height - square_size) / 2
-                
-                slide.shapes.add_picture(cropped_img, left, top, width=square_size, height=square_size)
+        shop_number는 기존 호출과의 호환을 위해 남겨 둔 인자로, 사용하지 않습니다.
+        """
+        self.render_shop(prs, self.plan_shops([shop_info], prs.slide_width, prs.slide_height)[0])
+    
+    def render_shop(self, prs, shop_plan):
+        """업체 계획대로 표지, 가격표, 업체 이미지 슬라이드를 추가합니다."""
+        shop_name = shop_plan['name']
+        slide_layout = prs.slide_layouts[BLANK_LAYOUT]  # Blank layout (placeholder 없음)
         
-        elif num_images == 2:
-            # 이미지 2개: 가로로 나란히 배치
-            gap = Inches(0.3)
-            
-            # 정사각형 크기 계산
-            square_size = (available_width - gap) / 2
-            
-            # 높이 체크
-            if square_size > available_height:
-                square_size = available_height
-            
-            # 시작 위치 계산 (중앙 정렬)
-            total_width = square_size * 2 + gap
-            start_left = margin_left + (available_width - total_width) / 2
-            top = margin_top + (available_height - square_size) / 2
-            
-            for i, img_path in enumerate(images_to_add):
-                cropped_img = self.crop_image_to_square(img_path)
-                if cropped_img:
-                    left = start_left + (i * (square_size + gap))
-                    slide.shapes.add_picture(cropped_img, left, top, width=square_size, height=square_size)
-        
-        elif num_images == 3:
-            # 이미지 3개: 가로로 나란히 배치
-            gap = Inches(0.3)
+        for slide_plan in shop_plan['slides']:
+            kind = slide_plan['kind']
             
-            # 정사각형 크기 계산
-            square_size = (available_width - gap * 2) / 3
+            # 1. 표지 슬라이드 (업체명 + 네이버플레이스 캡처)
+            if kind == SLIDE_COVER:
+                with tracer.span('slide', 'slide', shop=shop_name, kind=kind):
+                    self.add_cover_slide(prs, slide_layout, slide_plan)
+                continue
             
-            # 높이 체크
-            if square_size > available_height:
-                square_size = available_height
-            
-            # 시작 위치 계산 (중앙 정렬)
-            total_width = square_size * 3 + gap * 2
-            start_left = margin_left + (available_width - total_width) / 2
-            top = margin_top + (available_height - square_size) / 2
-            
-            for i, img_path in enumerate(images_to_add):
-                cropped_img = self.crop_image_to_square(img_path)
-                if cropped_img:
-                    left = start_left + (i * (square_size + gap))
-                    slide.shapes.add_picture(cropped_img, left, top, width=square_size, height=square_size)
-    
-    def add_shop_to_ppt(self, prs, shop_info, shop_number):
-        """업체 정보를 PPT에 추가합니다."""
-        naver_capture = shop_info.get('naver_capture')
-        price_images = shop_info.get('price_images', [])
-        images = shop_info['images']
-        shop_name = shop_info['name']
-        
-        slide_layout = prs.slide_layouts[6]  # Blank layout (placeholder 없음)
-        
-        # 1. 표지 슬라이드 (업체명 + 네이버플레이스 캡처)
+            # 2. 가격표 슬라이드 / 3. 업체 이미지 슬라이드 (최대 3개씩 배치)
+            label = "가격표" if kind == SLIDE_PRICE else "이미지"
+            slide = prs.slides.add_slide(slide_layout)
+            try:
+                with tracer.span('slide', 'slide', shop=shop_name, kind=kind):
+                    for picture in slide_plan['pictures']:
+                        self.add_planned_picture(slide, picture)
+                tracer.detail(f"  - {label} 슬라이드 추가: {slide_plan['count']}개 이미지")
+            except Exception as e:
+                tracer.error(f"  - {label} 추가 실패: {e}")
+    
+    def add_planned_picture(self, slide, picture):
+        """계획된 위치/크기에 처리된 이미지를 추가합니다.
+        
+        Returns:
+            추가 여부 (처리 실패 시 False, 네이버플레이스 캡처는 거부된 원본이 아니면 원본 파일로 대신 추가)
+        """
+        task = picture['task']
+        image = self.get_task_image(task)
+        if image is None and picture['role'] == ROLE_CAPTURE and task.path not in self.rejected:
+            image = task.path
+        if image is None:
+            return False
+        slide.shapes.add_picture(image, picture['left'], picture['top'], width=picture['width'], height=picture['height'])
+        return True
+    
+    def add_cover_slide(self, prs, slide_layout, slide_plan):
+        """업체 표지 슬라이드 (업체명 + 네이버플레이스 캡처)를 추가합니다."""
+        from pptx.util import Inches, Pt
+        shop_name = slide_plan['title']
         slide = prs.slides.add_slide(slide_layout)
         
         # 제목 텍스트 박스 추가 (샘플 형식대로)
@@ -329,171 +462,666 @@ class PPTImageInserter:
             paragraph.font.bold = True
         
         # 네이버플레이스 캡처 이미지 추가 (원본 비율 유지, 자르지 않음)
-        if naver_capture:
+        if slide_plan['pictures']:
             try:
-                img_dims = self.get_image_dimensions(naver_capture)
-                if img_dims:
-                    img_width, img_height = img_dims
-                    aspect_ratio = img_width / img_height
-                    
-                    # 슬라이드에 맞게 크기 조정 (자르지 않고 전체 표시)
-                    max_width = Inches(12)
-                    max_height = Inches(6)
-                    
-                    if aspect_ratio > max_width / max_height:
-                        width = max_width
-                        height = width / aspect_ratio
-                    else:
-                        height = max_height
-                        width = height * aspect_ratio
-                    
-                    left = (prs.slide_width - width) / 2
-                    top = Inches(1.2)
-                    
-                    slide.shapes.add_picture(naver_capture, left, top, width=width, height=height)
-                    print(f"  - 표지 슬라이드 추가: {shop_name} (네이버플레이스 캡처 포함)")
+                self.add_planned_picture(slide, slide_plan['pictures'][0])
+                tracer.detail(f"  - 표지 슬라이드 추가: {shop_name} (네이버플레이스 캡처 포함)")
             except Exception as e:
-                print(f"  - 네이버플레이스 캡처 추가 실패: {e}")
-                print(f"  - 표지 슬라이드 추가: {shop_name} (텍스트만)")
+                tracer.error(f"  - 네이버플레이스 캡처 추가 실패: {e}")
+                tracer.detail(f"  - 표지 슬라이드 추가: {shop_name} (텍스트만)")
         else:
-            print(f"  - 표지 슬라이드 추가: {shop_name}")
+            tracer.detail(f"  - 표지 슬라이드 추가: {shop_name}")
+    
+    def report_progress(self, **event):
+        """진행 상황 이벤트를 콜백으로 전달합니다."""
+        if self.progress_callback:
+            self.progress_callback(event)
+    
+    def add_title_slide(self, prs, title_text):
+        """표지 슬라이드를 추가합니다."""
+        from pptx.util import Inches
+        slide_layout = prs.slide_layouts[TITLE_LAYOUT]
+        slide = prs.slides.add_slide(slide_layout)
+        textbox = slide.shapes.add_textbox(Inches(4), Inches(3), Inches(5.33), Inches(1.5))
+        text_frame = textbox.text_frame
+        text_frame.text = title_text
+        for paragraph in text_frame.paragraphs:
+            paragraph.font.size = Inches(0.6)
+            paragraph.font.bold = True
+    
+    def build_deck(self, shop_plans, output_path, title_text):
+        """업체 계획 목록으로 PPT 파일 하나를 만들어 저장합니다 (샤드 워커, 계획 파일로 생성할 때 사용).
         
-        # 2. 가격표 슬라이드 추가 (가격표_*.jpg/png, 3개씩 배치)
-        if price_images:
-            idx = 0
-            while idx < len(price_images):
-                slide = prs.slides.add_slide(slide_layout)
-                
-                # 최대 3개씩 묶어서 배치
-                batch_images = price_images[idx:idx+3]
+        Returns:
+            생성된 슬라이드 수 (템플릿 슬라이드 포함)
+        """
+        prs, writer = self.open_deck(output_path)
+        try:
+            if self.preview:
+                self.plan_preview(shop_plans)
+            elif self.max_output_size:
+                self.plan_size_budget(shop_plans)
+            self.preprocess_images(shop_plans)
+            
+            self.add_title_slide(prs, title_text)
+            for idx, shop_plan in enumerate(shop_plans, 1):
+                tracer.detail(f"\n[{idx}/{len(shop_plans)}] {shop_plan['name']} 처리 중...")
+                shop_started = time.perf_counter()
+                slide_start = self.deck_slide_count(prs, writer)
+                with tracer.span('shop', 'shop', shop=shop_plan['name']):
+                    self.render_shop(prs, shop_plan)
+                    if writer:
+                        writer.flush()
                 
+                self.report_progress(
+                    event='shop', index=idx, total=len(shop_plans), name=shop_plan['name'],
+                    slides=self.deck_slide_count(prs, writer) - slide_start,
+                    images=len({path for task in plan_tasks([shop_plan]) for path in task_sources(task)}),
+                    reused=False,
+                    seconds=round(time.perf_counter() - shop_started, 4),
+                )
+            
+            slide_count = self.deck_slide_count(prs, writer)
+            self.save_deck(prs, writer, output_path)
+        except BaseException:
+            self.abort_deck(writer)
+            raise
+        self.report_rejected(output_path)
+        return slide_count
+    
+    def abort_deck(self, writer):
+        """생성 중 오류/중단(Ctrl+C 포함) 시 스트리밍 출력의 임시 파일을 지웁니다 (기존 출력 파일은 그대로)."""
+        if writer:
+            writer.abort()
+    
+    def save_deck(self, prs, writer, output_path):
+        """PPT 파일을 저장하고 쓴 바이트 수를 기록합니다."""
+        with tracer.span('save'):
+            if writer:
+                writer.close()
+            else:
+                prs.save(output_path)
+        # 이 출력 파일의 이전 증분 매니페스트는 더 이상 맞지 않음 (증분 모드는 저장 후 새로 기록)
+        incremental.remove_manifest(output_path)
+        output_size = os.path.getsize(output_path)
+        tracer.count('bytes_written', output_size)
+        if self.max_output_size:
+            if output_size > self.max_output_size:
+                tracer.error(f"경고: 출력 용량 {format_size(output_size)}이 예산 {format_size(self.max_output_size)}을 넘습니다.")
+            else:
+                tracer.info(f"출력 용량 {format_size(output_size)} (예산 {format_size(self.max_output_size)})")
+    
+    def report_rejected(self, output_path):
+        """처리하지 않은 원본(압축 폭탄 의심, 메모리 예산 초과, 잘린 파일)을 보고서로 저장하고,
+        격리 폴더가 있으면 원본을 옮겨 다음 탐색에서 제외합니다. 거부된 원본이 없으면 이전 보고서를 지웁니다.
+        """
+        report_path = rejection_report_path(output_path)
+        if not self.rejected:
+            if os.path.exists(report_path):
+                os.remove(report_path)
+            return
+        
+        tracer.error(f"\n처리하지 않은 이미지 {len(self.rejected)}개:")
+        report = []
+        for image_path, (reason, error) in self.rejected.items():
+            moved = None
+            if self.quarantine_dir and os.path.exists(image_path):
                 try:
-                    self.add_price_images_to_slide(prs, slide, batch_images)
-                    print(f"  - 가격표 슬라이드 추가: {len(batch_images)}개 이미지")
-                except Exception as e:
-                    print(f"  - 가격표 추가 실패: {e}")
-                
-                idx += 3
+                    moved = quarantine_file(image_path, self.base_image_dir, self.quarantine_dir)
+                except OSError as e:
+                    tracer.error(f"  격리 실패 ({image_path}): {e}")
+                self.forget_files([image_path])
+            tracer.error(f"  {REJECT_LABELS[reason]}: {image_path}" + (f" -> {moved}" if moved else ""))
+            report.append({'path': image_path, 'reason': reason, 'error': error, 'quarantined': moved})
         
-        # 3. 업체 이미지 슬라이드 추가 (업체_*.jpg) - 이미지를 그룹으로 묶어 처리
-        idx = 0
-        while idx < len(images):
-            slide = prs.slides.add_slide(slide_layout)
+        save_rejection_report(report_path, report)
+        tracer.info(f"거부된 이미지 보고서 저장: {report_path}")
+        self.rejected = {}
+    
+    def deck_slide_count(self, prs, writer=None):
+        """현재까지 만들어진 전체 슬라이드 수 (스트리밍 출력이면 이미 기록된 슬라이드 포함)"""
+        if writer:
+            return writer.slide_count + len(prs.slides) - writer.template_slide_count
+        return len(prs.slides)
+    
+    def estimate_shop_bytes(self, shop_plans):
+        """업체별 삽입 이미지 예상 용량 (계획의 그림별 예상 인코딩 크기 합계)
+        
+        Returns:
+            업체명 -> 예상 바이트 수
+        """
+        return {shop_plan['name']: sum(picture['estimated_bytes'] for picture in plan_pictures([shop_plan]))
+                for shop_plan in shop_plans}
+    
+    def create_sharded_ppt(self, shop_plans, title_text, shard_size=None, shard_bytes=None):
+        """업체 계획 목록을 샤드로 나누어 워커 프로세스에서 각각 PPT 파일로 만듭니다.
+        
+        샤드는 완성되는 즉시 저장되며, 마지막에 샤드 순서를 담은 매니페스트를 저장합니다.
+        """
+        shop_bytes = self.estimate_shop_bytes(shop_plans) if shard_bytes else None
+        shards = sharding.split_shards(shop_plans, max_shops=shard_size, max_bytes=shard_bytes, shop_bytes=shop_bytes)
+        tracer.info(f"\n샤드 모드: {len(shards)}개 샤드, 워커 {self.deck_workers(len(shards))}개")
+        
+        decks = [
+            (shard, sharding.shard_output_path(self.output_ppt_path, index + 1),
+             f"{title_text} ({index + 1}/{len(shards)})")
+            for index, shard in enumerate(shards)
+        ]
+        results = self.build_decks(decks, '샤드', 'shard')
+        
+        manifest_path = sharding.shard_manifest_path(self.output_ppt_path)
+        sharding.save_shard_manifest(manifest_path, results)
+        tracer.info(f"샤드 매니페스트 저장: {manifest_path}")
+        return all(not result['error'] for result in results)
+    
+    def create_batch_ppt(self, level=BATCH_DETAIL, sample_mode=False, sample_count=10):
+        """지역 또는 상세지역마다 PPT 파일을 하나씩 만듭니다.
+        
+        폴더 탐색, 엑셀 순서, 이미지 헤더는 한 번만 읽고, 이미지 캐시는 모든 워커가 함께 사용합니다.
+        덱은 예상 처리 비용(이미지 픽셀 수 합계)이 큰 것부터 프로세스 풀에 넣습니다.
+        """
+        tracer.info("=" * 60)
+        tracer.info(f"지역별 일괄 생성 시작 ({'지역' if level == BATCH_REGION else '상세지역'}별)")
+        tracer.info("=" * 60)
+        
+        shop_dirs, title_text = self.collect_shops(sample_mode, sample_count)
+        if not shop_dirs:
+            return False
+        
+        template = self.load_template()
+        groups = group_shops(shop_dirs, level)
+        decks = []
+        costs = {}
+        for key, group in groups:
+            output_path = batch_output_path(self.output_ppt_path, key)
+            decks.append((self.plan_shops(group, template.slide_width, template.slide_height), output_path,
+                          f"{title_text} - {' '.join(key)}"))
+            costs[output_path] = deck_cost(group, incremental.shop_input_files, self.get_image_dimensions)
+        
+        # 비용이 큰 덱부터 시작 (마지막에 큰 덱 하나만 남아 다른 워커가 쉬지 않도록)
+        order = sorted(range(len(decks)), key=lambda index: -costs[decks[index][1]])
+        tracer.info(f"\n일괄 생성: {len(decks)}개 덱, 워커 {self.deck_workers(len(decks))}개")
+        for index in order:
+            tracer.detail(f"  {os.path.basename(decks[index][1])}: 업체 {len(decks[index][0])}개, "
+                          f"{costs[decks[index][1]] / 1e6:.0f}M 픽셀")
+        
+        results = self.build_decks([decks[index] for index in order], '덱', 'deck')
+        for result in results:
+            result['cost'] = costs[result['path']]
+        
+        manifest_path = batch_manifest_path(self.output_ppt_path)
+        save_batch_manifest(manifest_path, results)
+        tracer.info(f"일괄 생성 매니페스트 저장: {manifest_path}")
+        return all(not result['error'] for result in results)
+    
+    def deck_workers(self, deck_count):
+        """덱을 동시에 만드는 워커 프로세스 수"""
+        return max(1, min(self.jobs or os.cpu_count() or 1, deck_count))
+    
+    def build_decks(self, decks, label, event):
+        """(업체 계획 목록, 출력 경로, 표지 제목) 목록을 워커 프로세스에서 주어진 순서대로 하나씩 만듭니다.
+        
+        Returns:
+            덱별 결과 목록 (입력 순서)
+        """
+        # 덱 수가 코어 수보다 적으면 (예: 지역 2-3개) 남는 코어를 덱마다 이미지 처리 워커로 나눠 줌
+        workers = self.deck_workers(len(decks))
+        options = {
+            'template_ppt_path': self.template_ppt_path,
+            'base_image_dir': self.base_image_dir,
+            'jobs': max(1, (self.jobs or os.cpu_count() or 1) // workers),
+            'dpi': self.dpi,
+            'jpeg_quality': self.jpeg_quality,
+            'cache_dir': self.cache.cache_dir if self.cache else None,
+            'cache_size': self.cache.max_bytes if self.cache else DEFAULT_CACHE_SIZE,
+            'streaming': self.streaming,
+            'dedup': self.dedup,
+            'composite_background': self.composite_background,
+            'max_output_size': self.max_output_size,
+            'decode_memory': self.decode_memory,
+            'max_image_pixels': self.max_image_pixels,
+            'quarantine_dir': self.quarantine_dir,
+            # 워커가 템플릿 파일을 다시 읽지 않도록 읽어 둔 스냅숏을 함께 전달
+            'template': self.load_template(),
+        }
+        
+        results = [None] * len(decks)
+        with sharding.shard_executor(workers) as executor:
+            futures = {}
+            for index, (shop_plans, output_path, title) in enumerate(decks):
+                future = executor.submit(build_shard, options, shop_plans, output_path, title, tracer.console)
+                futures[future] = index
             
-            # 이미지 분석 및 배치
+            for future in as_completed(futures):
+                index = futures[future]
+                results[index] = future.result()
+                tracer.merge(results[index].pop('trace'))
+                if results[index]['error']:
+                    tracer.error(f"  {label} {index + 1}/{len(decks)} 실패: {results[index]['error']}")
+                else:
+                    tracer.info(f"  {label} {index + 1}/{len(decks)} 저장 완료: {results[index]['path']}")
+                self.report_progress(event=event, index=index + 1, total=len(decks), **results[index])
+        return results
+    
+    def decode_limit_settings(self):
+        """증분 매니페스트에 기록할 디코딩 메모리 예산과 최대 픽셀 수 (기본값이면 None - 기록하지 않음)
+        
+        두 값 모두 어떤 이미지를 거부하는지(슬라이드에 들어가는 이미지)를 바꾸므로 출력에 영향을 줍니다.
+        """
+        return {
+            'decode_memory': None if self.decode_memory == DEFAULT_DECODE_MEMORY else self.decode_memory,
+            'max_image_pixels': None if self.max_image_pixels == DEFAULT_MAX_IMAGE_PIXELS else self.max_image_pixels,
+        }
+    
+    def plan_incremental_build(self, shop_dirs):
+        """이전 매니페스트와 비교하여 다시 생성할 업체와 재사용할 업체를 나눕니다.
+        
+        Returns:
+            (설정, 업체명 -> 입력 파일 상태, 업체명 -> 재사용할 이전 업체 정보, 이전 프레젠테이션)
+        """
+        settings = incremental.build_settings(self.template_ppt_path, self.dpi, self.jpeg_quality,
+                                              near_duplicates=self.near_duplicates,
+                                              composite_background=self.composite_background,
+                                              max_output_size=self.max_output_size,
+                                              **self.decode_limit_settings())
+        manifest_path = incremental.manifest_path_for(self.output_ppt_path)
+        previous = incremental.load_manifest(manifest_path, settings)
+        
+        previous_prs = None
+        previous_shops = {}
+        if previous and not incremental.output_matches(previous, self.output_ppt_path):
+            # 다른 실행이 출력 파일을 덮어썼으면 매니페스트의 슬라이드 범위를 믿을 수 없음
+            tracer.info("증분 모드: 출력 파일이 매니페스트와 달라 전체를 다시 생성합니다.")
+        elif previous:
             try:
-                # 모든 이미지를 3개씩 묶어서 배치 (가로/세로 구분 없이)
-                batch_images = images[idx:idx+3]
-                
-                self.add_images_to_slide(prs, slide, batch_images, prs.slide_height)
-                print(f"  - 이미지 슬라이드 추가: {len(batch_images)}개 이미지")
-                
-                idx += len(batch_images)
-                    
+                from pptx import Presentation
+                previous_prs = Presentation(self.output_ppt_path)
+                if len(previous_prs.slides) != previous['output']['slide_count']:
+                    raise ValueError(f"슬라이드 수 {len(previous_prs.slides)}개, "
+                                     f"매니페스트 {previous['output']['slide_count']}개")
+                previous_shops = {shop['name']: shop for shop in previous['shops']}
             except Exception as e:
-                print(f"  - 이미지 추가 실패: {e}")
-                idx += 3 if idx + 3 <= len(images) else len(images) - idx
+                previous_prs = None
+                tracer.error(f"증분 모드: 이전 출력 파일을 읽을 수 없어 전체를 다시 생성합니다 ({e})")
+        
+        shop_states = {}
+        reused = {}
+        for shop_info in shop_dirs:
+            previous_shop = previous_shops.get(shop_info['name'])
+            files = incremental.shop_state(shop_info, previous_shop)
+            shop_states[shop_info['name']] = files
+            # 매니페스트용으로 계산한 해시는 중복 이미지 확인에 다시 사용
+            self.source_digests.update((path, state['sha1']) for path, state in files)
+            if incremental.is_unchanged(files, previous_shop):
+                reused[shop_info['name']] = previous_shop
+        
+        removed = set(previous_shops) - set(shop_states)
+        tracer.info(f"증분 모드: 재사용 {len(reused)}개, 다시 생성 {len(shop_dirs) - len(reused)}개, 삭제 {len(removed)}개")
+        return settings, shop_states, reused, previous_prs
     
-    def create_ppt(self, sample_mode=False, sample_count=10):
-        """전체 PPT를 생성합니다.
+    def collect_shops(self, sample_mode=False, sample_count=10):
+        """업체 폴더를 찾아 정렬하고 이미지 헤더를 읽습니다.
         
-        Args:
-            sample_mode: 샘플 모드 여부 (True: 일부만 생성, False: 전체 생성)
-            sample_count: 샘플 모드일 때 생성할 업체 수
+        Returns:
+            (업체 정보 목록, 표지 제목) - 업체를 찾지 못하면 (None, None)
         """
-        print("=" * 60)
-        if sample_mode:
-            print(f"PPT 샘플 생성 시작 (최대 {sample_count}개 업체)")
-        else:
-            print("PPT 전체 생성 시작")
-        print("=" * 60)
-        
         # 업체 디렉토리 찾기
-        print(f"\n이미지 디렉토리 스캔 중: {self.base_image_dir}")
+        tracer.info(f"\n이미지 디렉토리 스캔 중: {self.base_image_dir}")
         shop_dirs = self.find_shop_directories()
         
         if not shop_dirs:
-            print(f"오류: 업체 디렉토리를 찾을 수 없습니다.")
-            print(f"경로를 확인하세요: {self.base_image_dir}")
-            return False
+            tracer.error(f"오류: 업체 디렉토리를 찾을 수 없습니다.")
+            tracer.error(f"경로를 확인하세요: {self.base_image_dir}")
+            return None, None
         
-        print(f"발견된 업체 수: {len(shop_dirs)}")
+        tracer.info(f"발견된 업체 수: {len(shop_dirs)}")
         
         # 샘플 모드일 경우 업체 수 제한
         if sample_mode:
             original_count = len(shop_dirs)
             shop_dirs = shop_dirs[:sample_count]
-            print(f"샘플 모드: {original_count}개 중 {len(shop_dirs)}개 업체만 처리합니다.")
+            tracer.info(f"샘플 모드: {original_count}개 중 {len(shop_dirs)}개 업체만 처리합니다.")
         
-        # 템플릿 PPT 로드
-        print(f"\n템플릿 PPT 로드 중: {self.template_ppt_path}")
-        prs = Presentation(self.template_ppt_path)
+        if sample_mode:
+            title_text = f"세신샵 업체 정보 (샘플 {len(shop_dirs)}개)"
+        else:
+            title_text = "세신샵 업체 정보"
         
-        # 표지 슬라이드 추가
-        slide_layout = prs.slide_layouts[5]
-        slide = prs.slides.add_slide(slide_layout)
-        textbox = slide.shapes.add_textbox(Inches(4), Inches(3), Inches(5.33), Inches(1.5))
-        text_frame = textbox.text_frame
+        # 이미지 헤더 일괄 조회 (배치 계산용 크기/방향)
+        self.probe_images(shop_dirs)
+        
+        # 업체마다 거의 같은 업체 사진 제외 (선택)
+        if self.near_duplicates is not None:
+            shop_dirs = self.filter_near_duplicates(shop_dirs)
+        
+        return shop_dirs, title_text
+    
+    def create_plan(self, plan_path, sample_mode=False, sample_count=10):
+        """이미지를 디코딩하지 않고 전체 슬라이드 배치 계획만 만들어 JSON으로 저장합니다 (미리 보기용 계산).
+        
+        계획에는 슬라이드마다 그림의 위치/크기, 원본, 처리 작업, 예상 인코딩 크기가 담기며
+        create_ppt_from_plan으로 계획대로 생성할 수 있습니다.
+        """
+        shop_dirs, title_text = self.collect_shops(sample_mode, sample_count)
+        if not shop_dirs:
+            return False
+        
+        template = self.load_template()
+        with tracer.span('plan', shops=len(shop_dirs)):
+            plan = plan_deck(shop_dirs, template.slide_width, template.slide_height, self.get_image_dimensions, title_text,
+                             template_ppt_path=self.template_ppt_path, dpi=self.dpi, quality=self.jpeg_quality,
+                             composite_background=self.composite_background)
+        save_plan(plan, plan_path)
+        
+        totals = plan['totals']
+        tracer.info("=" * 60)
+        tracer.info(f"계획 저장: {plan_path}")
+        tracer.info(f"  업체 {totals['shops']}개, 슬라이드 {totals['slides']}개 (템플릿 제외), "
+                    f"그림 {totals['pictures']}개, 미디어 {totals['media']}개")
+        tracer.info(f"  예상 출력 용량: {format_size(totals['estimated_bytes'])}")
+        tracer.info("=" * 60)
+        return True
+    
+    def create_preview_ppt(self, sample_mode=False, sample_count=10):
+        """최종 생성과 같은 배치로 작은 대체 이미지를 넣은 미리 보기 PPT를 만듭니다.
+        
+        덱 계획을 함께 저장하므로, 확정 후 create_ppt_from_plan으로 배치를 다시 계산하지 않고
+        원래 품질의 이미지로 바꿔 최종 PPT를 만들 수 있습니다.
+        """
+        tracer.info("=" * 60)
+        tracer.info(f"미리 보기 생성 시작 (긴 변 {self.preview}px)")
+        tracer.info("=" * 60)
+        
+        shop_dirs, title_text = self.collect_shops(sample_mode, sample_count)
+        if not shop_dirs:
+            return False
+        
+        template = self.load_template()
+        with tracer.span('plan', shops=len(shop_dirs)):
+            plan = plan_deck(shop_dirs, template.slide_width, template.slide_height, self.get_image_dimensions, title_text,
+                             template_ppt_path=self.template_ppt_path, dpi=self.dpi, quality=self.jpeg_quality,
+                             composite_background=self.composite_background)
+        plan_path = preview_plan_path(self.output_ppt_path)
+        save_plan(plan, plan_path)
+        
+        output_path = preview_output_path(self.output_ppt_path)
+        tracer.info(f"\n이미지 전처리 및 슬라이드 생성 중 (업체 {len(shop_dirs)}개)...")
+        self.build_deck(plan['shops'], output_path, title_text)
+        
+        tracer.info("=" * 60)
+        tracer.info(f"미리 보기 완료: {output_path} ({format_size(os.path.getsize(output_path))})")
+        tracer.info(f"계획 저장: {plan_path}")
+        tracer.info(f"최종 생성: --from-plan \"{plan_path}\" (같은 배치에 원래 품질 이미지)")
+        tracer.info("=" * 60)
+        return True
+    
+    def create_ppt_from_plan(self, plan_path, shard_size=None, shard_bytes=None):
+        """저장된 계획대로 PPT를 생성합니다 (폴더 탐색과 배치 계산 생략).
+        
+        샤드 옵션을 주면 계획을 업체 단위로 나누어 여러 프로세스에서 동시에 생성합니다.
+        """
+        tracer.info("=" * 60)
+        tracer.info(f"계획 파일로 PPT 생성: {plan_path}")
+        tracer.info("=" * 60)
+        try:
+            plan = load_plan(plan_path)
+        except (OSError, ValueError) as e:
+            tracer.error(f"오류: 계획 파일을 읽을 수 없습니다: {e}")
+            return False
+        
+        # 계획의 위치/크기는 계획을 만든 템플릿의 슬라이드 크기 기준
+        template = self.load_template()
+        if (template.slide_width, template.slide_height) != (plan['slide_width'], plan['slide_height']):
+            tracer.error("오류: 템플릿 슬라이드 크기가 계획과 다릅니다. 계획을 다시 만드세요.")
+            return False
+        
+        if shard_size or shard_bytes:
+            return self.create_sharded_ppt(plan['shops'], plan['title'], shard_size=shard_size, shard_bytes=shard_bytes)
+        
+        tracer.info(f"\n이미지 전처리 및 슬라이드 생성 중 (업체 {len(plan['shops'])}개)...")
+        self.build_deck(plan['shops'], self.output_ppt_path, plan['title'])
+        tracer.info(f"출력 파일: {self.output_ppt_path}")
+        return True
+    
+    def create_ppt(self, sample_mode=False, sample_count=10, incremental_mode=False, shard_size=None, shard_bytes=None):
+        """전체 PPT를 생성합니다.
+        
+        Args:
+            sample_mode: 샘플 모드 여부 (True: 일부만 생성, False: 전체 생성)
+            sample_count: 샘플 모드일 때 생성할 업체 수
+            incremental_mode: 증분 모드 (이전 출력과 매니페스트를 비교하여 변경된 업체만 다시 생성)
+            shard_size: 샤드당 업체 수 (지정하면 여러 PPT 파일로 나누어 병렬 생성)
+            shard_bytes: 샤드당 목표 이미지 용량 (바이트)
+        """
+        tracer.info("=" * 60)
         if sample_mode:
-            text_frame.text = f"세신샵 업체 정보 (샘플 {len(shop_dirs)}개)"
+            tracer.info(f"PPT 샘플 생성 시작 (최대 {sample_count}개 업체)")
         else:
-            text_frame.text = "세신샵 업체 정보"
-        for paragraph in text_frame.paragraphs:
-            paragraph.font.size = Inches(0.6)
-            paragraph.font.bold = True
+            tracer.info("PPT 전체 생성 시작")
+        tracer.info("=" * 60)
+        
+        shop_dirs, title_text = self.collect_shops(sample_mode, sample_count)
+        if not shop_dirs:
+            return False
+        
+        # 템플릿 PPT 로드
+        tracer.info(f"\n템플릿 PPT 로드 중: {self.template_ppt_path}")
+        template = self.load_template()
         
-        print("\n업체별 슬라이드 생성 중...")
+        # 슬라이드 배치 계획 (헤더 정보만 사용, 이미지 디코딩 없음)
+        shop_plans = self.plan_shops(shop_dirs, template.slide_width, template.slide_height)
         
-        # 각 업체별로 슬라이드 추가
-        for idx, shop_info in enumerate(shop_dirs, 1):
-            print(f"\n[{idx}/{len(shop_dirs)}] {shop_info['name']} 처리 중...")
-            print(f"  이미지 수: {len(shop_info['images'])}")
-            self.add_shop_to_ppt(prs, shop_info, idx)
+        # 샤드 모드: 여러 PPT 파일로 나누어 워커 프로세스에서 생성
+        if shard_size or shard_bytes:
+            if incremental_mode:
+                tracer.info("샤드 모드에서는 증분 모드를 사용하지 않습니다.")
+            return self.create_sharded_ppt(shop_plans, title_text, shard_size=shard_size, shard_bytes=shard_bytes)
         
-        # PPT 저장
-        print(f"\nPPT 저장 중: {self.output_ppt_path}")
-        prs.save(self.output_ppt_path)
+        # 스트리밍 출력: 템플릿을 복사한 출력 파일에 업체별로 바로 기록
+        prs, writer = self.open_deck(self.output_ppt_path)
+        try:
+            # 증분 모드: 변경되지 않은 업체는 이전 출력에서 슬라이드를 재사용
+            reused = {}
+            previous_prs = None
+            if incremental_mode:
+                settings, shop_states, reused, previous_prs = self.plan_incremental_build(shop_dirs)
+            
+            # 예산 모드: 재사용하는 업체까지 포함한 전체 용량 기준으로 이미지별 품질/해상도 결정
+            if self.max_output_size:
+                self.plan_size_budget(shop_plans)
+            
+            # 이미지 전처리 (병렬, 배치 크기에 맞춰 축소)
+            # 파이프라인 모드에서는 슬라이드를 조립하면서 앞선 업체의 이미지를 읽고 처리
+            build_plans = [shop_plan for shop_plan in shop_plans if shop_plan['name'] not in reused]
+            pipeline = None
+            if self.pipeline_depth:
+                pipeline = self.start_pipeline(build_plans)
+            else:
+                tracer.info(f"\n이미지 전처리 중 (워커 {self.jobs or os.cpu_count()}개, {self.dpi}dpi)...")
+                self.preprocess_images(build_plans)
+            
+            # 표지 슬라이드 추가
+            self.add_title_slide(prs, title_text)
+            
+            tracer.info("\n업체별 슬라이드 생성 중...")
+            
+            # 각 업체별로 슬라이드 추가
+            manifest_shops = []
+            for idx, (shop_info, shop_plan) in enumerate(zip(shop_dirs, shop_plans), 1):
+                shop_started = time.perf_counter()
+                slide_start = self.deck_slide_count(prs, writer)
+                previous_shop = reused.get(shop_info['name'])
+                
+                if previous_shop:
+                    tracer.detail(f"\n[{idx}/{len(shop_dirs)}] {shop_info['name']} 변경 없음 (이전 슬라이드 재사용)")
+                    start = previous_shop['slide_start']
+                    with tracer.span('copy_slides', 'shop', shop=shop_info['name']):
+                        for src_slide in list(previous_prs.slides)[start:start + previous_shop['slide_count']]:
+                            incremental.copy_slide(src_slide, prs, prs.slide_layouts[BLANK_LAYOUT])
+                else:
+                    tracer.detail(f"\n[{idx}/{len(shop_dirs)}] {shop_info['name']} 처리 중...")
+                    tracer.detail(f"  이미지 수: {len(shop_info['images'])}")
+                    if pipeline:
+                        with tracer.span('wait', 'shop', shop=shop_info['name']):
+                            self.processed_images = next(pipeline)
+                    with tracer.span('shop', 'shop', shop=shop_info['name']):
+                        self.render_shop(prs, shop_plan)
+                
+                if incremental_mode:
+                    manifest_shops.append({
+                        'name': shop_info['name'],
+                        'files': shop_states[shop_info['name']],
+                        'slide_start': slide_start,
+                        'slide_count': self.deck_slide_count(prs, writer) - slide_start,
+                    })
+                
+                # 완성된 업체 슬라이드는 바로 파일에 기록하고 메모리에서 제거
+                if writer:
+                    with tracer.span('flush', 'shop', shop=shop_info['name']):
+                        writer.flush()
+                
+                self.report_progress(
+                    event='shop', index=idx, total=len(shop_dirs), name=shop_info['name'],
+                    slides=self.deck_slide_count(prs, writer) - slide_start,
+                    images=len(incremental.shop_input_files(shop_info)),
+                    reused=previous_shop is not None,
+                    seconds=round(time.perf_counter() - shop_started, 4),
+                )
+            
+            if pipeline:
+                pipeline.close()
+                self.processed_images = {}
+                self.report_cache()
+            
+            # PPT 저장
+            tracer.info(f"\nPPT 저장 중: {self.output_ppt_path}")
+            slide_count = self.deck_slide_count(prs, writer)
+            if incremental_mode and not writer:
+                # 매니페스트와 출력 파일이 어긋나지 않도록 임시 파일에 저장한 뒤 교체
+                tmp_path = self.output_ppt_path + '.tmp'
+                self.save_deck(prs, None, tmp_path)
+                os.replace(tmp_path, self.output_ppt_path)
+            else:
+                self.save_deck(prs, writer, self.output_ppt_path)
+        except BaseException:
+            self.abort_deck(writer)
+            raise
+        self.report_rejected(self.output_ppt_path)
+        if incremental_mode:
+            incremental.save_manifest(incremental.manifest_path_for(self.output_ppt_path), settings, manifest_shops,
+                                      output=incremental.output_state(self.output_ppt_path, slide_count))
         
-        print("=" * 60)
+        tracer.info("=" * 60)
         if sample_mode:
-            print(f"샘플 완료! {len(shop_dirs)}개 업체의 슬라이드가 생성되었습니다.")
+            tracer.info(f"샘플 완료! {len(shop_dirs)}개 업체의 슬라이드가 생성되었습니다.")
         else:
-            print(f"전체 완료! 총 {len(shop_dirs)}개 업체의 슬라이드가 생성되었습니다.")
-        print(f"출력 파일: {self.output_ppt_path}")
-        print("=" * 60)
+            tracer.info(f"전체 완료! 총 {len(shop_dirs)}개 업체의 슬라이드가 생성되었습니다.")
+        tracer.info(f"출력 파일: {self.output_ppt_path}")
+        tracer.info("=" * 60)
         
         return True
 
 
-def main():
-    """메인 실행 함수"""
+def build_shard(options, shop_plans, output_path, title_text, console=CONSOLE_VERBOSE):
+    """샤드 하나를 생성합니다. (워커 프로세스에서 실행)
     
-    # ========================================
-    # 설정 값 (필요에 따라 수정하세요)
-    # ========================================
-    
-    # 스크립트가 있는 현재 디렉토리 경로
-    SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-    
-    # 이미지 디렉토리 (naver-map-photo-downloader의 downloads 폴더)
-    BASE_IMAGE_DIR = r"C:\Users\user\Documents\GitHub\naver-map-photo-downloader\downloads"
-    
-    # 템플릿 PPT 파일 (스크립트와 같은 폴더)
-    TEMPLATE_PPT = os.path.join(SCRIPT_DIR, "세신샵.pptx")
-    
-    # 엑셀 파일 (업체 순서 정보, 스크립트와 같은 폴더)
-    EXCEL_FILE = os.path.join(SCRIPT_DIR, "리스트_네이버지도링크추가 - 복사본.xlsx")
-    
-    # 출력 PPT 파일 (스크립트와 같은 폴더)
-    OUTPUT_PPT = os.path.join(SCRIPT_DIR, "세신샵_완성본.pptx")
-    
-    # ========================================
-    
-    # 경로 확인
-    if not os.path.exists(TEMPLATE_PPT):
-        print(f"오류: 템플릿 PPT 파일을 찾을 수 없습니다: {TEMPLATE_PPT}")
-        return
+    결과의 'trace'에는 워커에서 기록한 계측 구간/카운터가 담기며, 메인 프로세스에서 합칩니다.
+    """
+    started = time.perf_counter()
+    tracer.set_console(console)
+    try:
+        inserter = PPTImageInserter(output_ppt_path=output_path, **options)
+        # 워커 로그는 표준 오류로 보내 표준 출력(JSON 진행 상황 등)과 섞이지 않게 함
+        with contextlib.redirect_stdout(sys.stderr):
+            slide_count = inserter.build_deck(shop_plans, output_path, title_text)
+        return {
+            'path': output_path,
+            'shops': [shop_plan['name'] for shop_plan in shop_plans],
+            'slide_count': slide_count,
+            'bytes': os.path.getsize(output_path),
+            'seconds': round(time.perf_counter() - started, 4),
+            'error': None,
+            'trace': tracer.snapshot(),
+        }
+    except Exception as e:
+        return {
+            'path': output_path,
+            'shops': [shop_plan['name'] for shop_plan in shop_plans],
+            'slide_count': 0,
+            'bytes': 0,
+            'seconds': round(time.perf_counter() - started, 4),
+            'error': str(e),
+            'trace': tracer.snapshot(),
+        }
+
+
+def parse_args(argv):
+    """명령행 인자를 해석합니다."""
+    parser = argparse.ArgumentParser(
+        description="업체 이미지를 템플릿 PPT에 자동으로 삽입합니다. 인자 없이 실행하면 대화형 메뉴를 사용합니다.",
+    )
+    parser.add_argument('--template', default=TEMPLATE_PPT, help="템플릿 PPT 파일")
+    parser.add_argument('--image-dir', default=BASE_IMAGE_DIR, help="이미지 기본 디렉토리 (downloads 폴더)")
+    parser.add_argument('--excel', default=EXCEL_FILE, help="업체 순서 엑셀/CSV 파일 (빈 문자열이면 이름순)")
+    parser.add_argument('--output', default=OUTPUT_PPT, help="출력 PPT 파일")
+    parser.add_argument('--sample', type=int, default=0, metavar='N', help="처음 N개 업체만 생성 (0이면 전체)")
+    parser.add_argument('--jobs', type=int, default=None, help="워커 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="처리된 이미지 캐시 폴더 (빈 문자열이면 사용 안 함)")
+    parser.add_argument('--index', default=INDEX_FILE, help="폴더 탐색 인덱스 파일 (빈 문자열이면 사용 안 함)")
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI, help="삽입 이미지 해상도")
+    parser.add_argument('--quality', type=int, default=DEFAULT_JPEG_QUALITY, help="JPEG 품질 (1-95)")
+    parser.add_argument('--shard-size', type=int, default=None, metavar='N', help="샤드당 업체 수 (지정하면 여러 파일로 분할)")
+    parser.add_argument('--shard-bytes', type=int, default=None, metavar='BYTES', help="샤드당 목표 이미지 용량")
+    parser.add_argument('--incremental', action='store_true', help="변경된 업체만 다시 생성")
+    parser.add_argument('--streaming', action='store_true', help="업체별로 바로 파일에 기록 (메모리 절약)")
+    parser.add_argument('--no-dedup', dest='dedup', action='store_false',
+                        help="원본 내용이 같은 이미지도 따로 처리 (내용 해시 계산 생략)")
+    parser.add_argument('--near-duplicates', type=int, nargs='?', const=DEFAULT_NEAR_DUPLICATE_DISTANCE, default=None,
+                        metavar='DISTANCE', help=f"업체마다 거의 같은 업체 사진 제외 (dHash 거리, 기본 {DEFAULT_NEAR_DUPLICATE_DISTANCE})")
+    parser.add_argument('--composite', type=parse_color, nargs='?', const=DEFAULT_COMPOSITE_BACKGROUND, default=None,
+                        metavar='COLOR', help=f"합성 모드: 이미지가 2-3개인 슬라이드를 이미지 하나로 합성 (간격 배경색, 기본 {DEFAULT_COMPOSITE_BACKGROUND})")
+    parser.add_argument('--pipeline', type=int, nargs='?', const=DEFAULT_PIPELINE_DEPTH, default=None, metavar='SHOPS',
+                        help=f"파이프라인 모드: 조립 중인 업체보다 SHOPS개 앞서 읽고 처리 (기본 {DEFAULT_PIPELINE_DEPTH}, "
+                             "네트워크 드라이브에서 읽기와 처리를 겹쳐 실행하고 메모리 사용을 제한)")
+    parser.add_argument('--io-threads', type=int, default=DEFAULT_IO_THREADS, help="파이프라인 모드의 파일 읽기 스레드 수")
+    parser.add_argument('--max-output-size', type=parse_size, default=None, metavar='SIZE',
+                        help="출력 파일 최대 용량 (예: 25MB) - 이미지마다 JPEG 품질과 해상도를 낮춰 맞춤 "
+                             "(가격표/캡처는 더 높은 최소 품질 유지, 샤드 모드에서는 샤드 파일마다)")
+    parser.add_argument('--decode-memory', type=parse_size, default=DEFAULT_DECODE_MEMORY, metavar='SIZE',
+                        help="원본 한 장의 디코딩 메모리 최대 용량 (기본 128MB) - 넘으면 더 작게 축소 디코딩하고, "
+                             "그래도 넘으면 처리하지 않고 보고")
+    parser.add_argument('--max-image-pixels', type=int, default=DEFAULT_MAX_IMAGE_PIXELS, metavar='N',
+                        help="원본 최대 픽셀 수 (기본 2억) - 넘으면 압축 폭탄으로 보고 처리하지 않음")
+    parser.add_argument('--quarantine', metavar='DIR', default=None,
+                        help="처리하지 않은 원본(압축 폭탄 의심, 메모리 예산 초과, 잘린 파일)을 이 폴더로 옮김")
+    parser.add_argument('--preview', type=int, nargs='?', const=PREVIEW_LONG_EDGE, default=None, metavar='PX',
+                        help="미리 보기 모드: 최종과 같은 배치로 긴 변이 PX(기본 256) 이하인 저품질 이미지를 넣어 "
+                             "<출력>_preview.pptx로 빠르게 생성하고, 최종 생성용 계획 <출력>.plan.json을 함께 저장")
+    parser.add_argument('--batch', choices=BATCH_LEVELS, default=None,
+                        help="지역별 일괄 생성: 지역(region) 또는 상세지역(detail)마다 PPT 파일 하나 "
+                             "(탐색/엑셀/캐시 공유, 이미지가 많은 덱부터 병렬 생성)")
+    parser.add_argument('--plan', metavar='FILE',
+                        help="이미지를 디코딩하지 않고 슬라이드 배치 계획(그림 위치/크기, 원본, 예상 용량)만 JSON으로 저장")
+    parser.add_argument('--from-plan', metavar='FILE', help="저장된 계획대로 PPT 생성 (샤드 옵션과 함께 쓰면 병렬 생성)")
+    parser.add_argument('--watch', type=float, nargs='?', const=DEFAULT_POLL_INTERVAL, default=None, metavar='SECONDS',
+                        help=f"감시 모드: 폴더를 주기적으로 확인하여 변경된 업체만 다시 생성 (증분 모드, 기본 {DEFAULT_POLL_INTERVAL}초)")
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE, metavar='SECONDS',
+                        help="감시 모드에서 업체 폴더 변경 후 다시 생성하기 전 기다릴 시간")
+    parser.add_argument('--profile', metavar='FILE', help="cProfile 결과 저장 파일")
+    parser.add_argument('--progress', choices=['text', 'json'], default='text',
+                        help="진행 상황 출력 형식 (json: 업체마다 한 줄씩 표준 출력, 일반 로그는 표준 오류)")
+    parser.add_argument('--log', choices=CONSOLE_MODES, default=CONSOLE_VERBOSE,
+                        help="콘솔 로그 수준 (verbose: 업체/슬라이드별 상세, summary: 단계 요약과 단계별 시간 표, quiet: 오류만)")
+    parser.add_argument('--trace', metavar='FILE', help="Chrome 트레이스 이벤트 JSON 저장 파일 (chrome://tracing, Perfetto)")
+    return parser.parse_args(argv)
+
+
+def choose_mode_interactively():
+    """대화형 메뉴로 작업 모드를 선택합니다.
     
+    Returns:
+        (샘플 업체 수, 출력 파일) 또는 취소 시 None
+    """
     # 작업 모드 선택
     print("\n" + "=" * 60)
     print("PPT 자동 생성 프로그램")
@@ -509,14 +1137,12 @@ def main():
             
             if choice == "1":
                 # 샘플 모드
-                sample_mode = True
                 sample_count = 10
                 output_file = OUTPUT_PPT.replace(".pptx", "_샘플.pptx")
                 print(f"\n✓ 샘플 모드 선택됨 (처음 {sample_count}개 업체)")
                 break
             elif choice == "2":
                 # 전체 작업
-                sample_mode = False
                 sample_count = 0
                 output_file = OUTPUT_PPT
                 print("\n✓ 전체 작업 모드 선택됨 (모든 업체)")
@@ -525,12 +1151,12 @@ def main():
                 print("❌ 잘못된 입력입니다. 1 또는 2를 입력하세요.")
         except KeyboardInterrupt:
             print("\n\n프로그램을 종료합니다.")
-            return
+            return None
     
     # 확인 메시지
     print("\n" + "=" * 60)
     print("설정 확인:")
-    print(f"  - 모드: {'샘플 (10개)' if sample_mode else '전체 작업'}")
+    print(f"  - 모드: {'샘플 (10개)' if sample_count else '전체 작업'}")
     print(f"  - 이미지 디렉토리: {BASE_IMAGE_DIR}")
     print(f"  - 엑셀 파일: {EXCEL_FILE}")
     print(f"  - 출력 파일: {output_file}")
@@ -539,18 +1165,133 @@ def main():
     proceed = input("\n진행하시겠습니까? (y/n): ").strip().lower()
     if proceed != 'y':
         print("작업을 취소합니다.")
-        return
+        return None
+    return sample_count, output_file
+
+
+def main(argv=None):
+    """메인 실행 함수
+    
+    Returns:
+        종료 코드 (0: 성공, 1: 실패)
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    args = parse_args(argv)
+    
+    # 경로 확인
+    if not os.path.exists(args.template):
+        print(f"오류: 템플릿 PPT 파일을 찾을 수 없습니다: {args.template}", file=sys.stderr)
+        return 1
+    
+    if args.watch is not None and (args.shard_size or args.shard_bytes):
+        print("오류: 감시 모드는 샤드 모드와 함께 사용할 수 없습니다.", file=sys.stderr)
+        return 1
+    
+    if args.batch and (args.plan or args.from_plan or args.watch is not None or args.incremental
+                       or args.shard_size or args.shard_bytes):
+        print("오류: --batch는 --plan, --from-plan, --watch, --incremental, 샤드 옵션과 함께 사용할 수 없습니다.",
+              file=sys.stderr)
+        return 1
+    
+    if args.preview and (args.plan or args.from_plan or args.batch or args.watch is not None or args.incremental
+                         or args.shard_size or args.shard_bytes or args.max_output_size):
+        print("오류: --preview는 --plan, --from-plan, --batch, --watch, --incremental, --max-output-size, "
+              "샤드 옵션과 함께 사용할 수 없습니다.", file=sys.stderr)
+        return 1
+    
+    if args.from_plan and (args.plan or args.watch is not None or args.incremental):
+        print("오류: --from-plan은 --plan, --watch, --incremental과 함께 사용할 수 없습니다.", file=sys.stderr)
+        return 1
+    
+    if argv:
+        sample_count, output_file = args.sample, args.output
+    else:
+        selected = choose_mode_interactively()
+        if not selected:
+            return 1
+        sample_count, output_file = selected
     
     # PPT 생성기 실행
     inserter = PPTImageInserter(
-        template_ppt_path=TEMPLATE_PPT,
-        base_image_dir=BASE_IMAGE_DIR,
+        template_ppt_path=args.template,
+        base_image_dir=args.image_dir,
         output_ppt_path=output_file,
-        excel_path=EXCEL_FILE
+        excel_path=args.excel or None,
+        jobs=args.jobs,
+        dpi=args.dpi,
+        jpeg_quality=args.quality,
+        cache_dir=args.cache_dir or None,
+        index_path=args.index or None,
+        streaming=args.streaming,
+        dedup=args.dedup,
+        near_duplicates=args.near_duplicates,
+        composite_background=args.composite,
+        pipeline_depth=args.pipeline,
+        io_threads=args.io_threads,
+        max_output_size=args.max_output_size,
+        decode_memory=args.decode_memory,
+        max_image_pixels=args.max_image_pixels,
+        quarantine_dir=args.quarantine,
+        preview=args.preview,
     )
     
-    inserter.create_ppt(sample_mode=sample_mode, sample_count=sample_count)
+    # JSON 진행 상황은 표준 출력에 한 줄씩, 일반 로그는 표준 오류로 분리
+    log_stream = sys.stdout
+    if args.progress == 'json':
+        progress_stream = sys.stdout
+        log_stream = sys.stderr
+        
+        def report(event):
+            progress_stream.write(json.dumps(event, ensure_ascii=False) + "\n")
+            progress_stream.flush()
+        
+        inserter.progress_callback = report
+    
+    tracer.set_console(args.log)
+    profiler = cProfile.Profile() if args.profile else None
+    with contextlib.redirect_stdout(log_stream):
+        if profiler:
+            profiler.enable()
+        try:
+            def build():
+                return inserter.create_ppt(
+                    sample_mode=sample_count > 0,
+                    sample_count=sample_count,
+                    incremental_mode=args.incremental or args.watch is not None,
+                    shard_size=args.shard_size,
+                    shard_bytes=args.shard_bytes,
+                )
+            
+            if args.preview:
+                # 미리 보기: 작은 대체 이미지로 빠르게 생성하고 최종 생성용 계획 저장
+                success = inserter.create_preview_ppt(sample_mode=sample_count > 0, sample_count=sample_count)
+            elif args.batch:
+                # 지역별 일괄 생성: 출력 파일 이름 뒤에 지역 이름을 붙여 덱마다 저장
+                success = inserter.create_batch_ppt(args.batch, sample_mode=sample_count > 0, sample_count=sample_count)
+            elif args.plan:
+                # 계획만 저장 (이미지 디코딩 없음)
+                success = inserter.create_plan(args.plan, sample_mode=sample_count > 0, sample_count=sample_count)
+            elif args.from_plan:
+                success = inserter.create_ppt_from_plan(args.from_plan, shard_size=args.shard_size,
+                                                        shard_bytes=args.shard_bytes)
+            elif args.watch is not None:
+                # 감시 모드: 탐색 인덱스/캐시를 유지한 채 변경된 업체만 다시 생성
+                success = ShopWatcher(inserter, interval=args.watch, debounce=args.debounce).run(build)
+            else:
+                success = build()
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(args.profile)
+                tracer.info(f"프로파일 저장: {args.profile}")
+            if args.trace:
+                tracer.export_trace(args.trace)
+                tracer.info(f"트레이스 저장: {args.trace}")
+            if args.log == CONSOLE_SUMMARY:
+                tracer.info("\n" + tracer.summary_table())
+    
+    return 0 if success else 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
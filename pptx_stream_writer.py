@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스트리밍 PPTX 출력
+템플릿 패키지를 그대로 복사한 zip에 업체별 슬라이드 XML과 이미지 파트를
+완성되는 즉시 추가하고, 마지막에 presentation.xml / 관계(rels) / [Content_Types].xml만 씁니다.
+python-pptx는 슬라이드를 만드는 데만 사용하며, 기록이 끝난 슬라이드는 메모리에서 바로 제거하므로
+메모리 사용량이 전체 덱이 아니라 업체 하나 분량에 비례합니다.
+"""
+
+import os
+import re
+import hashlib
+import posixpath
+import zipfile
+from xml.sax.saxutils import quoteattr
+
+from lxml import etree
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+
+CONTENT_TYPES_NAME = '[Content_Types].xml'
+PRESENTATION_NAME = 'ppt/presentation.xml'
+PRESENTATION_RELS_NAME = 'ppt/_rels/presentation.xml.rels'
+
+NS_CONTENT_TYPES = 'http://schemas.openxmlformats.org/package/2006/content-types'
+NS_RELATIONSHIPS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+NS_PRESENTATIONML = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+NS_OFFICE_RELS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\r\n'
+
+
+def max_part_number(names, pattern):
+    """zip 항목 이름 중 패턴(숫자 그룹 1개)에 맞는 가장 큰 번호"""
+    numbers = [int(match.group(1)) for match in (re.match(pattern, name) for name in names) if match]
+    return max(numbers, default=0)
+
+
+class StreamingPptxWriter:
+    def __init__(self, template_ppt_path, output_path):
+        """
+        Args:
+            template_ppt_path: 템플릿 PPT 파일 경로 또는 템플릿 패키지 바이트를 담은 파일 객체
+                (예: io.BytesIO(TemplateSnapshot.data), 기존 슬라이드/레이아웃/미디어는 그대로 복사)
+            output_path: 출력 PPT 파일 경로 (임시 파일에 쓴 뒤 close()에서 교체, 실패하면 abort()로 삭제)
+        """
+        self.output_path = output_path
+        self.tmp_path = output_path + '.tmp'
+
+        # 슬라이드 생성용 프레젠테이션 (템플릿 슬라이드 뒤에 추가된 슬라이드만 기록 후 제거)
+        self.prs = Presentation(template_ppt_path)
+        self.template_slide_count = len(self.prs.slides)
+
+        self.zip = zipfile.ZipFile(self.tmp_path, 'w', zipfile.ZIP_DEFLATED)
+        with zipfile.ZipFile(template_ppt_path) as template:
+            names = template.namelist()
+            for name in names:
+                if name in (CONTENT_TYPES_NAME, PRESENTATION_NAME, PRESENTATION_RELS_NAME):
+                    continue
+                self.zip.writestr(template.getinfo(name), template.read(name))
+
+            self.content_types = etree.fromstring(template.read(CONTENT_TYPES_NAME))
+            self.presentation = etree.fromstring(template.read(PRESENTATION_NAME))
+            self.presentation_rels = etree.fromstring(template.read(PRESENTATION_RELS_NAME))
+
+        self.next_slide_number = max_part_number(names, r'ppt/slides/slide(\d+)\.xml$') + 1
+        self.next_media_number = max_part_number(names, r'ppt/media/\D*(\d+)\.\w+$') + 1
+        self.default_extensions = {
+            element.get('Extension').lower()
+            for element in self.content_types.iter(f'{{{NS_CONTENT_TYPES}}}Default')
+        }
+
+        # 이미지 SHA1 -> 기록된 미디어 파트 이름 (같은 이미지는 한 번만 기록)
+        self.media_parts = {}
+        # 추가된 슬라이드 파트 이름 목록 (순서대로)
+        self.slide_names = []
+
+    @property
+    def slide_count(self):
+        """지금까지 기록된 전체 슬라이드 수 (템플릿 슬라이드 포함)"""
+        return self.template_slide_count + len(self.slide_names)
+
+    def write_media(self, image_part):
+        """이미지 파트를 기록하고 zip 안의 이름을 돌려줍니다."""
+        blob = image_part.blob
+        digest = hashlib.sha1(blob).hexdigest()
+        if digest in self.media_parts:
+            return self.media_parts[digest]
+
+        ext = image_part.partname.ext.lower()
+        name = f"ppt/media/image{self.next_media_number}.{ext}"
+        self.next_media_number += 1
+
+        # 이미 압축된 이미지는 다시 압축하지 않음
+        self.zip.writestr(name, blob, compress_type=zipfile.ZIP_STORED)
+        if ext not in self.default_extensions:
+            etree.SubElement(self.content_types, f'{{{NS_CONTENT_TYPES}}}Default',
+                             Extension=ext, ContentType=image_part.content_type)
+            self.default_extensions.add(ext)
+
+        self.media_parts[digest] = name
+        return name
+
+    def write_slide(self, slide):
+        """슬라이드 XML과 관계 파일, 참조하는 이미지를 기록합니다."""
+        name = f"ppt/slides/slide{self.next_slide_number}.xml"
+        self.next_slide_number += 1
+
+        relationships = []
+        for rId, rel in slide.part.rels.items():
+            if rel.is_external:
+                target, mode = rel.target_ref, ' TargetMode="External"'
+            elif rel.reltype == RT.IMAGE:
+                target, mode = '../media/' + posixpath.basename(self.write_media(rel.target_part)), ''
+            else:
+                # 슬라이드 레이아웃 등 템플릿에 있는 파트는 이름이 같으므로 그대로 참조
+                target, mode = rel.target_ref, ''
+            relationships.append(
+                f'<Relationship Id={quoteattr(rId)} Type={quoteattr(rel.reltype)} Target={quoteattr(target)}{mode}/>'
+            )
+
+        rels_xml = (f'<Relationships xmlns="{NS_RELATIONSHIPS}">' + ''.join(relationships) + '</Relationships>')
+        self.zip.writestr(name, slide.part.blob)
+        self.zip.writestr(f"ppt/slides/_rels/{posixpath.basename(name)}.rels",
+                          XML_DECLARATION + rels_xml.encode('utf-8'))
+
+        etree.SubElement(self.content_types, f'{{{NS_CONTENT_TYPES}}}Override',
+                         PartName='/' + name, ContentType=slide.part.content_type)
+        self.slide_names.append(name)
+
+    def flush(self):
+        """템플릿 뒤에 추가된 슬라이드를 모두 기록하고 생성용 프레젠테이션에서 제거합니다."""
+        sld_id_lst = self.prs.slides._sldIdLst
+        for sld_id in list(sld_id_lst)[self.template_slide_count:]:
+            self.write_slide(self.prs.part.related_slide(sld_id.rId))
+            sld_id_lst.remove(sld_id)
+            self.prs.part.drop_rel(sld_id.rId)
+
+    def write_presentation(self):
+        """presentation.xml의 슬라이드 목록과 관계 파일에 추가된 슬라이드를 등록합니다."""
+        rel_numbers = [int(rel.get('Id')[3:]) for rel in self.presentation_rels
+                       if rel.get('Id', '').startswith('rId') and rel.get('Id')[3:].isdigit()]
+        next_rel_number = max(rel_numbers, default=0) + 1
+
+        sld_id_lst = self.presentation.find(f'{{{NS_PRESENTATIONML}}}sldIdLst')
+        if sld_id_lst is None:
+            # 슬라이드가 없는 템플릿: 마스터/노트/유인물 목록 바로 뒤에 추가
+            sld_id_lst = etree.Element(f'{{{NS_PRESENTATIONML}}}sldIdLst')
+            anchor = None
+            for tag in ('sldMasterIdLst', 'notesMasterIdLst', 'handoutMasterIdLst'):
+                found = self.presentation.find(f'{{{NS_PRESENTATIONML}}}{tag}')
+                if found is not None:
+                    anchor = found
+            if anchor is not None:
+                anchor.addnext(sld_id_lst)
+            else:
+                self.presentation.insert(0, sld_id_lst)
+
+        next_slide_id = max((int(sld_id.get('id')) for sld_id in sld_id_lst), default=255) + 1
+
+        for name in self.slide_names:
+            rId = f"rId{next_rel_number}"
+            next_rel_number += 1
+            etree.SubElement(self.presentation_rels, f'{{{NS_RELATIONSHIPS}}}Relationship',
+                             Id=rId, Type=RT.SLIDE, Target=posixpath.relpath(name, 'ppt'))
+            sld_id = etree.SubElement(sld_id_lst, f'{{{NS_PRESENTATIONML}}}sldId')
+            sld_id.set('id', str(next_slide_id))
+            sld_id.set(f'{{{NS_OFFICE_RELS}}}id', rId)
+            next_slide_id += 1
+
+    def close(self):
+        """남은 슬라이드를 기록하고 패키지 파트를 쓴 뒤 출력 파일로 교체합니다."""
+        self.flush()
+        self.write_presentation()
+
+        for name, element in ((PRESENTATION_NAME, self.presentation),
+                              (PRESENTATION_RELS_NAME, self.presentation_rels),
+                              (CONTENT_TYPES_NAME, self.content_types)):
+            self.zip.writestr(name, etree.tostring(element, xml_declaration=True, encoding='UTF-8', standalone=True))
+        self.zip.close()
+        os.replace(self.tmp_path, self.output_path)
+
+    def abort(self):
+        """작성 중인 임시 파일을 삭제합니다 (생성 중 오류/중단 시 호출, close() 이후에 호출해도 안전)."""
+        try:
+            self.zip.close()
+        except (OSError, ValueError):
+            pass
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+미리 보기 모드
+최종 생성과 같은 덱 계획(슬라이드 배치)으로, 긴 변이 작은(기본 256px) 저품질 대체 이미지를 넣은 PPT를 빠르게 만듭니다.
+대체 이미지도 이미지 캐시에 저장되므로 순서/배치를 고치며 반복할 때는 바뀐 이미지만 다시 처리합니다.
+계획은 JSON으로 함께 저장하여, 확정 후 --from-plan으로 배치 계산 없이 원래 품질의 이미지로 바꿔 생성합니다.
+"""
+
+import os
+
+from image_processor import scaled_task
+
+# 대체 이미지 긴 변 (픽셀)과 JPEG 품질
+PREVIEW_LONG_EDGE = 256
+PREVIEW_QUALITY = 60
+
+
+def proxy_task(task, long_edge=PREVIEW_LONG_EDGE, quality=PREVIEW_QUALITY):
+    """작업의 대체 이미지 작업: 같은 비율로 긴 변이 long_edge 이하, JPEG 품질 quality 이하"""
+    scale = min(1.0, long_edge / max(task.width, task.height))
+    return scaled_task(task, scale, min(quality, task.quality))
+
+
+def preview_output_path(output_ppt_path):
+    """미리 보기 PPT 경로 (예: 세신샵_완성본_preview.pptx)"""
+    base, ext = os.path.splitext(output_ppt_path)
+    return f"{base}_preview{ext}"
+
+
+def preview_plan_path(output_ppt_path):
+    """미리 보기와 함께 저장하는 덱 계획 경로 (최종 생성 때 --from-plan으로 사용)"""
+    return os.path.splitext(output_ppt_path)[0] + '.plan.json'
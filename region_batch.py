@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+지역별 일괄 생성 모듈
+한 번 탐색/정렬한 업체 목록을 지역 또는 상세지역별로 나누고, 덱마다 예상 처리 비용(이미지 픽셀 수 합계)을
+계산하여 큰 덱부터 프로세스 풀에 넣습니다. 가장 오래 걸리는 지역이 마지막에 혼자 남아
+다른 코어가 노는 시간을 줄이기 위함입니다.
+"""
+
+import os
+import json
+
+# 나누는 단위
+BATCH_REGION = 'region'  # 지역 (예: 서울)
+BATCH_DETAIL = 'detail'  # 상세지역 (예: 서울 강남구)
+BATCH_LEVELS = [BATCH_REGION, BATCH_DETAIL]
+
+# 헤더를 읽지 못한 이미지의 예상 픽셀 수 (4000x3000 사진 기준)
+DEFAULT_IMAGE_PIXELS = 4000 * 3000
+
+
+def region_key(shop_info, level):
+    """업체가 속한 지역 또는 (지역, 상세지역) 이름"""
+    if level == BATCH_REGION:
+        return (shop_info['region'],)
+    return shop_info['region'], shop_info['detail_region']
+
+
+def group_shops(shop_dirs, level):
+    """정렬된 업체 목록을 순서를 유지한 채 지역/상세지역별로 나눕니다.
+
+    Returns:
+        [(지역 키, 업체 정보 목록), ...] (처음 나온 순서)
+    """
+    groups = {}
+    for shop_info in shop_dirs:
+        groups.setdefault(region_key(shop_info, level), []).append(shop_info)
+    return list(groups.items())
+
+
+def deck_cost(shop_dirs, image_paths, dimensions):
+    """덱의 예상 처리 비용: 입력 이미지의 원본 픽셀 수 합계 (디코딩 시간에 비례)
+
+    Args:
+        shop_dirs: 업체 정보 목록
+        image_paths: 업체 정보 -> 입력 파일 경로 목록을 돌려주는 함수
+        dimensions: 경로 -> (가로, 세로) 또는 None을 돌려주는 함수 (헤더 정보)
+    """
+    cost = 0
+    for shop_info in shop_dirs:
+        for path in image_paths(shop_info):
+            size = dimensions(path)
+            cost += size[0] * size[1] if size else DEFAULT_IMAGE_PIXELS
+    return cost
+
+
+def batch_output_path(output_ppt_path, key):
+    """지역별 출력 파일 경로 (예: 세신샵_완성본_서울_강남구.pptx)"""
+    base, ext = os.path.splitext(output_ppt_path)
+    return f"{base}_{'_'.join(key)}{ext}"
+
+
+def batch_manifest_path(output_ppt_path):
+    """지역별 덱 목록 매니페스트 경로"""
+    return os.path.splitext(output_ppt_path)[0] + '.batch.json'
+
+
+def save_batch_manifest(manifest_path, decks):
+    """지역별 덱 목록을 저장합니다."""
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'decks': decks}, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, manifest_path)
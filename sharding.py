@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+샤드 출력 모듈
+정렬된 업체 목록을 업체 수 또는 예상 용량 기준으로 여러 PPT 파일(샤드)로 나누고,
+샤드 순서를 기록한 매니페스트를 저장합니다.
+"""
+
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+
+def split_shards(shop_dirs, max_shops=None, max_bytes=None, shop_bytes=None):
+    """업체 목록을 순서를 유지한 채 샤드로 나눕니다.
+
+    Args:
+        shop_dirs: 정렬된 업체 정보 목록
+        max_shops: 샤드당 최대 업체 수
+        max_bytes: 샤드당 목표 용량 (바이트, 업체 하나가 이보다 커도 한 샤드에 넣음)
+        shop_bytes: 업체명 -> 예상 용량
+
+    Returns:
+        업체 정보 목록의 목록
+    """
+    shards = []
+    current = []
+    current_bytes = 0
+    for shop_info in shop_dirs:
+        size = shop_bytes.get(shop_info['name'], 0) if shop_bytes else 0
+        if current and ((max_shops and len(current) >= max_shops) or
+                        (max_bytes and current_bytes + size > max_bytes)):
+            shards.append(current)
+            current = []
+            current_bytes = 0
+        current.append(shop_info)
+        current_bytes += size
+
+    if current:
+        shards.append(current)
+    return shards
+
+
+def shard_output_path(output_ppt_path, index):
+    """샤드 파일 경로 (예: 세신샵_완성본_part001.pptx)"""
+    base, ext = os.path.splitext(output_ppt_path)
+    return f"{base}_part{index:03d}{ext}"
+
+
+def shard_manifest_path(output_ppt_path):
+    """샤드 목록 매니페스트 경로"""
+    return os.path.splitext(output_ppt_path)[0] + '.shards.json'
+
+
+def save_shard_manifest(manifest_path, shards):
+    """샤드 목록을 순서대로 저장합니다."""
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'shards': shards}, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, manifest_path)
+
+
+def shard_executor(jobs):
+    """샤드 빌드용 프로세스 풀
+
+    가능하면 샤드마다 새 프로세스를 사용하여(max_tasks_per_child=1, Python 3.11+)
+    이전 샤드의 메모리가 남지 않도록 합니다.
+    """
+    try:
+        return ProcessPoolExecutor(max_workers=jobs, max_tasks_per_child=1)
+    except TypeError:
+        return ProcessPoolExecutor(max_workers=jobs)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+업체 폴더 인덱서
+지역/상세지역/업체/업체 폴더를 디렉토리당 한 번의 os.scandir로 탐색하고,
+파일 분류는 메모리에서 처리합니다. 결과는 디렉토리 수정시각과 함께 인덱스 파일에
+저장하여 다음 실행 때는 변경된 디렉토리만 다시 탐색합니다.
+"""
+
+import os
+import json
+import fnmatch
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import tracer
+
+# 인덱스 형식이 바뀌면 올려서 이전 인덱스를 무시합니다.
+INDEX_VERSION = 2
+
+COMPANY_FOLDER = "업체"
+NAVER_CAPTURE = "네이버플레이스_캡처.png"
+
+
+def classify_shop_files(company_folder, file_names):
+    """업체 폴더의 파일 이름 목록을 네이버 캡처/가격표/업체 이미지로 분류합니다.
+
+    Returns:
+        (네이버 캡처 경로 또는 None, 가격표 경로 목록, 업체 이미지 경로 목록)
+    """
+    names = set(file_names)
+
+    def matching(pattern):
+        # glob과 같은 규칙 (Windows에서는 대소문자 구분 없음)
+        return sorted(name for name in file_names if fnmatch.fnmatch(name, pattern))
+
+    naver_capture = os.path.join(company_folder, NAVER_CAPTURE) if NAVER_CAPTURE in names else None
+
+    # 가격표.jpg 또는 가격표.png 확인
+    price_names = []
+    if "가격표.jpg" in names:
+        price_names.append("가격표.jpg")
+    elif "가격표.png" in names:
+        price_names.append("가격표.png")
+
+    # 가격표_*.jpg 또는 가격표_*.png 파일들 추가
+    numbered_prices = matching("가격표_*.jpg") or matching("가격표_*.png")
+    price_names.extend(numbered_prices)
+
+    # 업체 이미지들
+    image_names = matching("업체_*.jpg")
+
+    return (
+        naver_capture,
+        [os.path.join(company_folder, name) for name in price_names],
+        [os.path.join(company_folder, name) for name in image_names],
+    )
+
+
+class ShopIndexer:
+    def __init__(self, base_dir, index_path=None, jobs=None):
+        """
+        Args:
+            base_dir: 이미지 기본 디렉토리 (지역 폴더들이 있는 downloads 폴더)
+            index_path: 인덱스 파일 경로 (None이면 메모리에만 유지)
+            jobs: 지역 폴더 병렬 탐색 스레드 수 (None이면 기본값)
+        """
+        self.base_dir = base_dir
+        self.index_path = index_path
+        self.jobs = jobs
+
+        # 디렉토리 경로 -> {'mtime_ns', 'dirs', 'files'}
+        self.dirs = {}
+        self._scanned_dirs = {}
+        self.rescanned = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """저장된 인덱스를 읽습니다."""
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') == INDEX_VERSION and index.get('base_dir') == os.path.abspath(self.base_dir):
+                self.dirs = index['dirs']
+        except (OSError, ValueError, KeyError) as e:
+            tracer.error(f"인덱스 파일 읽기 오류 (전체 다시 탐색): {e}")
+
+    def save(self):
+        """인덱스를 저장합니다 (임시 파일에 쓴 뒤 교체)."""
+        if not self.index_path:
+            return
+        try:
+            tmp_path = self.index_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version': INDEX_VERSION,
+                    'base_dir': os.path.abspath(self.base_dir),
+                    'dirs': self.dirs,
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            tracer.error(f"인덱스 파일 저장 오류: {e}")
+
+    def list_dir(self, path):
+        """디렉토리의 (하위 폴더 이름 목록, 파일 이름 목록)을 돌려줍니다.
+
+        수정시각이 인덱스와 같으면 다시 탐색하지 않습니다. 디렉토리가 없으면 None을 돌려줍니다.
+        """
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        entry = self.dirs.get(path)
+        if not entry or entry['mtime_ns'] != mtime_ns:
+            dirs, files = [], []
+            try:
+                with os.scandir(path) as it:
+                    for dir_entry in it:
+                        (dirs if dir_entry.is_dir() else files).append(dir_entry.name)
+            except OSError:
+                return None
+            entry = {'mtime_ns': mtime_ns, 'dirs': sorted(dirs), 'files': sorted(files)}
+            with self._lock:
+                self.rescanned += 1
+
+        # 이번 탐색에서 확인된 디렉토리만 인덱스에 남김 (삭제된 폴더 정리)
+        self._scanned_dirs[path] = entry
+        return entry['dirs'], entry['files']
+
+    def scan_region(self, region_path):
+        """지역 폴더 하나를 탐색하여 업체 목록을 돌려줍니다."""
+        shops = []
+        listing = self.list_dir(region_path)
+        if not listing:
+            return shops
+
+        # 지역 폴더 내의 상세지역 폴더들 탐색
+        for detail_region in listing[0]:
+            detail_region_path = os.path.join(region_path, detail_region)
+            detail_listing = self.list_dir(detail_region_path)
+            if not detail_listing:
+                continue
+
+            # 상세지역 폴더 내의 업체 폴더들 탐색
+            for shop_name in detail_listing[0]:
+                shop_path = os.path.join(detail_region_path, shop_name)
+                shop_listing = self.list_dir(shop_path)
+                if not shop_listing or COMPANY_FOLDER not in shop_listing[0]:
+                    continue
+
+                company_folder = os.path.join(shop_path, COMPANY_FOLDER)
+                company_listing = self.list_dir(company_folder)
+                if not company_listing:
+                    continue
+
+                naver_capture, price_images, image_files = classify_shop_files(company_folder, company_listing[1])
+                if naver_capture or price_images or image_files:
+                    shops.append({
+                        'name': shop_name,
+                        'path': shop_path,
+                        'region': os.path.basename(region_path),
+                        'detail_region': detail_region,
+                        'naver_capture': naver_capture,
+                        'price_images': price_images,
+                        'images': image_files,
+                    })
+        return shops
+
+    def scan(self):
+        """전체 업체 폴더를 탐색합니다.
+
+        Returns:
+            업체명 -> 업체 정보 딕셔너리
+        """
+        self._scanned_dirs = {}
+        self.rescanned = 0
+
+        shop_dirs_dict = {}
+        listing = self.list_dir(self.base_dir)
+        if listing:
+            region_paths = [os.path.join(self.base_dir, region) for region in listing[0]]
+
+            # 지역 폴더별로 병렬 탐색 (네트워크 드라이브 왕복 시간을 겹침)
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                for shops in executor.map(self.scan_region, region_paths):
+                    for shop_info in shops:
+                        shop_dirs_dict[shop_info['name']] = shop_info
+
+        # 다시 탐색했거나 사라진 디렉토리가 있을 때만 저장 (감시 모드에서 매 폴링마다 쓰지 않도록)
+        changed = self.rescanned or self.dirs.keys() - self._scanned_dirs.keys()
+        self.dirs = self._scanned_dirs
+        if changed:
+            self.save()
+        return shop_dirs_dict
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+업체 순서 로더
+엑셀(읽기 전용 스트리밍) 또는 CSV에서 매장명 순서를 읽고,
+정규화된 업체명 인덱스로 업체 폴더 목록을 한 번에 정렬합니다.
+"""
+
+import os
+import csv
+import unicodedata
+
+# 매장명 컬럼 (1부터 시작, 첫 행은 헤더)
+SHOP_NAME_COLUMN = 3
+
+
+def normalize_shop_name(name):
+    """업체명 비교용 정규화: 유니코드 NFC + 공백 정리
+
+    macOS에서 복사된 폴더 이름은 NFD(자모 분리) 형태라 그대로는 엑셀의 매장명과 일치하지 않습니다.
+    """
+    return ' '.join(unicodedata.normalize('NFC', str(name)).split())
+
+
+def iter_excel_names(excel_path):
+    """엑셀 파일의 매장명 컬럼을 읽기 전용 모드로 한 행씩 읽습니다."""
+    # openpyxl은 불러오는 데 오래 걸리므로 엑셀 파일을 읽을 때만 불러옴
+    import openpyxl
+    wb = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        for (value,) in ws.iter_rows(min_row=2, min_col=SHOP_NAME_COLUMN, max_col=SHOP_NAME_COLUMN, values_only=True):
+            yield value
+    finally:
+        wb.close()
+
+
+def iter_csv_names(csv_path):
+    """CSV 파일의 매장명 컬럼을 한 행씩 읽습니다 (UTF-8, 실패하면 CP949)."""
+    for encoding in ('utf-8-sig', 'cp949'):
+        try:
+            with open(csv_path, 'r', encoding=encoding, newline='') as f:
+                rows = csv.reader(f)
+                next(rows, None)  # 헤더
+                names = [row[SHOP_NAME_COLUMN - 1] if len(row) >= SHOP_NAME_COLUMN else None for row in rows]
+            return names
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"CSV 인코딩을 확인할 수 없습니다: {csv_path}")
+
+
+def load_shop_order(path):
+    """엑셀/CSV에서 정규화된 매장명 순서를 읽습니다 (중복은 처음 위치만 사용).
+
+    Returns:
+        정규화된 매장명 목록
+    """
+    if os.path.splitext(path)[1].lower() == '.csv':
+        values = iter_csv_names(path)
+    else:
+        values = iter_excel_names(path)
+
+    shop_order = []
+    seen = set()
+    for value in values:
+        if value is None:
+            continue
+        name = normalize_shop_name(value)
+        if name and name not in seen:
+            seen.add(name)
+            shop_order.append(name)
+    return shop_order
+
+
+def order_shops(shop_dirs_dict, shop_order):
+    """업체 폴더 목록을 매장명 순서대로 정렬합니다. 순서에 없는 업체는 이름순으로 마지막에 추가합니다.
+
+    Returns:
+        (정렬된 업체 정보 목록, 폴더를 찾을 수 없는 매장명 목록, 순서에 없는 업체명 목록)
+    """
+    # 정규화된 업체명 -> 업체 정보
+    shops_by_name = {normalize_shop_name(name): shop_info for name, shop_info in shop_dirs_dict.items()}
+
+    ordered_shops = []
+    missing = []
+    for shop_name in shop_order:
+        shop_info = shops_by_name.pop(shop_name, None)
+        if shop_info:
+            ordered_shops.append(shop_info)
+        else:
+            missing.append(shop_name)
+
+    # 엑셀에 없는 업체는 마지막에 추가
+    extra = [shops_by_name[name] for name in sorted(shops_by_name)]
+    ordered_shops.extend(extra)
+    return ordered_shops, missing, [shop_info['name'] for shop_info in extra]
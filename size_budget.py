@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+출력 용량 예산
+메일/업로드 용량 제한에 맞추기 위해, 워커 프로세스에서 이미지마다 한 번 디코딩하여 품질별 인코딩 크기를 재고,
+PPT 전체 예상 용량이 예산 이하가 될 때까지 가장 큰 이미지부터 JPEG 품질과 해상도를 한 단계씩 낮춥니다.
+가격표와 네이버플레이스 캡처는 글자가 읽히도록 더 높은 최소 품질/해상도를 유지합니다.
+"""
+
+import os
+import re
+import math
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+
+from image_processor import task_sources, scaled_task, measure_image, init_worker, worker_initargs
+from instrumentation import tracer
+
+# 품질을 낮추는 단계
+QUALITY_STEP = 10
+
+# 최소 JPEG 품질과 최소 해상도 비율 (사진 / 가격표·캡처)
+PHOTO_MIN_QUALITY = 40
+PHOTO_MIN_SCALE = 0.5
+TEXT_MIN_QUALITY = 70
+TEXT_MIN_SCALE = 0.8
+
+# 품질을 최소로 낮춘 뒤 해상도를 줄이는 비율 단계
+SCALE_STEPS = (0.9, 0.8, 0.7, 0.6, 0.5)
+
+# 최소 해상도 크기를 재지 못했을 때 쓰는 인코딩 크기 추정 지수
+# (작은 이미지일수록 픽셀당 바이트가 커서 면적 비율보다 덜 줄어듦)
+SCALE_EXPONENT = 1.6
+
+SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+def parse_size(value):
+    """'25MB', '1.5G', '800k', '1048576' 같은 용량 문자열을 바이트 수로 변환합니다."""
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMG]?)I?B?\s*', str(value).upper())
+    if not match:
+        raise ValueError(f"용량 형식이 올바르지 않습니다: {value}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def format_size(num_bytes):
+    """바이트 수를 읽기 쉬운 문자열로 (예: 24.3MB)"""
+    return f"{num_bytes / 1024 ** 2:.1f}MB"
+
+
+def budget_levels(task, text):
+    """작업이 낮출 수 있는 (해상도 비율, JPEG 품질) 단계 목록 (원래 설정부터 최소 설정까지)
+
+    Args:
+        task: ImageTask 또는 CompositeTask
+        text: 가격표/캡처처럼 글자가 있는 이미지 여부 (최소 품질/해상도를 높게 유지)
+    """
+    min_quality = min(task.quality, TEXT_MIN_QUALITY if text else PHOTO_MIN_QUALITY)
+    min_scale = TEXT_MIN_SCALE if text else PHOTO_MIN_SCALE
+
+    qualities = list(range(task.quality, min_quality, -QUALITY_STEP)) + [min_quality]
+    levels = [(1.0, quality) for quality in qualities]
+    levels += [(scale, min_quality) for scale in SCALE_STEPS if scale >= min_scale]
+    return levels
+
+
+def measure_points(levels):
+    """실제로 인코딩해서 잴 (해상도 비율, 품질) 조합: 원래 해상도의 모든 품질과 최소 해상도 하나"""
+    points = [level for level in levels if level[0] == 1.0]
+    if levels[-1][0] != 1.0:
+        points.append(levels[-1])
+    return points
+
+
+def estimate_level_bytes(measured, level):
+    """잰 크기로부터 (해상도 비율, 품질) 단계의 인코딩 크기를 추정합니다.
+
+    원래 해상도와 최소 해상도에서 잰 크기로 이미지마다 해상도에 따른 감소 지수를 구해 중간 비율에 적용합니다.
+    """
+    if level in measured:
+        return measured[level]
+    scale, quality = level
+    exponent = SCALE_EXPONENT
+    smallest = min((point for point in measured if point[0] < 1.0 and point[1] == quality), default=None)
+    if smallest and measured.get((1.0, quality)):
+        exponent = math.log(measured[smallest] / measured[(1.0, quality)]) / math.log(smallest[0])
+    return int(measured[(1.0, quality)] * scale ** exponent)
+
+
+def measure_images(tasks, levels, jobs=None, cache=None):
+    """작업마다 measure_points 조합의 인코딩 크기를 워커 프로세스에서 잽니다.
+
+    Args:
+        tasks: 작업 목록
+        levels: 작업 -> budget_levels 단계 목록
+        jobs: 워커 프로세스 수 (1이면 현재 프로세스에서 순차 처리)
+        cache: ImageCache (잰 조합의 인코딩 결과와 크기를 저장하여 다음 실행/최종 처리 때 재사용)
+
+    Returns:
+        작업 -> (해상도 비율, 품질) -> 바이트 (실패한 작업은 제외)
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(tasks)))
+
+    points = [measure_points(levels[task]) for task in tasks]
+    if jobs == 1:
+        results = [measure_image(task, task_points, cache) for task, task_points in zip(tasks, points)]
+    else:
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        initargs = worker_initargs(cache)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=initargs) as executor:
+            results = list(executor.map(measure_image, tasks, points, chunksize=chunksize))
+
+    measured = {}
+    for task, result in results:
+        tracer.add_spans(result.pop('trace', ()), pid=result.get('pid'), args={'file': os.path.basename(task.path)})
+        tracer.count('bytes_read', result['bytes_read'])
+        if result['error']:
+            tracer.error(f"이미지 크기 측정 오류 ({task.path}): {result['error']}")
+        else:
+            measured[task] = result['levels']
+    return measured
+
+
+def allocate(measured, levels, budget):
+    """예상 합계가 예산 이하가 될 때까지 현재 가장 많이 줄일 수 있는 이미지부터 한 단계씩 낮춥니다.
+
+    Args:
+        measured: 작업 -> (해상도 비율, 품질) -> 바이트
+        levels: 작업 -> 단계 목록
+        budget: 이미지에 쓸 수 있는 바이트 수
+
+    Returns:
+        (작업 -> 선택한 단계 번호, 예상 합계 바이트)
+    """
+    chosen = {task: 0 for task in measured}
+    total = sum(estimate_level_bytes(measured[task], levels[task][0]) for task in measured)
+
+    def push(task):
+        index = chosen[task]
+        if index + 1 < len(levels[task]):
+            current = estimate_level_bytes(measured[task], levels[task][index])
+            saving = current - estimate_level_bytes(measured[task], levels[task][index + 1])
+            # 줄어드는 크기가 큰 것부터 꺼내도록 음수로 저장
+            heapq.heappush(heap, (-saving, id(task), task))
+
+    heap = []
+    for task in measured:
+        push(task)
+
+    while total > budget and heap:
+        negative_saving, _, task = heapq.heappop(heap)
+        chosen[task] += 1
+        total += negative_saving
+        push(task)
+    return chosen, total
+
+
+def plan_budget(tasks, text_paths, budget, jobs=None, cache=None):
+    """예산에 맞춘 작업을 정합니다.
+
+    Args:
+        tasks: 처리할 작업 목록 (중복 제거 후)
+        text_paths: 가격표/캡처 원본 경로 집합 (최소 품질/해상도를 높게 유지)
+        budget: 이미지에 쓸 수 있는 바이트 수
+        jobs: 워커 프로세스 수
+        cache: ImageCache
+
+    Returns:
+        (원래 작업 -> 예산에 맞춘 작업 (바뀐 작업만), 예상 이미지 합계 바이트)
+    """
+    levels = {task: budget_levels(task, any(path in text_paths for path in task_sources(task))) for task in tasks}
+    measured = measure_images(tasks, levels, jobs=jobs, cache=cache)
+    chosen, total = allocate(measured, levels, budget)
+
+    adjusted = {}
+    for task, index in chosen.items():
+        if index:
+            adjusted[task] = scaled_task(task, *levels[task][index])
+    return adjusted, total
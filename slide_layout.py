@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+슬라이드 레이아웃 계산 모듈
+이미지 배치 좌표를 슬라이드 크기만으로 계산하는 순수 함수 모음입니다.
+모든 값은 EMU 단위입니다.
+"""
+
+# python-pptx의 Inches와 같은 값 (python-pptx를 불러오지 않아 이미지 워커 프로세스가 빨리 시작됨)
+EMU_PER_INCH = 914400
+
+
+def inches(value):
+    """인치를 EMU 정수로 변환합니다."""
+    return int(value * EMU_PER_INCH)
+
+
+# 한 슬라이드에 배치하는 최대 이미지 수
+IMAGES_PER_SLIDE = 3
+
+# 이미지 간 간격
+IMAGE_GAP = inches(0.3)
+
+# 네이버플레이스 캡처 최대 크기 및 위치
+CAPTURE_MAX_WIDTH = inches(12)
+CAPTURE_MAX_HEIGHT = inches(6)
+CAPTURE_TOP = inches(1.2)
+
+
+def batches(items, size=IMAGES_PER_SLIDE):
+    """목록을 슬라이드 단위(최대 3개)로 나눕니다."""
+    return [items[idx:idx + size] for idx in range(0, len(items), size)]
+
+
+def price_area(slide_width, slide_height):
+    """가격표 슬라이드의 사용 가능한 영역 (left, top, width, height)"""
+    # 안전 여백 설정
+    margin_left = inches(0.5)
+    margin_top = inches(0.5)
+    margin_bottom = inches(0.5)
+
+    available_width = slide_width - margin_left * 2
+    available_height = slide_height - margin_top - margin_bottom
+    return margin_left, margin_top, available_width, available_height
+
+
+def price_single_box(slide_width, slide_height, image_size):
+    """가격표 1개: 원본 비율을 유지하여 중앙에 크게 배치합니다."""
+    margin_left, margin_top, available_width, available_height = price_area(slide_width, slide_height)
+
+    img_width, img_height = image_size
+    aspect_ratio = img_width / img_height
+
+    # 9:16 세로 비율에 맞춤
+    height = available_height
+    width = height * aspect_ratio
+
+    # 너무 넓으면 너비에 맞춤
+    if width > available_width:
+        width = available_width
+        height = width / aspect_ratio
+
+    # 중앙 정렬
+    left = margin_left + (available_width - width) / 2
+    top = margin_top + (available_height - height) / 2
+    return left, top, width, height
+
+
+def price_multi_boxes(slide_width, slide_height, num_images):
+    """가격표 2-3개: 9:16 비율 영역을 가로로 나란히 배치합니다."""
+    margin_left, margin_top, available_width, available_height = price_area(slide_width, slide_height)
+    gap = IMAGE_GAP
+
+    # 각 이미지 너비 계산
+    total_gap = gap * (num_images - 1)
+    img_width = (available_width - total_gap) / num_images
+
+    # 9:16 비율로 높이 계산
+    img_height = img_width * (16 / 9)
+
+    # 높이가 너무 크면 높이에 맞춤
+    if img_height > available_height:
+        img_height = available_height
+        img_width = img_height * (9 / 16)
+        total_width = img_width * num_images + total_gap
+    else:
+        total_width = available_width
+
+    # 시작 위치 계산 (중앙 정렬)
+    start_left = margin_left + (available_width - total_width) / 2
+    top = margin_top + (available_height - img_height) / 2
+
+    return [(start_left + (i * (img_width + gap)), top, img_width, img_height) for i in range(num_images)]
+
+
+def image_boxes(slide_width, slide_height, num_images):
+    """업체 이미지 1-3개를 정사각형으로 가로 배치할 영역 목록"""
+    # 안전 여백 설정
+    margin_left = inches(0.5)
+    margin_right = inches(0.5)
+    margin_top = inches(1.2)
+    margin_bottom = inches(0.3)
+
+    # 사용 가능한 영역
+    available_width = slide_width - margin_left - margin_right
+    available_height = slide_height - margin_top - margin_bottom
+
+    if num_images == 1:
+        # 사용 가능한 영역의 작은 쪽에 맞춤
+        square_size = min(available_width, available_height)
+        left = margin_left + (available_width - square_size) / 2
+        top = margin_top + (available_height - square_size) / 2
+        return [(left, top, square_size, square_size)]
+
+    if num_images not in (2, 3):
+        return []
+
+    gap = IMAGE_GAP
+    total_gap = gap * (num_images - 1)
+
+    # 정사각형 크기 계산
+    square_size = (available_width - total_gap) / num_images
+
+    # 높이 체크
+    if square_size > available_height:
+        square_size = available_height
+
+    # 시작 위치 계산 (중앙 정렬)
+    total_width = square_size * num_images + total_gap
+    start_left = margin_left + (available_width - total_width) / 2
+    top = margin_top + (available_height - square_size) / 2
+
+    return [(start_left + (i * (square_size + gap)), top, square_size, square_size) for i in range(num_images)]
+
+
+def bounding_box(boxes):
+    """여러 배치 영역을 모두 감싸는 영역 (left, top, width, height)"""
+    left = min(box[0] for box in boxes)
+    top = min(box[1] for box in boxes)
+    right = max(box[0] + box[2] for box in boxes)
+    bottom = max(box[1] + box[3] for box in boxes)
+    return left, top, right - left, bottom - top
+
+
+def capture_box(slide_width, image_size):
+    """네이버플레이스 캡처: 자르지 않고 전체를 표시하도록 크기를 조정합니다."""
+    img_width, img_height = image_size
+    aspect_ratio = img_width / img_height
+
+    max_width = CAPTURE_MAX_WIDTH
+    max_height = CAPTURE_MAX_HEIGHT
+
+    if aspect_ratio > max_width / max_height:
+        width = max_width
+        height = width / aspect_ratio
+    else:
+        height = max_height
+        width = height * aspect_ratio
+
+    left = (slide_width - width) / 2
+    return left, CAPTURE_TOP, width, height
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+템플릿 스냅숏
+템플릿 PPT를 한 번 읽어 패키지 바이트와 슬라이드 크기를 보관합니다.
+슬라이드 크기는 presentation.xml에서 바로 읽으므로 계획/샤드 나누기만 하는 프로세스는 python-pptx를 불러오지 않고,
+샤드 워커에는 스냅숏을 그대로 넘겨 네트워크 드라이브의 템플릿을 다시 읽지 않고 메모리에서 엽니다.
+"""
+
+import io
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+
+# 슬라이드 레이아웃 번호 (템플릿 기준)
+TITLE_LAYOUT = 5  # 표지 제목 슬라이드
+BLANK_LAYOUT = 6  # 업체 슬라이드 (placeholder 없음)
+
+PRESENTATION_PART = 'ppt/presentation.xml'
+SLIDE_SIZE_TAG = '{http://schemas.openxmlformats.org/presentationml/2006/main}sldSz'
+
+
+def file_state(path):
+    """템플릿이 바뀌었는지 비교할 (크기, 수정 시각)"""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class TemplateSnapshot:
+    """한 번 읽어 둔 템플릿 (패키지 바이트, 슬라이드 크기). 워커 프로세스에 피클로 넘길 수 있습니다."""
+
+    def __init__(self, template_ppt_path):
+        self.path = template_ppt_path
+        self.state = file_state(template_ppt_path)
+        with open(template_ppt_path, 'rb') as f:
+            self.data = f.read()
+
+        with zipfile.ZipFile(io.BytesIO(self.data)) as package:
+            root = ET.fromstring(package.read(PRESENTATION_PART))
+        size = root.find(SLIDE_SIZE_TAG)
+        self.slide_width = int(size.get('cx'))
+        self.slide_height = int(size.get('cy'))
+
+    def is_current(self):
+        """템플릿 파일이 스냅숏 이후 바뀌지 않았는지 확인합니다."""
+        try:
+            return file_state(self.path) == self.state
+        except OSError:
+            return False
+
+    def open(self):
+        """스냅숏에서 새 프레젠테이션을 엽니다 (파일을 다시 읽지 않음)."""
+        from pptx import Presentation
+        return Presentation(io.BytesIO(self.data))
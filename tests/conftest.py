@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""테스트 공통 설정: 저장소 루트의 모듈(평면 구조)을 불러올 수 있도록 경로를 추가합니다."""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
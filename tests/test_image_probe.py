@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""image_probe 헤더 파서 (JPEG SOF/APP1 EXIF, PNG IHDR/eXIf) 테스트"""
+
+import io
+import struct
+
+from PIL import Image
+
+from image_probe import ImageInfo, probe_image, probe_jpeg, display_size, EXIF_ORIENTATION_TAG
+
+
+def exif_with_orientation(orientation):
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION_TAG] = orientation
+    return exif
+
+
+def save_image(path, size, image_format, orientation=None, **options):
+    if orientation is not None:
+        options['exif'] = exif_with_orientation(orientation)
+    Image.new('RGB', size, (120, 80, 40)).save(path, format=image_format, **options)
+    return str(path)
+
+
+def test_jpeg_size_without_exif(tmp_path):
+    path = save_image(tmp_path / 'plain.jpg', (64, 48), 'JPEG')
+
+    assert probe_image(path) == ImageInfo(64, 48, 1)
+
+
+def test_jpeg_exif_orientation_before_sof(tmp_path):
+    path = save_image(tmp_path / 'rotated.jpg', (64, 48), 'JPEG', orientation=6)
+
+    info = probe_image(path)
+
+    assert info == ImageInfo(64, 48, 6)
+    assert display_size(info) == (48, 64)
+
+
+def test_progressive_jpeg_uses_sof2(tmp_path):
+    path = save_image(tmp_path / 'progressive.jpg', (33, 17), 'JPEG', progressive=True)
+
+    assert probe_image(path) == ImageInfo(33, 17, 1)
+
+
+def test_big_endian_exif_and_fill_bytes():
+    # 'MM' (빅 엔디언) TIFF, IFD0에 방향 태그 하나 (값 8)
+    tiff = b'MM\x00\x2a' + struct.pack('>I', 8) + struct.pack('>H', 1) \
+        + struct.pack('>HHIHH', EXIF_ORIENTATION_TAG, 3, 1, 8, 0) + struct.pack('>I', 0)
+    app1 = b'Exif\x00\x00' + tiff
+    sof0 = struct.pack('>BHHB', 8, 300, 400, 3) + b'\x01\x11\x00\x02\x11\x00\x03\x11\x00'
+    data = (b'\xff\xe1' + struct.pack('>H', len(app1) + 2) + app1
+            + b'\xff\xff'  # 마커 앞 채움 바이트
+            + b'\xff\xc0' + struct.pack('>H', len(sof0) + 2) + sof0)
+
+    assert probe_jpeg(io.BytesIO(data)) == ImageInfo(400, 300, 8)
+
+
+def test_jpeg_without_sof_returns_none():
+    assert probe_jpeg(io.BytesIO(b'\xff\xda\x00\x02')) is None
+
+
+def test_png_ihdr_and_exif_orientation(tmp_path):
+    plain = save_image(tmp_path / 'plain.png', (30, 20), 'PNG')
+    rotated = save_image(tmp_path / 'rotated.png', (30, 20), 'PNG', orientation=8)
+
+    assert probe_image(plain) == ImageInfo(30, 20, 1)
+    assert probe_image(rotated) == ImageInfo(30, 20, 8)
+
+
+def test_other_formats_fall_back_to_pil(tmp_path):
+    path = save_image(tmp_path / 'image.bmp', (12, 7), 'BMP')
+
+    assert probe_image(path) == ImageInfo(12, 7, 1)
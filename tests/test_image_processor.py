@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""image_processor.process_image의 디코딩 제한(메모리 예산, 잘린 파일)과 EXIF 방향 처리 테스트"""
+
+import pytest
+from PIL import Image
+
+import image_processor
+from decode_limits import set_decode_limits, REJECT_TOO_LARGE, REJECT_TRUNCATED
+from image_probe import EXIF_ORIENTATION_TAG
+
+
+@pytest.fixture
+def small_decode_budget():
+    set_decode_limits(decode_memory=1024 * 1024)
+    yield
+    set_decode_limits()
+
+
+def save_png(path, size, orientation=None):
+    options = {}
+    if orientation is not None:
+        exif = Image.Exif()
+        exif[EXIF_ORIENTATION_TAG] = orientation
+        options['exif'] = exif
+    Image.effect_noise(size, 40).convert('RGB').save(path, format='PNG', **options)
+    return str(path)
+
+
+def fit_task(path):
+    return image_processor.ImageTask(path, image_processor.MODE_FIT, 200, 200, 85)
+
+
+def test_png_over_budget_is_rejected(tmp_path, small_decode_budget):
+    path = save_png(tmp_path / 'large.png', (1000, 800))
+
+    _, result = image_processor.process_image(fit_task(path))
+
+    assert result['rejected'] == {'path': path, 'reason': REJECT_TOO_LARGE}
+
+
+def test_truncated_png_is_rejected(tmp_path):
+    path = save_png(tmp_path / 'full.png', (300, 200))
+    with open(path, 'rb') as f:
+        data = f.read()
+    truncated = tmp_path / 'truncated.png'
+    truncated.write_bytes(data[:len(data) // 2])
+
+    _, result = image_processor.process_image(fit_task(str(truncated)))
+
+    assert result['rejected'] == {'path': str(truncated), 'reason': REJECT_TRUNCATED}
+
+
+def test_png_exif_orientation_is_applied(tmp_path):
+    path = save_png(tmp_path / 'rotated.png', (80, 40), orientation=6)
+
+    _, result = image_processor.process_image(fit_task(path))
+
+    assert result['error'] is None
+    assert result['source_size'] == (40, 80)
+    assert result['size'] == (40, 80)
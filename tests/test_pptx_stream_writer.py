@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""StreamingPptxWriter가 python-pptx로 다시 열리는 올바른 패키지를 만드는지 테스트"""
+
+import io
+import os
+import zipfile
+
+from PIL import Image
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from pptx.util import Inches
+
+from pptx_stream_writer import StreamingPptxWriter, CONTENT_TYPES_NAME
+from template_snapshot import TemplateSnapshot, BLANK_LAYOUT
+
+TEMPLATE_PPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '세신샵.pptx')
+
+
+def png_bytes(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 30), color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def add_picture_slide(prs, data):
+    slide = prs.slides.add_slide(prs.slide_layouts[BLANK_LAYOUT])
+    slide.shapes.add_picture(io.BytesIO(data), Inches(1), Inches(1), Inches(2))
+    return slide
+
+
+def test_writes_valid_package(tmp_path):
+    output_path = str(tmp_path / 'out.pptx')
+    red, blue = png_bytes((255, 0, 0)), png_bytes((0, 0, 255))
+
+    writer = StreamingPptxWriter(TEMPLATE_PPT, output_path)
+    template_slides = writer.template_slide_count
+    add_picture_slide(writer.prs, red)
+    writer.flush()
+    add_picture_slide(writer.prs, red)  # 같은 이미지는 미디어 파트 하나를 공유
+    add_picture_slide(writer.prs, blue)
+    assert writer.slide_count == template_slides + 1
+    writer.close()
+
+    assert not os.path.exists(output_path + '.tmp')
+    with zipfile.ZipFile(output_path) as package:
+        assert package.testzip() is None
+        names = package.namelist()
+        assert len(names) == len(set(names))
+        assert b'Extension="png"' in package.read(CONTENT_TYPES_NAME)
+
+    prs = Presentation(output_path)
+    assert len(prs.slides) == template_slides + 3
+    added = list(prs.slides)[template_slides:]
+    blobs = [shape.image.blob for slide in added for shape in slide.shapes
+             if shape.shape_type == MSO_SHAPE_TYPE.PICTURE]
+    assert blobs == [red, red, blue]
+
+    media = [name for name in names if name.startswith('ppt/media/')]
+    with zipfile.ZipFile(TEMPLATE_PPT) as template:
+        template_media = [name for name in template.namelist() if name.startswith('ppt/media/')]
+    assert len(media) == len(template_media) + 2
+
+
+def test_accepts_template_snapshot_bytes(tmp_path):
+    output_path = str(tmp_path / 'out.pptx')
+    template = TemplateSnapshot(TEMPLATE_PPT)
+
+    writer = StreamingPptxWriter(io.BytesIO(template.data), output_path)
+    add_picture_slide(writer.prs, png_bytes((0, 128, 0)))
+    writer.close()
+
+    assert len(Presentation(output_path).slides) == writer.template_slide_count + 1
+
+
+def test_abort_removes_temporary_file(tmp_path):
+    output_path = str(tmp_path / 'out.pptx')
+
+    writer = StreamingPptxWriter(TEMPLATE_PPT, output_path)
+    add_picture_slide(writer.prs, png_bytes((255, 255, 0)))
+    writer.flush()
+    writer.abort()
+
+    assert os.listdir(tmp_path) == []
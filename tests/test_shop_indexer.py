@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""ShopIndexer 인덱스 저장 (변경이 있을 때만 다시 기록) 테스트"""
+
+import os
+import shutil
+
+from shop_indexer import ShopIndexer, COMPANY_FOLDER
+
+
+def make_shop(base_dir, name):
+    company_folder = base_dir / '서울' / '강남' / name / COMPANY_FOLDER
+    company_folder.mkdir(parents=True)
+    (company_folder / '업체_1.jpg').write_bytes(b'')
+    return company_folder.parent
+
+
+def test_unchanged_scan_does_not_rewrite_index(tmp_path):
+    base_dir = tmp_path / 'downloads'
+    make_shop(base_dir, '업체A')
+    index_path = str(tmp_path / 'index.json')
+
+    indexer = ShopIndexer(str(base_dir), index_path)
+    assert list(indexer.scan()) == ['업체A']
+    assert indexer.rescanned == 5
+    os.remove(index_path)
+
+    assert list(indexer.scan()) == ['업체A']
+    assert indexer.rescanned == 0
+    assert not os.path.exists(index_path)
+
+
+def test_removed_folder_is_saved(tmp_path):
+    base_dir = tmp_path / 'downloads'
+    make_shop(base_dir, '업체A')
+    shop_b = make_shop(base_dir, '업체B')
+    index_path = str(tmp_path / 'index.json')
+    ShopIndexer(str(base_dir), index_path).scan()
+
+    shutil.rmtree(shop_b)
+    indexer = ShopIndexer(str(base_dir), index_path)
+
+    assert list(indexer.scan()) == ['업체A']
+    assert not any(path.startswith(str(shop_b)) for path in ShopIndexer(str(base_dir), index_path).dirs)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""size_budget.allocate (가장 많이 줄어드는 이미지부터 한 단계씩 낮추는 배분) 테스트"""
+
+from size_budget import allocate, estimate_level_bytes
+
+# 원래 품질 -> 낮은 품질 -> 최소 품질 (모두 원래 해상도에서 잰 크기)
+LEVELS = [(1.0, 85), (1.0, 75), (1.0, 40)]
+
+
+def measured_sizes(*sizes):
+    return dict(zip(LEVELS, sizes))
+
+
+def test_within_budget_keeps_original_levels():
+    measured = {'a': measured_sizes(1000, 800, 500), 'b': measured_sizes(2000, 1500, 900)}
+    levels = {task: LEVELS for task in measured}
+
+    chosen, total = allocate(measured, levels, budget=5000)
+
+    assert chosen == {'a': 0, 'b': 0}
+    assert total == 3000
+
+
+def test_lowers_largest_saving_first():
+    measured = {'small': measured_sizes(1000, 900, 800), 'large': measured_sizes(5000, 3000, 2500)}
+    levels = {task: LEVELS for task in measured}
+
+    # 큰 이미지를 한 단계 낮추면 (2000 절약) 예산에 들어옴
+    chosen, total = allocate(measured, levels, budget=4500)
+
+    assert chosen == {'small': 0, 'large': 1}
+    assert total == 4000
+
+
+def test_total_matches_chosen_levels():
+    measured = {
+        'a': measured_sizes(4000, 3000, 1000),
+        'b': measured_sizes(3000, 2500, 2000),
+        'c': measured_sizes(2000, 1200, 1100),
+    }
+    levels = {task: LEVELS for task in measured}
+
+    chosen, total = allocate(measured, levels, budget=5000)
+
+    assert total <= 5000
+    assert total == sum(estimate_level_bytes(measured[task], levels[task][index]) for task, index in chosen.items())
+
+
+def test_unreachable_budget_stops_at_minimum_levels():
+    measured = {'a': measured_sizes(1000, 800, 500), 'b': measured_sizes(2000, 1500, 900)}
+    levels = {task: LEVELS for task in measured}
+
+    chosen, total = allocate(measured, levels, budget=100)
+
+    assert chosen == {'a': 2, 'b': 2}
+    assert total == 1400
+
+
+def test_estimates_unmeasured_scale_between_measured_points():
+    # 원래 해상도와 최소 해상도(0.5)만 잼: 중간 비율(0.8)은 두 값 사이로 추정
+    levels = [(1.0, 40), (0.8, 40), (0.5, 40)]
+    measured = {'a': {(1.0, 40): 1000, (0.5, 40): 400}}
+
+    chosen, total = allocate(measured, {'a': levels}, budget=900)
+
+    assert chosen == {'a': 1}
+    assert 400 < total < 1000
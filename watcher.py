@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+감시 모드
+이미지 기본 디렉토리를 주기적으로 확인(stat 기반, OS별 API 사용 안 함)하여 업체 폴더가 추가/변경되면
+업체별로 변경이 잠잠해질 때까지 기다린 뒤 증분 모드로 PPT를 다시 만듭니다.
+폴더 탐색 인덱스, 이미지 캐시, 이미지 헤더 정보는 PPTImageInserter에 남아 있어 재생성 사이에 재사용됩니다.
+"""
+
+import os
+import time
+
+from incremental import shop_input_files
+from instrumentation import tracer
+
+# 기본 확인 주기 (초)
+DEFAULT_POLL_INTERVAL = 2.0
+
+# 업체 폴더 변경 후 이 시간(초) 동안 추가 변경이 없으면 다시 생성
+DEFAULT_DEBOUNCE = 5.0
+
+
+def shop_signature(shop_info):
+    """업체 입력 파일들의 (경로, 크기, 수정시각) 목록 - 파일 추가/삭제/덮어쓰기를 모두 감지"""
+    signature = []
+    for path in shop_input_files(shop_info):
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+class ShopWatcher:
+    def __init__(self, inserter, interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE, max_wait=None):
+        """
+        Args:
+            inserter: PPTImageInserter (탐색 인덱스/캐시를 유지한 채 반복 사용)
+            interval: 폴더 확인 주기 (초)
+            debounce: 업체별로 마지막 변경 후 기다릴 시간 (초)
+            max_wait: 변경이 계속되더라도 첫 변경 후 이 시간(초)이 지나면 다시 생성 (기본: debounce의 10배)
+        """
+        self.inserter = inserter
+        self.interval = interval
+        self.debounce = debounce
+        self.max_wait = max_wait if max_wait is not None else debounce * 10
+
+        self.signatures = {}
+        # 업체명 -> (첫 변경 감지 시각, 마지막 변경 감지 시각)
+        self.pending = {}
+
+    def snapshot(self):
+        """현재 업체별 입력 파일 상태 (변경되지 않은 폴더는 인덱스를 사용하므로 빠름)"""
+        with tracer.span('watch_scan'):
+            shop_dirs_dict = self.inserter.indexer.scan()
+            return {name: shop_signature(shop_info) for name, shop_info in shop_dirs_dict.items()}
+
+    def poll(self):
+        """변경된 업체를 기록하고, 다시 생성할 때가 되었으면 변경된 업체명 목록을 돌려줍니다."""
+        current = self.snapshot()
+        now = time.monotonic()
+
+        for name in set(current) | set(self.signatures):
+            if current.get(name) != self.signatures.get(name):
+                first_seen, _ = self.pending.get(name, (now, now))
+                self.pending[name] = (first_seen, now)
+                tracer.detail(f"  변경 감지: {name}")
+        previous, self.signatures = self.signatures, current
+
+        if not self.pending:
+            return None
+        settled = all(now - last_seen >= self.debounce for _, last_seen in self.pending.values())
+        overdue = now - min(first_seen for first_seen, _ in self.pending.values()) >= self.max_wait
+        if not (settled or overdue):
+            return None
+
+        changed = sorted(self.pending)
+        self.pending = {}
+
+        # 변경된 업체의 이미지는 헤더/내용 해시를 다시 확인
+        for name in changed:
+            for signature in (previous.get(name, ()), current.get(name, ())):
+                self.inserter.forget_files(path for path, _, _ in signature)
+        return changed
+
+    def run(self, build, max_builds=None):
+        """처음 한 번 생성한 뒤 변경을 감시하며 다시 생성합니다 (Ctrl+C로 종료).
+
+        Args:
+            build: PPT를 생성하는 함수 (성공 여부를 돌려줌)
+            max_builds: 최대 생성 횟수 (None이면 무제한)
+
+        Returns:
+            마지막 생성 성공 여부
+        """
+        # 생성 중에 바뀐 파일도 다음 확인에서 감지되도록 생성 전에 상태를 기록
+        self.signatures = self.snapshot()
+        success = build()
+        builds = 1
+        tracer.info(f"\n감시 중: {self.inserter.base_image_dir} (확인 주기 {self.interval}초, 대기 {self.debounce}초)")
+
+        try:
+            while max_builds is None or builds < max_builds:
+                time.sleep(self.interval)
+                changed = self.poll()
+                if not changed:
+                    continue
+
+                tracer.info(f"\n변경된 업체 {len(changed)}개: {', '.join(changed[:5])}"
+                            + (" 외" if len(changed) > 5 else "") + " - 다시 생성합니다.")
+                with tracer.span('rebuild', shops=len(changed)):
+                    success = build()
+                builds += 1
+                tracer.info(f"감시 중: {self.inserter.base_image_dir}")
+        except KeyboardInterrupt:
+            tracer.info("\n감시를 종료합니다.")
+        return success